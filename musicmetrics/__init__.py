@@ -0,0 +1,8 @@
+"""
+MusicMetrics - pacote com a CLI do pipeline
+
+Importar o pacote é barato: pandas, numpy, mysql.connector, dotenv e spotipy só são
+carregados quando uma etapa é executada (python -m musicmetrics <etapa>)
+"""
+
+__version__ = '0.1.0'
@@ -0,0 +1,3 @@
+from musicmetrics.cli import main
+
+raise SystemExit(main())
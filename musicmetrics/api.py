@@ -0,0 +1,431 @@
+"""
+MusicMetrics - API HTTP local
+Serviço asyncio (só biblioteca padrão) que expõe as análises de 03_Views_e_Procedures.sql
+em JSON: músicas e artistas mais populares, estatísticas por década e músicas parecidas.
+As consultas rodam em um pool de conexões (MySQL ou o banco DuckDB local, usado como
+substituto em testes) sem bloquear o loop; as listas são paginadas por chave
+(popularidade + id, sem OFFSET) e enviadas em blocos (Transfer-Encoding: chunked)
+"""
+
+import re
+import json
+import asyncio
+import contextlib
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlsplit, parse_qs, unquote
+from concurrent.futures import ThreadPoolExecutor
+
+from musicmetrics.pipeline import load_script
+
+# ============================================
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+POOL_SIZE = 4
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Linhas lidas do cursor por vez (cada lote vira um bloco da resposta)
+FETCH_BATCH = 100
+
+SIMILAR_K = 10
+MAX_SIMILAR_K = 50
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Páginas ordenadas por popularidade decrescente e id crescente (desempate estável).
+# Com o cursor 'popularidade:id' da página anterior, a próxima começa logo depois dele;
+# no MySQL a busca usa idx_popularity_track_id (migração V003)
+TOP_TRACKS_SQL = """
+    SELECT track_id, track_name, artist_name, popularity, release_date, release_year,
+           duration_ms, explicit, danceability, energy, valence, tempo, acousticness
+    FROM vw_top_popular_tracks
+    {where}
+    ORDER BY popularity DESC, track_id ASC
+    LIMIT %s
+"""
+TOP_ARTISTS_SQL = """
+    SELECT artist_id, artist_name, genres, popularity, followers,
+           total_tracks, avg_track_popularity, max_track_popularity
+    FROM vw_top_artists_with_tracks
+    {where}
+    ORDER BY popularity DESC, artist_id ASC
+    LIMIT %s
+"""
+KEYSET_WHERE = "WHERE popularity < %s OR (popularity = %s AND {id_column} > %s)"
+
+DECADES_SQL = "SELECT * FROM vw_music_by_decade ORDER BY decade"
+
+TRACKS_BY_ID_SQL = """
+    SELECT t.track_id, t.track_name, a.artist_name, t.popularity, t.release_year
+    FROM dim_tracks t LEFT JOIN dim_artists a ON t.artist_sk = a.artist_sk
+    WHERE t.track_id IN ({placeholders})
+"""
+
+# ============================================
+
+class RequestError(Exception):
+    """Erro do cliente: vira uma resposta JSON com o status informado"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def to_json(value):
+    """Tipos vindos do banco que o json não serializa sozinho"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'item'):  # escalares numpy (DuckDB)
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, default=to_json)
+
+def connection_factory(backend):
+    """Função que abre uma conexão nova do backend (chamada nas threads do pool)"""
+    loader = load_script('carregar')
+    if backend == 'duckdb':
+        # Cada cursor do DuckDB é uma conexão independente sobre o mesmo banco
+        base = loader.connect_to_duckdb()
+        if base is None:
+            raise RuntimeError("Banco DuckDB indisponível (execute: carregar --backend duckdb)")
+        return base.cursor
+
+    def connect():
+        connection = loader.connect_to_mysql()
+        if connection is None:
+            raise RuntimeError("Não foi possível conectar ao MySQL")
+        # Sem autocommit, cada conexão do pool ficaria presa ao snapshot (REPEATABLE READ)
+        # da primeira consulta: cargas novas e a versão dos dados nunca apareceriam
+        connection.autocommit = True
+        return connection
+    return connect
+
+class ConnectionPool:
+    """Pool assíncrono: conexões em uma fila asyncio, consultas em threads dedicadas
+
+    Cada conexão é usada por uma tarefa de cada vez; quem não consegue conexão espera
+    na fila sem bloquear o loop (as demais requisições continuam sendo atendidas)
+    """
+
+    def __init__(self, factory, backend, size=POOL_SIZE):
+        self.factory = factory
+        self.backend = backend
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='musicmetrics-db')
+        self.queue = asyncio.Queue()
+        self.connections = []
+
+    async def open(self):
+        for _ in range(self.size):
+            connection = await self.run(self.factory)
+            self.connections.append(connection)
+            self.queue.put_nowait(connection)
+
+    async def close(self):
+        for connection in self.connections:
+            await self.run(connection.close)
+        self.executor.shutdown(wait=True)
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        connection = await self.queue.get()
+        try:
+            yield connection
+        finally:
+            self.queue.put_nowait(connection)
+
+    def sql(self, statement):
+        """Os comandos usam %s (MySQL); o DuckDB espera ?"""
+        return statement.replace('%s', '?') if self.backend == 'duckdb' else statement
+
+    def execute(self, connection, statement, params=()):
+        """Executa e devolve um cursor (description + fetchmany) para ler aos poucos"""
+        if self.backend == 'duckdb':
+            return connection.execute(self.sql(statement), list(params))
+        cursor = connection.cursor()
+        cursor.execute(statement, tuple(params))
+        return cursor
+
+    def finish(self, cursor):
+        if self.backend != 'duckdb':
+            cursor.close()
+
+    async def fetch_all(self, statement, params=()):
+        """(colunas, linhas) de uma consulta pequena"""
+        async with self.acquire() as connection:
+            cursor = await self.run(self.execute, connection, statement, params)
+            try:
+                rows = await self.run(cursor.fetchall)
+                return [column[0] for column in cursor.description], rows
+            finally:
+                await self.run(self.finish, cursor)
+
+# -------- HTTP --------
+
+async def send_json(writer, status, obj, keep_alive=True):
+    body = dumps(obj).encode('utf-8')
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+
+class ChunkedResponse:
+    """Resposta enviada em blocos conforme as linhas chegam do banco
+
+    Clientes HTTP/1.0 não entendem Transfer-Encoding: chunked: para eles o corpo é
+    acumulado e enviado no final com Content-Length (e a conexão é encerrada)
+    """
+
+    def __init__(self, writer, keep_alive=True, chunked=True):
+        self.writer = writer
+        self.keep_alive = keep_alive and chunked
+        self.chunked = chunked
+        self.started = False
+        self.status = 200
+        self.buffer = []
+
+    async def start(self, status=200):
+        self.status = status
+        if not self.chunked:
+            return
+        self.started = True
+        self.writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if self.keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+        )
+
+    async def send(self, text):
+        data = text.encode('utf-8')
+        if not self.chunked:
+            self.buffer.append(data)
+        elif data:
+            self.writer.write(f"{len(data):x}\r\n".encode('latin-1') + data + b"\r\n")
+            # drain: se o cliente lê devagar, a leitura do banco espera em vez de acumular na memória
+            await self.writer.drain()
+
+    async def end(self):
+        if self.chunked:
+            self.writer.write(b"0\r\n\r\n")
+        else:
+            self.started = True
+            body = b''.join(self.buffer)
+            self.writer.write(
+                f"HTTP/1.1 {self.status} {STATUS_TEXT[self.status]}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+        await self.writer.drain()
+
+def int_param(params, name, default, low, high):
+    raw = params.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise RequestError(400, f"'{name}' deve ser um inteiro")
+    if not low <= value <= high:
+        raise RequestError(400, f"'{name}' deve estar entre {low} e {high}")
+    return value
+
+def parse_cursor(params):
+    """'popularidade:id' da página anterior -> (popularidade, id), ou None na primeira página"""
+    raw = params.get('cursor', [None])[0]
+    if not raw:
+        return None
+    popularity, sep, item_id = raw.partition(':')
+    if not sep or not item_id or not popularity.lstrip('-').isdigit():
+        raise RequestError(400, "cursor inválido (formato: popularidade:id)")
+    return int(popularity), item_id
+
+class MusicMetricsAPI:
+    """Rotas da API sobre um ConnectionPool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.similarity = None
+        self.routes = [
+            (re.compile(r'^/saude$'), self.health),
+            (re.compile(r'^/musicas/top$'), self.top_tracks),
+            (re.compile(r'^/artistas/top$'), self.top_artists),
+            (re.compile(r'^/decadas$'), self.decades),
+            (re.compile(r'^/musicas/([^/]+)/parecidas$'), self.similar_tracks),
+        ]
+
+    async def start(self):
+        await self.pool.open()
+        # Índice de similaridade (05_Indice_de_Similaridade.py build): opcional
+        module = load_script('similaridade')
+        try:
+            self.similarity = (module, await asyncio.get_running_loop().run_in_executor(None, module.load_index))
+        except FileNotFoundError:
+            print("  ⚠️ Índice de similaridade não encontrado: /musicas/<id>/parecidas indisponível")
+
+    # -------- Rotas --------
+
+    async def health(self, response, match, params):
+        columns, rows = await self.pool.fetch_all("SELECT COUNT(*) FROM dim_tracks")
+        await send_json(response.writer, 200, {'status': 'ok', 'backend': self.pool.backend,
+                                                'musicas': rows[0][0]}, response.keep_alive)
+
+    async def top_tracks(self, response, match, params):
+        await self.keyset_page(response, params, TOP_TRACKS_SQL, 'track_id')
+
+    async def top_artists(self, response, match, params):
+        await self.keyset_page(response, params, TOP_ARTISTS_SQL, 'artist_id')
+
+    async def decades(self, response, match, params):
+        await self.stream(response, DECADES_SQL, (), limit=None, id_column=None)
+
+    async def similar_tracks(self, response, match, params):
+        if self.similarity is None:
+            raise RequestError(503, "Índice de similaridade não construído")
+        module, index = self.similarity
+        track_id = unquote(match.group(1))
+        k = int_param(params, 'k', SIMILAR_K, 1, MAX_SIMILAR_K)
+
+        similar = await asyncio.get_running_loop().run_in_executor(
+            None, module.find_similar, index, track_id, k)
+        if similar is None:
+            raise RequestError(404, f"track_id não encontrado no índice: {track_id}")
+
+        ids = [neighbor for neighbor, _ in similar]
+        columns, rows = await self.pool.fetch_all(
+            TRACKS_BY_ID_SQL.format(placeholders=', '.join(['%s'] * len(ids))), ids)
+        details = {row[0]: dict(zip(columns, row)) for row in rows}
+
+        items = [{**details.get(neighbor, {'track_id': neighbor}), 'distancia': round(distance, 4)}
+                 for neighbor, distance in similar]
+        await send_json(response.writer, 200, {'track_id': track_id, 'itens': items}, response.keep_alive)
+
+    # -------- Listas paginadas --------
+
+    async def keyset_page(self, response, params, template, id_column):
+        limit = int_param(params, 'limite', PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        cursor = parse_cursor(params)
+        if cursor is None:
+            statement, args = template.format(where=''), ()
+        else:
+            popularity, last_id = cursor
+            statement = template.format(where=KEYSET_WHERE.format(id_column=id_column))
+            args = (popularity, popularity, last_id)
+        # Uma linha a mais só para saber se existe próxima página
+        await self.stream(response, statement, args + (limit + 1,), limit, id_column)
+
+    async def stream(self, response, statement, args, limit, id_column):
+        """Lê o cursor em lotes de FETCH_BATCH e envia cada lote como um bloco JSON"""
+        async with self.pool.acquire() as connection:
+            db_cursor = await self.pool.run(self.pool.execute, connection, statement, args)
+            try:
+                columns = [column[0] for column in db_cursor.description]
+                await response.start()
+                await response.send('{"itens": [')
+
+                sent, last, has_more = 0, None, False
+                while True:
+                    rows = await self.pool.run(db_cursor.fetchmany, FETCH_BATCH)
+                    if not rows:
+                        break
+                    if limit is not None and sent + len(rows) > limit:
+                        has_more = True
+                        rows = rows[:limit - sent]
+                    if rows:
+                        await response.send(('' if sent == 0 else ', ') +
+                                            ', '.join(dumps(dict(zip(columns, row))) for row in rows))
+                        sent += len(rows)
+                        last = dict(zip(columns, rows[-1]))
+                    if has_more:
+                        # Esvazia o cursor (o MySQL exige ler tudo antes da próxima consulta)
+                        await self.pool.run(db_cursor.fetchall)
+                        break
+            finally:
+                await self.pool.run(self.pool.finish, db_cursor)
+
+        next_cursor = f"{last['popularity']}:{last[id_column]}" if has_more else None
+        await response.send(f'], "total": {sent}, "proximo": {dumps(next_cursor)}}}')
+        await response.end()
+
+    # -------- Conexões --------
+
+    async def dispatch(self, method, target, response):
+        parts = urlsplit(target)
+        params = parse_qs(parts.query)
+        if method != 'GET':
+            raise RequestError(405, "Somente GET")
+        for pattern, handler in self.routes:
+            match = pattern.match(parts.path)
+            if match:
+                return await handler(response, match, params)
+        raise RequestError(404, f"Rota inexistente: {parts.path}")
+
+    async def handle(self, reader, writer):
+        """Uma conexão HTTP/1.1 (várias requisições com keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await send_json(writer, 400, {'erro': 'Requisição inválida'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip().lower()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection') != 'close'
+                response = ChunkedResponse(writer, keep_alive, chunked=version == 'HTTP/1.1')
+
+                try:
+                    await self.dispatch(method, target, response)
+                except RequestError as e:
+                    await send_json(writer, e.status, {'erro': str(e)}, keep_alive)
+                except (ConnectionError, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    print(f"  ❌ {method} {target}: {e}")
+                    # Erro no meio de uma resposta em blocos: só resta encerrar a conexão
+                    if not response.started:
+                        await send_json(writer, 500, {'erro': 'Erro interno'}, keep_alive=False)
+                    break
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(backend='mysql', host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=POOL_SIZE):
+    pool = ConnectionPool(connection_factory(backend), backend, pool_size)
+    api = MusicMetricsAPI(pool)
+    await api.start()
+
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"\n🌐 API em http://{host}:{port} ({backend}, pool de {pool_size} conexões)")
+    print("   /saude | /musicas/top | /artistas/top | /decadas | /musicas/<track_id>/parecidas")
+    print("   Paginação: ?limite=50&cursor=<'proximo' da página anterior>  (Ctrl+C para parar)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await pool.close()
@@ -0,0 +1,250 @@
+"""
+MusicMetrics - CLI
+Uso (na raiz do repositório): python -m musicmetrics <etapa> [argumentos da etapa]
+
+Só a biblioteca padrão é importada aqui; as dependências pesadas de cada etapa são
+carregadas sob demanda por pipeline.run_stage
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+from musicmetrics import __version__
+from musicmetrics.pipeline import ROOT_PATH, STAGES, script_path, run_stage, load_script
+
+# ============================================
+
+# Orçamento de inicialização a frio de 'python -m musicmetrics --help' (ms, mediana),
+# descontado o tempo do próprio interpretador ('python -c pass')
+COLD_START_BUDGET_MS = 100
+COLD_START_RUNS = 7
+
+# Não podem estar carregados depois de importar a CLI
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'mysql', 'dotenv', 'spotipy', 'duckdb']
+
+# ============================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='musicmetrics',
+        description='Pipeline MusicMetrics: exploração, limpeza, carga e análises',
+        epilog="Os argumentos após a etapa são repassados ao script (ex.: carregar --backend duckdb)"
+    )
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='mostra o script que seria executado, sem importá-lo')
+
+    subparsers = parser.add_subparsers(dest='stage', metavar='<etapa>')
+    for stage, (_, description) in STAGES.items():
+        # add_help=False: '--help' depois da etapa vai para o argparse do script
+        subparsers.add_parser(stage, help=description, add_help=False)
+
+    budget_parser = subparsers.add_parser('tempo-inicio', help='Mede a inicialização a frio da CLI')
+    budget_parser.add_argument('--runs', type=int, default=COLD_START_RUNS)
+    budget_parser.add_argument('--budget-ms', type=float, default=COLD_START_BUDGET_MS)
+
+    schedule_parser = subparsers.add_parser('agendar', help='Serviço de extração/limpeza/carga agendadas')
+    schedule_parser.add_argument('--agora', metavar='TAREFA', default=None,
+                                 help='executa uma tarefa imediatamente e sai')
+    schedule_parser.add_argument('--proximas', action='store_true',
+                                 help='só lista os próximos horários de cada tarefa')
+
+    migrate_parser = subparsers.add_parser('migrar', help='Aplica as migrações do esquema MySQL (sql/migracoes/)')
+    migrate_parser.add_argument('--status', action='store_true',
+                                help='só lista as migrações aplicadas e pendentes')
+    migrate_parser.add_argument('--recarga', action='store_true',
+                                help='recarga completa com os índices secundários adiados')
+    migrate_parser.add_argument('--indices-ativos', action='store_true',
+                                help='com --recarga: mantém os índices durante a carga (linha de base)')
+    migrate_parser.add_argument('--reconstruir-indices', action='store_true',
+                                help='recria índices pendentes de uma recarga interrompida')
+
+    query_parser = subparsers.add_parser('consultar', help='Queries nomeadas de 02_Queries_Analiticas.sql, com cache')
+    query_parser.add_argument('nome', nargs='?', help='nome da query (-- nome: ... no arquivo SQL)')
+    query_parser.add_argument('--backend', choices=['mysql', 'duckdb'], default='mysql')
+    query_parser.add_argument('--listar', action='store_true', help='lista as queries nomeadas')
+    query_parser.add_argument('--sem-cache', action='store_true', help='executa direto no banco')
+    query_parser.add_argument('--limpar-cache', action='store_true', help='apaga os resultados guardados')
+    query_parser.add_argument('--benchmark', action='store_true',
+                              help='compara banco x cache em disco x cache em memória')
+
+    serve_parser = subparsers.add_parser('servir', help='API HTTP local (JSON) sobre as views analíticas')
+    serve_parser.add_argument('--backend', choices=['mysql', 'duckdb'], default='mysql')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--porta', type=int, default=8050)
+    serve_parser.add_argument('--pool', type=int, default=4, help='conexões com o banco')
+
+    return parser
+
+def run_scheduler(args):
+    from musicmetrics.scheduler import Scheduler
+
+    print("\n" + "=" * 80)
+    print("⏰ MUSICMETRICS - AGENDADOR")
+    print("=" * 80)
+
+    scheduler = Scheduler()
+    if args.proximas:
+        for name, moment in scheduler.upcoming().items():
+            print(f"  🗓️ {name} ({scheduler.jobs[name].expression}): {moment:%Y-%m-%d %H:%M}")
+        return 0
+
+    if args.agora:
+        if args.agora not in scheduler.jobs:
+            print(f"❌ Tarefa desconhecida: {args.agora} (disponíveis: {', '.join(scheduler.jobs)})")
+            return 1
+        metrics = scheduler.submit(args.agora, trigger='manual').result()
+        scheduler.shutdown()
+        return 0 if metrics['status'] == 'ok' else 1
+
+    scheduler.serve()
+    return 0
+
+def run_migrations(args):
+    from musicmetrics import migrations
+
+    print("\n" + "=" * 80)
+    print("🗄️ MUSICMETRICS - MIGRAÇÕES")
+    print("=" * 80)
+
+    connection = migrations.connect()
+    if connection is None:
+        print("   Verifique suas credenciais no arquivo .env")
+        return 1
+
+    try:
+        if args.status:
+            migrations.show_status(connection)
+            return 0
+        if args.reconstruir_indices:
+            print(f"  ✅ {migrations.rebuild_secondary_indexes(connection)} índices reconstruídos")
+            return 0
+        if args.recarga:
+            ok = migrations.full_reload(connection, defer_indexes=not args.indices_ativos)
+        else:
+            ok = migrations.migrate(connection)
+        return 0 if ok else 1
+    finally:
+        connection.close()
+
+def run_queries(args):
+    from musicmetrics import queries
+
+    loader = load_script('carregar')
+    connection = (loader.connect_to_duckdb() if args.backend == 'duckdb' else loader.connect_to_mysql())
+    if connection is None:
+        return 1
+
+    try:
+        cache = queries.QueryCache(connection, backend=args.backend)
+        if args.limpar_cache:
+            cache.clear()
+            print("  🧹 Cache de consultas apagado")
+        if args.listar or not (args.nome or args.benchmark or args.limpar_cache):
+            print("\n📋 Queries nomeadas:")
+            for name in cache.queries:
+                print(f"   - {name}")
+        if args.benchmark:
+            queries.run_benchmark(cache)
+        if args.nome:
+            if args.nome not in cache.queries:
+                print(f"❌ Query desconhecida: {args.nome} (disponíveis: {', '.join(cache.queries)})")
+                return 1
+            start = time.perf_counter()
+            df, origin = cache.run(args.nome, use_cache=not args.sem_cache)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"\n📊 {args.nome} ({len(df)} linhas, {origin}, {elapsed:.2f} ms)")
+            print(df.to_string(index=False))
+        return 0
+    finally:
+        connection.close()
+
+def run_api(args):
+    import asyncio
+    from musicmetrics import api
+
+    print("\n" + "=" * 80)
+    print("🌐 MUSICMETRICS - API")
+    print("=" * 80)
+
+    try:
+        asyncio.run(api.serve(args.backend, args.host, args.porta, args.pool))
+    except KeyboardInterrupt:
+        print("\n🛑 API encerrada")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+def _median_ms(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_PATH, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def measure_cold_start(runs=COLD_START_RUNS, budget_ms=COLD_START_BUDGET_MS):
+    """Compara a inicialização da CLI com a do interpretador vazio e confere os imports pesados"""
+    print("\n⏱️ Medindo inicialização a frio...")
+
+    interpreter = _median_ms([sys.executable, '-c', 'pass'], runs)
+    cli_help = _median_ms([sys.executable, '-m', 'musicmetrics', '--help'], runs)
+    overhead = cli_help - interpreter
+
+    probe = ("import sys, musicmetrics.cli; "
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    loaded = subprocess.run([sys.executable, '-c', probe], cwd=ROOT_PATH,
+                            capture_output=True, text=True, check=True).stdout.strip()
+
+    print(f"  Interpretador (python -c pass): {interpreter:.0f} ms")
+    print(f"  musicmetrics --help: {cli_help:.0f} ms (+{overhead:.0f} ms, orçamento {budget_ms:.0f} ms)")
+    print(f"  Módulos pesados carregados pela CLI: {loaded or 'nenhum'}")
+
+    ok = overhead <= budget_ms and not loaded
+    print(f"  {'✅ Dentro do orçamento' if ok else '❌ Fora do orçamento'}")
+    return 0 if ok else 1
+
+def split_stage_args(argv):
+    """Separa os argumentos da CLI dos argumentos repassados ao script da etapa"""
+    for idx, token in enumerate(argv):
+        if token in STAGES:
+            stage_args = argv[idx + 1:]
+            return argv[:idx + 1], stage_args[1:] if stage_args[:1] == ['--'] else stage_args
+    return argv, []
+
+def main(argv=None):
+    parser = build_parser()
+    cli_args, stage_args = split_stage_args(sys.argv[1:] if argv is None else list(argv))
+    args = parser.parse_args(cli_args)
+
+    if args.stage is None:
+        parser.print_help()
+        return 0
+
+    if args.stage == 'tempo-inicio':
+        return measure_cold_start(args.runs, args.budget_ms)
+
+    if args.stage == 'agendar':
+        return run_scheduler(args)
+
+    if args.stage == 'migrar':
+        return run_migrations(args)
+
+    if args.stage == 'consultar':
+        return run_queries(args)
+
+    if args.stage == 'servir':
+        return run_api(args)
+
+    if args.dry_run:
+        print(f"{script_path(args.stage)} {' '.join(stage_args)}".strip())
+        return 0
+
+    return run_stage(args.stage, stage_args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+MusicMetrics - Configuração compartilhada
+Credenciais do MySQL e cliente autenticado do Spotify, lidos do .env. Usado pelos scripts
+em scripts/ e pelo pacote; dotenv e spotipy só são importados na primeira chamada
+"""
+
+import os
+
+# ============================================
+
+# Configurações do banco (lidas do .env por load_db_config, só ao conectar)
+DB_CONFIG = {}
+
+# Escopos pedidos na autenticação OAuth do Spotify
+SPOTIFY_SCOPE = 'user-top-read user-read-recently-played user-library-read playlist-read-private'
+
+# ============================================
+
+_spotify = None
+
+def load_db_config():
+    """Carrega o .env e preenche DB_CONFIG"""
+    from dotenv import load_dotenv
+
+    # Carregar variáveis de ambiente
+    load_dotenv()
+    DB_CONFIG.update({
+        'host': os.getenv('MYSQL_HOST', 'localhost'),
+        'user': os.getenv('MYSQL_USER', 'root'),
+        'password': os.getenv('MYSQL_PASSWORD'),
+        'database': os.getenv('MYSQL_DATABASE', 'MusicMetrics'),
+        'port': int(os.getenv('MYSQL_PORT', 3306))
+    })
+    return DB_CONFIG
+
+def get_spotify_client():
+    """Cria o cliente autenticado na primeira chamada (importar um script não exige credenciais)"""
+    global _spotify
+    if _spotify is None:
+        import spotipy
+        from spotipy.oauth2 import SpotifyOAuth
+        from dotenv import load_dotenv
+
+        # Carregar variáveis de ambiente
+        load_dotenv()
+
+        # Configurar autenticação
+        _spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
+            client_id=os.getenv('SPOTIFY_CLIENT_ID'),
+            client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
+            redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI'),
+            scope=SPOTIFY_SCOPE
+        ))
+    return _spotify
@@ -0,0 +1,356 @@
+"""
+MusicMetrics - Migrações do esquema e ciclo de vida dos índices
+Aplica em ordem os arquivos sql/migracoes/V<versão>__<descrição>.sql ainda não aplicados,
+registrando versão e checksum em schema_migracoes. Na recarga completa, os índices
+secundários são removidos antes da carga em massa e reconstruídos depois, em um único
+ALTER TABLE por tabela (o InnoDB não tem DISABLE KEYS)
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from datetime import datetime
+
+from musicmetrics.config import load_db_config
+from musicmetrics.pipeline import ROOT_PATH, load_script
+
+# ============================================
+
+MIGRATIONS_PATH = os.path.join(ROOT_PATH, 'sql', 'migracoes')
+MIGRATION_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TIMINGS_FILE = 'carga_tempos.json'
+
+# Ordem de carga (pais antes dos filhos); o TRUNCATE usa a ordem inversa
+LOAD_TABLES = ['dim_artists', 'dim_tracks', 'dim_audio_features']
+
+HISTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migracoes (
+        versao INT PRIMARY KEY,
+        descricao VARCHAR(255) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        duracao_ms INT NOT NULL,
+        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB
+"""
+
+# Definições dos índices removidos: sobrevivem a uma carga interrompida
+DEFERRED_INDEXES_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_indices_adiados (
+        tabela VARCHAR(64) NOT NULL,
+        indice VARCHAR(64) NOT NULL,
+        definicao TEXT NOT NULL,
+        PRIMARY KEY (tabela, indice)
+    ) ENGINE=InnoDB
+"""
+
+# ============================================
+
+def read_migrations(path=MIGRATIONS_PATH):
+    """[(versão, descrição, checksum, comandos), ...] em ordem de versão"""
+    splitter = load_script('carregar').split_sql_statements
+    migrations = []
+    for filename in sorted(os.listdir(path)):
+        match = MIGRATION_PATTERN.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(path, filename), encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append((int(match.group(1)), match.group(2),
+                           hashlib.sha256(sql.encode('utf-8')).hexdigest(), splitter(sql)))
+
+    versions = [version for version, *_ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Versões de migração repetidas em {path}")
+    return sorted(migrations)
+
+def connect():
+    """Conexão MySQL; cria o banco do .env se ele ainda não existir"""
+    import mysql.connector
+    from mysql.connector import Error
+
+    config = dict(load_db_config())
+    database = config.pop('database')
+    try:
+        connection = mysql.connector.connect(**config)
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        cursor.close()
+        connection.database = database
+        print(f"✅ Conectado ao MySQL: {database}")
+        return connection
+    except Error as e:
+        print(f"❌ Erro ao conectar ao MySQL: {e}")
+        return None
+
+def applied_migrations(cursor):
+    cursor.execute(HISTORY_DDL)
+    cursor.execute("SELECT versao, descricao, checksum, aplicada_em FROM schema_migracoes ORDER BY versao")
+    return {version: (description, checksum, applied_at)
+            for version, description, checksum, applied_at in cursor.fetchall()}
+
+def show_status(connection):
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+
+    print("\n📜 Migrações:")
+    for version, description, checksum, _ in read_migrations():
+        if version not in applied:
+            print(f"   ⏳ V{version:03d} {description} (pendente)")
+        elif applied[version][1] != checksum:
+            print(f"   ⚠️ V{version:03d} {description} (arquivo alterado depois de aplicado)")
+        else:
+            print(f"   ✅ V{version:03d} {description} ({applied[version][2]:%Y-%m-%d %H:%M})")
+
+def migrate(connection):
+    """Aplica as migrações pendentes; False se alguma falhar ou se uma aplicada foi alterada"""
+    from mysql.connector import Error
+
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+        pending = []
+        for version, description, checksum, statements in read_migrations():
+            if version not in applied:
+                pending.append((version, description, checksum, statements))
+            elif applied[version][1] != checksum:
+                print(f"❌ V{version:03d} {description} foi alterada depois de aplicada: "
+                      "crie uma nova migração em vez de editar esta")
+                return False
+
+        if not pending:
+            print("  ⏭️ Esquema atualizado: nenhuma migração pendente")
+            return True
+
+        for version, description, checksum, statements in pending:
+            start = time.perf_counter()
+            # DDL no MySQL faz commit implícito: a versão só é registrada se todos os comandos passarem
+            for statement in statements:
+                cursor.execute(statement)
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            cursor.execute(
+                "INSERT INTO schema_migracoes (versao, descricao, checksum, duracao_ms) VALUES (%s, %s, %s, %s)",
+                (version, description, checksum, duration_ms)
+            )
+            connection.commit()
+            print(f"  ✅ V{version:03d} {description} aplicada ({duration_ms} ms)")
+        return True
+    except Error as e:
+        print(f"  ❌ Erro na migração: {e}")
+        connection.rollback()
+        return False
+    finally:
+        cursor.close()
+
+# -------- Índices secundários --------
+
+def secondary_indexes(cursor, tables=LOAD_TABLES):
+    """{tabela: {índice: definição}} dos índices não únicos que não sustentam FOREIGN KEYs
+
+    A definição reproduz o tipo (FULLTEXT/SPATIAL/HASH), a ordem de cada coluna (DESC) e
+    os prefixos; índices funcionais (sem COLUMN_NAME) ficam onde estão
+    """
+    database = connection_database(cursor)
+    placeholders = ', '.join(['%s'] * len(tables))
+
+    cursor.execute(f"""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders}) AND REFERENCED_TABLE_NAME IS NOT NULL
+    """, (database, *tables))
+    foreign_key_columns = set(cursor.fetchall())
+
+    cursor.execute(f"""
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, SUB_PART, COLLATION, INDEX_TYPE
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders}) AND NON_UNIQUE = 1
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """, (database, *tables))
+
+    columns, index_types = {}, {}
+    for table, index, column, sub_part, collation, index_type in cursor.fetchall():
+        key = (table, index)
+        index_types[key] = index_type
+        if key in columns and columns[key] is None:
+            continue
+        if column is None:
+            columns[key] = None  # índice funcional: a expressão não é reconstruída aqui
+            continue
+        columns.setdefault(key, []).append(
+            f"`{column}`" + (f"({sub_part})" if sub_part else '') + (' DESC' if collation == 'D' else '')
+        )
+        if len(columns[key]) == 1 and (table, column) in foreign_key_columns:
+            columns[key] = None  # a FOREIGN KEY precisa de um índice começando pela coluna
+
+    indexes = {}
+    for (table, index), parts in columns.items():
+        if parts is None:
+            continue
+        index_type = index_types[(table, index)]
+        if index_type in ('FULLTEXT', 'SPATIAL'):
+            definition = f"{index_type} INDEX `{index}` ({', '.join(parts)})"
+        else:
+            using = ' USING HASH' if index_type == 'HASH' else ''
+            definition = f"INDEX `{index}` ({', '.join(parts)}){using}"
+        indexes.setdefault(table, {})[index] = definition
+    return indexes
+
+def connection_database(cursor):
+    cursor.execute("SELECT DATABASE()")
+    return cursor.fetchone()[0]
+
+def drop_secondary_indexes(connection, tables=LOAD_TABLES):
+    """Salva as definições em schema_indices_adiados e remove os índices (um ALTER por tabela)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(DEFERRED_INDEXES_DDL)
+        indexes = secondary_indexes(cursor, tables)
+        dropped = 0
+        for table, definitions in indexes.items():
+            cursor.executemany(
+                "REPLACE INTO schema_indices_adiados (tabela, indice, definicao) VALUES (%s, %s, %s)",
+                [(table, index, definition) for index, definition in definitions.items()]
+            )
+            connection.commit()
+            cursor.execute(f"ALTER TABLE `{table}` " + ', '.join(f"DROP INDEX `{index}`" for index in definitions))
+            dropped += len(definitions)
+            print(f"  🗑️ {table}: {', '.join(definitions)}")
+        return dropped
+    finally:
+        cursor.close()
+
+def rebuild_secondary_indexes(connection):
+    """Recria os índices salvos, todos de uma vez por tabela (uma única passada sobre os dados)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(DEFERRED_INDEXES_DDL)
+        cursor.execute("SELECT tabela, indice, definicao FROM schema_indices_adiados ORDER BY tabela, indice")
+        pending = {}
+        for table, index, definition in cursor.fetchall():
+            pending.setdefault(table, {})[index] = definition
+
+        for table, definitions in pending.items():
+            start = time.perf_counter()
+            cursor.execute(f"ALTER TABLE `{table}` " + ', '.join(f"ADD {d}" for d in definitions.values()))
+            cursor.execute("DELETE FROM schema_indices_adiados WHERE tabela = %s", (table,))
+            connection.commit()
+            print(f"  🔨 {table}: {len(definitions)} índices reconstruídos em {time.perf_counter() - start:.1f} s")
+        return sum(len(definitions) for definitions in pending.values())
+    finally:
+        cursor.close()
+
+# -------- Recarga completa --------
+
+def truncate_tables(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for table in reversed(LOAD_TABLES):
+            cursor.execute(f"TRUNCATE TABLE `{table}`")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        connection.commit()
+    finally:
+        cursor.close()
+
+def run_post_load_updates(connection):
+    """Ajustes pós-carga de 01_Criacao_Banco_de_Dados.sql (ex.: genres 'nan' -> NULL)"""
+    loader = load_script('carregar')
+    statements = [s for s in loader.read_sql_file(loader.SCHEMA_SQL_FILE) if s.split(None, 1)[0].upper() == 'UPDATE']
+    cursor = connection.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+        connection.commit()
+    finally:
+        cursor.close()
+
+def record_timings(mode, timings):
+    """Guarda os tempos da recarga e compara com a última recarga no outro modo"""
+    path = os.path.join(PROCESSED_DATA_PATH, TIMINGS_FILE)
+    history = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            history = json.load(f)
+
+    history[mode] = {**timings, 'medido_em': datetime.now().isoformat(timespec='seconds')}
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+
+    other = 'indices_ativos' if mode == 'indices_adiados' else 'indices_adiados'
+    print(f"\n⏱️ Recarga ({mode}): {timings['total_s']:.1f} s "
+          f"(carga {timings['carga_s']:.1f} s + índices {timings['indices_s']:.1f} s)")
+    if other in history:
+        before = history[other]['total_s']
+        diff = timings['total_s'] - before
+        print(f"   Última recarga com {other}: {before:.1f} s -> diferença {diff:+.1f} s "
+              f"({diff / max(before, 1e-9) * 100:+.1f}%)")
+    else:
+        print(f"   Para comparar, rode também a recarga com {other.replace('_', ' ')}")
+
+def full_reload(connection, defer_indexes=True):
+    """Migra, esvazia as tabelas e recarrega tudo, com os índices secundários adiados ou ativos"""
+    loader = load_script('carregar')
+
+    paths = [os.path.join(loader.PROCESSED_DATA_PATH, name)
+             for name in (loader.ARTISTS_FILE, loader.TRACKS_FILE, loader.AUDIO_FEATURES_FILE)]
+    if not all(os.path.exists(path) for path in paths[:2]):
+        print("❌ Arquivos processados não encontrados (execute 02_Limpeza_e_Transformacao.py)")
+        return False
+
+    if not migrate(connection):
+        return False
+
+    df_artists, df_tracks = loader.load_csv(paths[0]), loader.load_csv(paths[1])
+    df_features = loader.load_csv(paths[2]) if os.path.exists(paths[2]) else None
+    if df_artists is None or df_tracks is None:
+        return False
+
+    # Depois do TRUNCATE os dados já mudaram: a versão é trocada mesmo se a carga falhar,
+    # senão o cache de consultas continuaria servindo os resultados da carga anterior
+    print("\n🧹 Esvaziando tabelas...")
+    try:
+        truncate_tables(connection)
+
+        index_time = 0.0
+        if defer_indexes:
+            print("\n🗑️ Removendo índices secundários...")
+            start = time.perf_counter()
+            dropped = drop_secondary_indexes(connection)
+            index_time += time.perf_counter() - start
+            print(f"  ✅ {dropped} índices removidos")
+
+        start = time.perf_counter()
+        ok = loader.load_artists(connection, df_artists) and loader.load_tracks(connection, df_tracks)
+        if ok and df_features is not None:
+            ok = loader.load_audio_features(connection, df_features)
+        load_time = time.perf_counter() - start
+
+        # Mesmo com falha na carga os índices voltam (senão as consultas ficam sem índice)
+        if defer_indexes:
+            print("\n🔨 Reconstruindo índices secundários...")
+            start = time.perf_counter()
+            rebuild_secondary_indexes(connection)
+            index_time += time.perf_counter() - start
+
+        if not ok:
+            print("❌ Falha na carga")
+            return False
+
+        run_post_load_updates(connection)
+    finally:
+        loader.bump_data_version(connection)
+
+    loader.verify_load(connection)
+    record_timings('indices_adiados' if defer_indexes else 'indices_ativos', {
+        'carga_s': round(load_time, 3),
+        'indices_s': round(index_time, 3),
+        'total_s': round(load_time + index_time, 3),
+        'musicas': len(df_tracks),
+    })
+    return True
@@ -0,0 +1,77 @@
+"""
+MusicMetrics - Registro das etapas do pipeline
+Mapeia cada comando da CLI para o script correspondente em scripts/, que só é
+importado (com pandas, numpy, MySQL...) quando a etapa é de fato executada
+"""
+
+import os
+import sys
+import importlib.util
+
+# ============================================
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_PATH = os.path.join(ROOT_PATH, 'scripts')
+
+# comando -> (script relativo a scripts/, descrição)
+STAGES = {
+    'explorar': ('01_Exploracao_Inicial.py', 'Exploração inicial dos CSVs brutos'),
+    'limpar': ('02_Limpeza_e_Transformacao.py', 'Limpeza, validação e arquivos processados'),
+    'carregar': ('03_Carregamento_dos_Dados.py', 'Carga no MySQL (ou DuckDB)'),
+    'analisar': ('04_Analises_em_Memoria.py', 'Queries analíticas em memória (sem MySQL)'),
+    'similaridade': ('05_Indice_de_Similaridade.py', 'Índice de músicas parecidas'),
+    'exportar': ('06_Exportacao_Power_BI.py', 'Tabelas-resumo para o Power BI'),
+    'correlacoes': ('07_Correlacoes.py', 'Correlações entre features e popularidade'),
+    'duplicatas': ('08_Deteccao_de_Duplicatas.py', 'Agrupa versões e remasters da mesma música'),
+    'buscar': ('09_Busca.py', 'Busca de músicas e artistas por nome (prefixo/trecho)'),
+    'letras': ('10_Analise_de_Letras.py', 'Estatísticas e TF-IDF das letras das músicas'),
+    'diagnostico': ('diagnostico.py', 'Integridade referencial dos arquivos processados'),
+    'medir-chaves': ('medicao_chaves.py', 'Tamanho de índices e tempo de joins no MySQL'),
+    'carga-api': ('teste_de_carga_api.py', 'Teste de carga da API local (p50/p99 por rota)'),
+    'spotify-teste': (os.path.join('Scripts futuros', '00_Teste_de_Conecao_Spotify.py'),
+                      'Testa a conexão com a API do Spotify'),
+    'spotify-extrair': (os.path.join('Scripts futuros', '000_Extracao_de_Dados_Pessoais_Spotify.py'),
+                        'Extrai dados pessoais do Spotify'),
+    'spotify-compactar': (os.path.join('Scripts futuros', '001_Compactacao_de_Snapshots.py'),
+                          'Compacta os snapshots do Spotify em Parquet particionado'),
+    'spotify-evolucao': (os.path.join('Scripts futuros', '002_Evolucao_do_Gosto.py'),
+                         'Evolução do gosto entre snapshots (Jaccard, RBO, churn)'),
+    'spotify-padroes': (os.path.join('Scripts futuros', '003_Padroes_de_Escuta.py'),
+                        'Cubo dia da semana x hora das reproduções'),
+}
+
+# ============================================
+
+def script_path(stage):
+    return os.path.join(SCRIPTS_PATH, STAGES[stage][0])
+
+def load_script(stage):
+    """Importa o script de uma etapa como módulo (sem executar o main)
+
+    Os nomes dos scripts começam com dígitos, então o import é feito pelo caminho.
+    Ex.: load_script('analisar').load_model()
+    """
+    module_name = 'musicmetrics_' + stage.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, script_path(stage))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+def run_stage(stage, args):
+    """Executa o main() de uma etapa com os argumentos repassados pela CLI"""
+    module = load_script(stage)
+    previous_argv = sys.argv
+    sys.argv = [script_path(stage)] + list(args)
+    try:
+        result = module.main()
+    finally:
+        sys.argv = previous_argv
+    return result if isinstance(result, int) else 0
@@ -0,0 +1,176 @@
+"""
+MusicMetrics - Queries analíticas com cache de resultados
+Executa as queries nomeadas ('-- nome: ...') de sql/02_Queries_Analiticas.sql e guarda os
+resultados em memória e em data/processed/cache_consultas/. A chave é o texto da query mais a
+versão dos dados (tabela dados_versao, trocada pelo carregamento): depois de uma carga nova
+as entradas antigas deixam de casar e são apagadas na próxima gravação
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+
+from musicmetrics.pipeline import ROOT_PATH, load_script
+
+# ============================================
+
+QUERIES_SQL_PATH = os.path.join(ROOT_PATH, 'sql', '02_Queries_Analiticas.sql')
+NAME_PATTERN = re.compile(r'^\s*--\s*nome:\s*(\w+)', re.MULTILINE)
+
+CACHE_PATH = '../MusicMetrics/data/processed/cache_consultas/'
+
+# ============================================
+
+def read_named_queries(path=QUERIES_SQL_PATH):
+    """{nome: comando} das queries marcadas com '-- nome: <nome>' logo acima do SELECT"""
+    splitter = load_script('carregar').split_sql_statements
+    with open(path, encoding='utf-8') as f:
+        chunks = f.read().split(';')
+
+    queries = {}
+    for chunk in chunks:
+        match = NAME_PATTERN.search(chunk)
+        statements = splitter(chunk)
+        if match and statements:
+            queries[match.group(1)] = statements[0]
+    return queries
+
+def cache_key(version, sql):
+    return hashlib.sha256(f"{version}\n{sql}".encode('utf-8')).hexdigest()[:32]
+
+class QueryCache:
+    """Resultados das queries nomeadas por (versão dos dados, texto da query)
+
+    Ordem de busca: memória do processo -> arquivo em cache_consultas/ -> banco
+    """
+
+    def __init__(self, connection, backend='mysql', path=CACHE_PATH):
+        self.connection = connection
+        self.backend = backend
+        self.path = path
+        self.loader = load_script('carregar')
+        self.queries = read_named_queries()
+        self.memory = {}
+
+    def sql(self, name):
+        """Texto da query como é executado no backend (traduzido no DuckDB)"""
+        statement = self.queries[name]
+        return self.loader.translate_to_duckdb(statement) if self.backend == 'duckdb' else statement
+
+    def data_version(self):
+        """Versão atual dos dados (None = tabela dados_versao ausente: cache desligado)"""
+        query = "SELECT versao FROM dados_versao WHERE id = 1"
+        if self.backend == 'duckdb':
+            import duckdb
+            try:
+                row = self.connection.execute(query).fetchone()
+            except duckdb.Error:
+                return None
+        else:
+            from mysql.connector import Error
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(query)
+                row = cursor.fetchone()
+            except Error:
+                return None
+            finally:
+                cursor.close()
+        # Tabela criada mas nenhuma carga registrada ainda
+        return row[0] if row else 0
+
+    def execute(self, sql):
+        import pandas as pd
+
+        if self.backend == 'duckdb':
+            return self.connection.execute(sql).df()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+            return pd.DataFrame(cursor.fetchall(), columns=cursor.column_names)
+        finally:
+            cursor.close()
+
+    # -------- Arquivos --------
+
+    def _version_path(self, version):
+        return os.path.join(self.path, f"{self.backend}_{version}")
+
+    def _read(self, version, key):
+        import pandas as pd
+
+        base = os.path.join(self._version_path(version), key)
+        if os.path.exists(base + '.parquet'):
+            return pd.read_parquet(base + '.parquet')
+        if os.path.exists(base + '.csv'):
+            return pd.read_csv(base + '.csv')
+        return None
+
+    def _write(self, version, key, df):
+        directory = self._version_path(version)
+        os.makedirs(directory, exist_ok=True)
+
+        # Entradas de versões anteriores (do mesmo backend) não serão mais lidas
+        prefix = f"{self.backend}_"
+        for entry in os.listdir(self.path):
+            if entry.startswith(prefix) and os.path.join(self.path, entry) != directory:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+
+        # Grava em arquivo temporário e renomeia: leitores nunca veem um arquivo pela metade
+        base = os.path.join(directory, key)
+        try:
+            df.to_parquet(base + '.tmp', index=False)
+            os.replace(base + '.tmp', base + '.parquet')
+        except ImportError:
+            df.to_csv(base + '.tmp', index=False)
+            os.replace(base + '.tmp', base + '.csv')
+
+    # -------- Consulta --------
+
+    def run(self, name, use_cache=True):
+        """(DataFrame, origem) com origem em 'memoria', 'disco' ou 'banco'"""
+        sql = self.sql(name)
+        version = self.data_version() if use_cache else None
+        if version is None:
+            return self.execute(sql), 'banco'
+
+        key = cache_key(version, sql)
+        if key in self.memory:
+            return self.memory[key][1], 'memoria'
+
+        df = self._read(version, key)
+        origin = 'disco'
+        if df is None:
+            df, origin = self.execute(sql), 'banco'
+            self._write(version, key, df)
+
+        if any(old_version != version for old_version, _ in self.memory.values()):
+            self.memory.clear()
+        self.memory[key] = (version, df)
+        return df, origin
+
+    def clear(self):
+        self.memory.clear()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def run_benchmark(cache):
+    """Tempo de cada query no banco x servida do disco x servida da memória"""
+    print(f"\n⏱️ {'Query':<28}{'banco':>12}{'disco':>12}{'memória':>12}")
+    for name in cache.queries:
+        start = time.perf_counter()
+        cache.execute(cache.sql(name))
+        database_ms = (time.perf_counter() - start) * 1000
+
+        cache.run(name)  # garante a entrada em disco
+        cache.memory.clear()
+        start = time.perf_counter()
+        cache.run(name)
+        disk_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        cache.run(name)
+        memory_ms = (time.perf_counter() - start) * 1000
+
+        print(f"   {name:<26}{database_ms:>9.2f} ms{disk_ms:>9.2f} ms{memory_ms:>9.2f} ms")
@@ -0,0 +1,281 @@
+"""
+MusicMetrics - Agendador
+Serviço de longa duração que executa extração, limpeza e carga incremental em horários
+no formato do cron, em um único processo "quente": os scripts são importados uma vez,
+o cliente do Spotify (sessão HTTP) e a conexão MySQL são reaproveitados entre execuções
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from musicmetrics.pipeline import load_script
+
+# ============================================
+
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+METRICS_FILE = 'agendador_metricas.jsonl'
+STATE_FILE = 'agendador_estado.json'
+
+# Tarefas: nome -> expressão cron (minuto hora dia mês dia-da-semana, 0 = domingo) e etapas
+SCHEDULE = {
+    'extracao': {'cron': '0 6 * * *', 'steps': ['extrair', 'compactar', 'evolucao', 'padroes']},
+    'processamento': {'cron': '30 6 * * 1', 'steps': ['limpar', 'carregar']},
+}
+
+# Intervalo máximo entre verificações do relógio (s)
+POLL_SECONDS = 30
+
+# Arquivos cuja alteração dispara uma nova carga (os demais casos são pulados)
+LOAD_INPUT_FILES = ['artists_limpo.csv', 'tracks_limpo.csv', 'audios_limpos.csv']
+
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+# ============================================
+
+def parse_cron_field(field, low, high):
+    """'*', '*/15', '1-5', '0,30' ou combinações -> conjunto de valores"""
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-'))
+        else:
+            start = end = int(part)
+        if not low <= start <= end <= high:
+            raise ValueError(f"Campo cron fora do intervalo {low}-{high}: {field}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+class CronSchedule:
+    """Expressão cron de 5 campos, com resolução de minuto"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expressão cron deve ter 5 campos: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_RANGES)
+        )
+        # Como no cron: com dia do mês e dia da semana restritos, basta um dos dois bater
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def matches_day(self, moment):
+        if moment.month not in self.months:
+            return False
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        """Próximo horário (minuto cheio) estritamente depois de moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if not self.matches_day(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Expressão cron nunca dispara: {self.expression}")
+
+class Scheduler:
+    """Executa as tarefas em uma única thread de trabalho, sem sobreposição"""
+
+    def __init__(self, schedule=SCHEDULE):
+        self.jobs = {name: CronSchedule(job['cron']) for name, job in schedule.items()}
+        self.steps = {name: job['steps'] for name, job in schedule.items()}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='musicmetrics')
+        self.lock = threading.Lock()
+        self.active = {}      # tarefa -> Future em andamento ou na fila
+        self.pending = {}     # tarefa -> nº de disparos agrupados enquanto ela rodava
+        self.connection = None
+        self.stop_event = threading.Event()
+
+    # -------- Recursos reaproveitados entre execuções --------
+
+    def mysql_connection(self):
+        """Conexão MySQL aberta uma vez; ping com reconexão antes de cada uso"""
+        loader = load_script('carregar')
+        if self.connection is None:
+            self.connection = loader.connect_to_mysql()
+        else:
+            self.connection.ping(reconnect=True, attempts=3, delay=5)
+        return self.connection
+
+    # -------- Etapas --------
+
+    def step_extrair(self):
+        # O cliente do Spotify fica em cache no módulo (mesma sessão HTTP a cada ciclo)
+        load_script('spotify-extrair').save_data()
+
+    def step_compactar(self):
+        # Os CSVs do snapshot ficam em data/raw: apagar é opção manual (--remover-csv na CLI)
+        if not load_script('spotify-compactar').compact_snapshots():
+            raise RuntimeError("Compactação não executada")
+
+    def step_evolucao(self):
+        # Incremental: só compara os snapshots novos com o último já processado
+        load_script('spotify-evolucao').update_evolution()
+
+    def step_padroes(self):
+        if load_script('spotify-padroes').update_patterns() is None:
+            raise RuntimeError("Reproduções compactadas não encontradas")
+
+    def step_limpar(self):
+        load_script('limpar').main()
+
+    def step_carregar(self):
+        """Carga incremental: só recarrega se os arquivos processados mudaram (upsert no MySQL)
+
+        O upsert pela chave substituta só é seguro porque as chaves são estáveis entre execuções
+        da limpeza (mapa em processed/chaves/); o loader recusa a carga se elas não baterem com
+        as do banco. O estado só é gravado depois de todas as tabelas carregadas: uma falha
+        faz a próxima execução tentar de novo
+        """
+        loader = load_script('carregar')
+        paths = [os.path.join(PROCESSED_DATA_PATH, name) for name in LOAD_INPUT_FILES]
+        signature = {os.path.basename(p): os.path.getmtime(p) for p in paths if os.path.exists(p)}
+
+        state = self.read_state()
+        if state.get('carregar') == signature:
+            print("  ⏭️ Arquivos processados sem alteração: carga pulada")
+            return
+
+        connection = self.mysql_connection()
+        if connection is None:
+            raise RuntimeError("Não foi possível conectar ao MySQL")
+
+        artists_path, tracks_path, features_path = paths
+        df_artists = loader.load_csv(artists_path)
+        df_tracks = loader.load_csv(tracks_path)
+        if df_artists is None or df_tracks is None:
+            raise RuntimeError("Arquivos processados não encontrados")
+
+        # Os lotes são confirmados um a um: com falha no meio, parte dos dados já mudou e o
+        # cache de consultas também precisa de uma versão nova
+        try:
+            if not loader.load_artists(connection, df_artists) or not loader.load_tracks(connection, df_tracks):
+                raise RuntimeError("Falha na carga de artistas/músicas")
+            if os.path.exists(features_path):
+                df_features = loader.load_csv(features_path)
+                if df_features is None or not loader.load_audio_features(connection, df_features):
+                    raise RuntimeError("Falha na carga de audio features")
+        finally:
+            loader.bump_data_version(connection)
+
+        state['carregar'] = signature
+        self.write_state(state)
+
+    # -------- Estado e métricas --------
+
+    def read_state(self):
+        path = os.path.join(PROCESSED_DATA_PATH, STATE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_state(self, state):
+        os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+        with open(os.path.join(PROCESSED_DATA_PATH, STATE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+
+    def record_metrics(self, metrics):
+        os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+        with open(os.path.join(PROCESSED_DATA_PATH, METRICS_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(metrics, ensure_ascii=False) + '\n')
+
+        steps = ' | '.join(f"{step} {seconds:.1f} s" for step, seconds in metrics['steps'].items())
+        icon = '✅' if metrics['status'] == 'ok' else '❌'
+        print(f"{icon} [{metrics['job']}] {metrics['duration_s']:.1f} s ({steps})"
+              f"{' - ' + metrics['error'] if metrics.get('error') else ''}")
+
+    # -------- Execução --------
+
+    def run_job(self, name, trigger, coalesced=0):
+        started = datetime.now()
+        start = time.perf_counter()
+        metrics = {'job': name, 'trigger': trigger, 'started_at': started.isoformat(timespec='seconds'),
+                   'coalesced': coalesced, 'steps': {}, 'status': 'ok'}
+
+        print(f"\n▶️ [{name}] iniciado às {started:%Y-%m-%d %H:%M:%S} ({trigger})")
+        for step in self.steps[name]:
+            step_start = time.perf_counter()
+            try:
+                getattr(self, f'step_{step}')()
+            except Exception as e:
+                metrics['status'] = 'erro'
+                metrics['error'] = f"{step}: {e}"
+                break
+            finally:
+                metrics['steps'][step] = round(time.perf_counter() - step_start, 3)
+
+        metrics['duration_s'] = round(time.perf_counter() - start, 3)
+        self.record_metrics(metrics)
+        return metrics
+
+    def submit(self, name, trigger='agenda'):
+        """Enfileira a tarefa; se ela já está rodando, agrupa o disparo em uma única reexecução"""
+        with self.lock:
+            if name in self.active:
+                self.pending[name] = self.pending.get(name, 0) + 1
+                print(f"⏸️ [{name}] ainda em execução: disparo agrupado")
+                return None
+            future = self.executor.submit(self.run_job, name, trigger)
+            self.active[name] = future
+        future.add_done_callback(lambda _: self._finished(name))
+        return future
+
+    def _finished(self, name):
+        with self.lock:
+            del self.active[name]
+            coalesced = self.pending.pop(name, 0)
+            if not coalesced or self.stop_event.is_set():
+                return
+            future = self.executor.submit(self.run_job, name, 'agrupado', coalesced)
+            self.active[name] = future
+        future.add_done_callback(lambda _: self._finished(name))
+
+    def upcoming(self, now=None):
+        now = now or datetime.now()
+        return {name: schedule.next_after(now) for name, schedule in self.jobs.items()}
+
+    def serve(self):
+        """Laço principal: dorme até o próximo disparo (no máximo POLL_SECONDS por vez)"""
+        next_runs = self.upcoming()
+        for name, moment in next_runs.items():
+            print(f"  🗓️ {name} ({self.jobs[name].expression}): próxima execução {moment:%Y-%m-%d %H:%M}")
+
+        try:
+            while not self.stop_event.is_set():
+                now = datetime.now()
+                for name, moment in next_runs.items():
+                    if now >= moment:
+                        self.submit(name)
+                        next_runs[name] = self.jobs[name].next_after(now)
+                wait = min((min(next_runs.values()) - now).total_seconds(), POLL_SECONDS)
+                self.stop_event.wait(max(wait, 0.5))
+        except KeyboardInterrupt:
+            print("\n⏹️ Encerrando agendador...")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.stop_event.set()
+        self.executor.shutdown(wait=True)
+        if self.connection is not None and self.connection.is_connected():
+            self.connection.close()
+            print("🔌 Conexão com MySQL fechada")
@@ -6,6 +6,9 @@ Analisa os arquivos CSV do Kaggle para entender estrutura e qualidade dos dados
 import pandas as pd
 import numpy as np
 import os
+import argparse
+import csv
+import io
 
 # Caminho para a pasta onde estão os CSVs do Kaggle
 DATA_PATH = '../MusicMetrics/data/raw/'
@@ -14,6 +17,18 @@ DATA_PATH = '../MusicMetrics/data/raw/'
 TRACKS_FILE = 'tracks.csv'
 ARTISTS_FILE = 'artists.csv'
 
+# Modo streaming (--stream): linhas por bloco e parâmetros dos sketches
+STREAM_CHUNK_SIZE = 200_000
+KLL_K = 200
+HLL_PRECISION = 14
+MAX_EXACT_ROW_HASHES = 10_000_000
+
+# Modo amostragem (--sample): janela lida ao redor de cada posição sorteada e nível de confiança
+SAMPLE_SIZE = 20_000
+SAMPLE_WINDOW_BYTES = 4096
+SAMPLE_SEED = 42
+Z_95 = 1.96
+
 
 def analyze_csv(filepath, filename):
     """Analisa um arquivo CSV e mostra informações gerais"""
@@ -82,6 +97,431 @@ def analyze_csv(filepath, filename):
         print(f"❌ Erro ao ler arquivo: {e}")
         return None
 
+
+class RunningStats:
+    """Contagem, média e variância online (Welford/Chan), com mínimo e máximo"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        n_b = len(values)
+        if n_b == 0:
+            return
+        
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        
+        # Combinação de dois grupos (algoritmo paralelo de Chan)
+        n_a = self.count
+        total = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / total
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+    
+    @property
+    def std(self):
+        # Desvio padrão amostral, como o describe() do pandas
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class KLLSketch:
+    """Sketch KLL para quantis aproximados com memória limitada"""
+    
+    def __init__(self, k=KLL_K, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+    
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                
+                # Ordena, mantém um elemento a cada dois (offset aleatório) e sobe de nível
+                items = np.sort(self.levels[level])
+                if len(items) % 2:
+                    self.levels[level], items = items[-1:], items[:-1]
+                else:
+                    self.levels[level] = np.empty(0)
+                promoted = items[self.rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                
+                # Capacidades mudam quando um nível novo é criado: recomeçar
+                level = 0
+                continue
+            level += 1
+    
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.nan
+        weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1])
+        return items[order][min(position, len(items) - 1)]
+
+
+class HyperLogLog:
+    """Estimativa de valores distintos (HyperLogLog) sobre hashes de 64 bits"""
+    
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+    
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest_bits = 64 - self.p
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        
+        # Posição do primeiro bit 1 nos bits restantes (exato em float64 para p >= 11)
+        with np.errstate(divide='ignore'):
+            msb = np.floor(np.log2(rest.astype(np.float64)))
+        rank = np.where(rest == 0, rest_bits + 1, rest_bits - msb).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+    
+    def update(self, series):
+        self.update_hashes(pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy())
+    
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = np.count_nonzero(self.registers == 0)
+        
+        # Correção para cardinalidades pequenas (linear counting)
+        if estimate <= 2.5 * self.m and zeros > 0:
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class RowDuplicateSketch:
+    """Duplicatas por hash de linha: exato até MAX_EXACT_ROW_HASHES, depois HyperLogLog"""
+    
+    def __init__(self):
+        self.rows = 0
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.exact = True
+        self.hll = HyperLogLog(precision=16)
+    
+    def update(self, df):
+        # O hash depende do dtype e cada bloco infere o seu (1 em int64 vs 1.0 em float64 quando
+        # o bloco tem nulos): números viram float64 e booleanos object antes do hash
+        numeric = df.select_dtypes(include=[np.number]).columns
+        boolean = df.select_dtypes(include=['bool']).columns
+        df = df.astype({**{col: 'float64' for col in numeric}, **{col: object for col in boolean}})
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        self.rows += len(hashes)
+        self.hll.update_hashes(hashes)
+        
+        if self.exact:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) > MAX_EXACT_ROW_HASHES:
+                self.exact = False
+                self.hashes = np.empty(0, dtype=np.uint64)
+    
+    def duplicates(self):
+        distinct = len(self.hashes) if self.exact else min(self.hll.count(), self.rows)
+        return self.rows - distinct
+
+
+def profile_csv_streaming(filepath, filename, chunksize=STREAM_CHUNK_SIZE):
+    """Mesmas seções do analyze_csv em uma única passada por blocos, com memória limitada"""
+    print("=" * 80)
+    print(f"📊 ANALISANDO (streaming): {filename}")
+    print("=" * 80)
+    
+    try:
+        total_rows = 0
+        columns = None
+        null_counts = None
+        numeric_stats = {}
+        quantiles = {}
+        distinct = {}
+        samples = {}
+        duplicates = RowDuplicateSketch()
+        peak_chunk_mb = 0.0
+        
+        for chunk in pd.read_csv(filepath, chunksize=chunksize):
+            if columns is None:
+                # Metadados e primeiras linhas vêm do primeiro bloco
+                columns = chunk.dtypes
+                null_counts = pd.Series(0, index=chunk.columns)
+                numeric_cols = chunk.select_dtypes(include=[np.number]).columns
+                text_cols = chunk.select_dtypes(exclude=[np.number, 'bool']).columns[:5]
+                numeric_stats = {col: RunningStats() for col in numeric_cols}
+                quantiles = {col: KLLSketch(seed=i) for i, col in enumerate(numeric_cols)}
+                distinct = {col: HyperLogLog() for col in text_cols}
+                samples = {col: set() for col in text_cols}
+                head = chunk.head(3)
+            
+            total_rows += len(chunk)
+            peak_chunk_mb = max(peak_chunk_mb, chunk.memory_usage(deep=True).sum() / 1024**2)
+            null_counts += chunk.isnull().sum()
+            duplicates.update(chunk)
+            
+            for col in numeric_stats:
+                values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float)
+                numeric_stats[col].update(values)
+                quantiles[col].update(values)
+            
+            for col in distinct:
+                distinct[col].update(chunk[col])
+                # Guardar até 11 valores para listar colunas com poucas categorias
+                if len(samples[col]) <= 10:
+                    samples[col].update(chunk[col].dropna().unique()[:11].tolist())
+        
+        if columns is None:
+            print("  ⚠️ Arquivo vazio")
+            return None
+        
+        print(f"\n✅ Arquivo processado em blocos de {chunksize:,} linhas")
+        print(f"📏 Dimensões: {total_rows:,} linhas x {len(columns)} colunas")
+        print(f"💾 Tamanho em disco: {os.path.getsize(filepath) / 1024**2:.2f} MB "
+              f"(maior bloco em memória: {peak_chunk_mb:.2f} MB)")
+        
+        print(f"\n📋 Colunas ({len(columns)}):")
+        for i, (col, dtype) in enumerate(columns.items(), 1):
+            print(f"  {i}. {col} ({dtype})")
+        
+        print(f"\n👀 Primeiras 3 linhas:")
+        print(head.to_string())
+        
+        print(f"\n❓ Valores Nulos:")
+        if null_counts.sum() == 0:
+            print("  ✅ Nenhum valor nulo encontrado!")
+        else:
+            null_df = pd.DataFrame({
+                'Coluna': null_counts.index,
+                'Nulos': null_counts.values,
+                'Percentual': (null_counts / total_rows * 100).round(2).values
+            })
+            null_df = null_df[null_df['Nulos'] > 0].sort_values('Nulos', ascending=False)
+            print(null_df.to_string(index=False))
+        
+        dup_count = duplicates.duplicates()
+        dup_label = "" if duplicates.exact else " (estimativa HyperLogLog)"
+        print(f"\n🔄 Duplicatas: {dup_count:,} linhas ({dup_count/total_rows*100:.2f}%){dup_label}")
+        
+        if numeric_stats:
+            print(f"\n📈 Estatísticas de Colunas Numéricas (quantis aproximados via KLL):")
+            describe = pd.DataFrame({
+                col: {
+                    'count': stats.count,
+                    'mean': stats.mean,
+                    'std': stats.std,
+                    'min': stats.min,
+                    '25%': quantiles[col].quantile(0.25),
+                    '50%': quantiles[col].quantile(0.50),
+                    '75%': quantiles[col].quantile(0.75),
+                    'max': stats.max,
+                }
+                for col, stats in numeric_stats.items()
+            })
+            print(describe.to_string())
+        
+        if distinct:
+            print(f"\n🏷️ Valores Únicos (Colunas de Texto, estimativa HyperLogLog):")
+            for col, hll in distinct.items():
+                unique_count = hll.count()
+                print(f"  {col}: ~{unique_count:,} valores únicos")
+                if len(samples[col]) <= 10:
+                    print(f"    Valores: {sorted(map(str, samples[col]))}")
+        
+        print("\n" + "=" * 80)
+        return total_rows
+        
+    except Exception as e:
+        print(f"❌ Erro ao ler arquivo: {e}")
+        return None
+
+
+def sample_csv_lines(filepath, n, seed=SAMPLE_SEED):
+    """Sorteia n linhas por posição de byte aleatória, sem ler o arquivo inteiro
+    
+    A linha que contém cada posição sorteada é escolhida com probabilidade proporcional
+    ao seu tamanho em bytes; o peso 1/tamanho devolvido corrige esse viés.
+    """
+    file_size = os.path.getsize(filepath)
+    rng = np.random.default_rng(seed)
+    
+    with open(filepath, 'rb') as f:
+        header = f.readline()
+        data_start = len(header)
+        if data_start >= file_size:
+            return header, [], np.empty(0)
+        
+        lines = []
+        weights = []
+        for offset in np.sort(rng.integers(data_start, file_size, n)):
+            base = max(data_start, offset - SAMPLE_WINDOW_BYTES)
+            f.seek(base)
+            buf = f.read(2 * SAMPLE_WINDOW_BYTES)
+            pos = offset - base
+            
+            start = buf.rfind(b'\n', 0, pos) + 1
+            end = buf.find(b'\n', pos)
+            if end == -1:
+                end = len(buf) if base + len(buf) >= file_size else -1
+            
+            # Linha maior que a janela: descartar
+            if (start == 0 and base > data_start) or end == -1:
+                continue
+            
+            line = buf[start:end].rstrip(b'\r')
+            if line:
+                lines.append(line)
+                weights.append(1.0 / (len(line) + 1))
+    
+    return header, lines, np.array(weights)
+
+def weighted_mean_ci(values, weights):
+    """Média ponderada (estimador de razão) com intervalo de confiança de 95%"""
+    mask = ~np.isnan(values)
+    values, weights = values[mask], weights[mask]
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan
+    
+    total = weights.sum()
+    mean = (weights * values).sum() / total
+    se = np.sqrt((weights ** 2 * (values - mean) ** 2).sum()) / total
+    return mean, mean - Z_95 * se, mean + Z_95 * se
+
+def weighted_median_ci(values, weights):
+    """Mediana ponderada com intervalo de 95% pelos quantis 0.5 ± z·0.5/√n_efetivo"""
+    mask = ~np.isnan(values)
+    values, weights = values[mask], weights[mask]
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan
+    
+    order = np.argsort(values)
+    values = values[order]
+    cdf = np.cumsum(weights[order]) / weights.sum()
+    n_eff = weights.sum() ** 2 / (weights ** 2).sum()
+    delta = Z_95 * 0.5 / np.sqrt(n_eff)
+    
+    def quantile(q):
+        return values[min(np.searchsorted(cdf, q), len(values) - 1)]
+    
+    return quantile(0.5), quantile(max(0.0, 0.5 - delta)), quantile(min(1.0, 0.5 + delta))
+
+def format_ci(estimate, low, high, fmt='{:.2f}'):
+    return f"{fmt.format(estimate)} (IC 95%: {fmt.format(low)} – {fmt.format(high)})"
+
+def analyze_sample(filepath, filename, sample_size=SAMPLE_SIZE):
+    """Perfil aproximado a partir de uma amostra aleatória, com intervalos de confiança"""
+    print("=" * 80)
+    print(f"📊 ANALISANDO (amostra): {filename}")
+    print("=" * 80)
+    
+    try:
+        header, lines, weights = sample_csv_lines(filepath, sample_size)
+        
+        # Parse das linhas sorteadas com o cabeçalho original
+        columns = next(csv.reader(io.StringIO(header.decode('utf-8-sig'))))
+        # Cada linha é lida sozinha: um campo entre aspas com quebra de linha só invalida as
+        # linhas dele, sem juntar as seguintes (rows fica alinhado com weights)
+        rows = [next(csv.reader([line.decode('utf-8', errors='replace')]), []) for line in lines]
+        valid = np.array([len(row) == len(columns) for row in rows], dtype=bool)
+        if not valid.any():
+            print("  ⚠️ Nenhuma linha válida na amostra")
+            return None
+        
+        df = pd.DataFrame([row for row, ok in zip(rows, valid) if ok], columns=columns).replace('', np.nan)
+        weights = weights[valid]
+        n_eff = weights.sum() ** 2 / (weights ** 2).sum()
+        
+        print(f"\n✅ Amostra: {len(df):,} linhas sorteadas (n efetivo ≈ {n_eff:,.0f})")
+        print(f"💾 Tamanho em disco: {os.path.getsize(filepath) / 1024**2:.2f} MB")
+        
+        # Valores nulos
+        print(f"\n❓ Valores Nulos (estimados):")
+        null_rows = []
+        for col in df.columns:
+            est, low, high = weighted_mean_ci(df[col].isnull().to_numpy(dtype=float), weights)
+            if est > 0:
+                null_rows.append({'Coluna': col, 'Percentual': format_ci(est * 100, low * 100, high * 100)})
+        if null_rows:
+            print(pd.DataFrame(null_rows).to_string(index=False))
+        else:
+            print("  ✅ Nenhum valor nulo na amostra!")
+        
+        def numeric(col):
+            return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        
+        # Estratos por ano de lançamento
+        if 'release_date' in df.columns:
+            years = pd.to_datetime(df['release_date'], errors='coerce', format='mixed').dt.year.to_numpy(dtype=float)
+            decades = np.floor(years / 10) * 10
+            print("\n📅 Distribuição por Década (estimada):")
+            for decade in np.unique(decades[~np.isnan(decades)]):
+                est, low, high = weighted_mean_ci((decades == decade).astype(float), weights)
+                print(f"  {decade:.0f}: {format_ci(est * 100, low * 100, high * 100)}%")
+        
+        if 'popularity' in df.columns:
+            popularity = numeric('popularity')
+            print("\n⭐ Análise de Popularidade:")
+            print(f"  Média: {format_ci(*weighted_mean_ci(popularity, weights))}")
+            print(f"  Mediana: {format_ci(*weighted_median_ci(popularity, weights))}")
+            est, low, high = weighted_mean_ci((popularity == 0).astype(float), weights)
+            print(f"  Registros com popularidade 0: {format_ci(est * 100, low * 100, high * 100)}%")
+            est, low, high = weighted_mean_ci((popularity > 80).astype(float), weights)
+            print(f"  Registros com popularidade > 80: {format_ci(est * 100, low * 100, high * 100)}%")
+        
+        audio_features = ['danceability', 'energy', 'valence', 'acousticness',
+                         'instrumentalness', 'speechiness', 'liveness']
+        existing_features = [f for f in audio_features if f in df.columns]
+        if existing_features:
+            print("\n🎚️ Audio Features - Médias:")
+            for feature in existing_features:
+                print(f"  {feature.capitalize()}: {format_ci(*weighted_mean_ci(numeric(feature), weights), fmt='{:.3f}')}")
+        
+        if 'explicit' in df.columns:
+            explicit = df['explicit'].astype(str).str.lower().isin(['1', 'true']).to_numpy(dtype=float)
+            est, low, high = weighted_mean_ci(explicit, weights)
+            print("\n🔞 Conteúdo Explícito:")
+            print(f"  Músicas explícitas: {format_ci(est * 100, low * 100, high * 100)}%")
+        
+        if 'duration_ms' in df.columns:
+            duration_min = numeric('duration_ms') / 60000
+            print("\n⏱️ Duração das Músicas (minutos):")
+            print(f"  Média: {format_ci(*weighted_mean_ci(duration_min, weights))}")
+            print(f"  Mediana: {format_ci(*weighted_median_ci(duration_min, weights))}")
+        
+        if 'followers' in df.columns:
+            print("\n👥 Análise de Seguidores:")
+            print(f"  Média: {format_ci(*weighted_mean_ci(numeric('followers'), weights), fmt='{:,.0f}')}")
+        
+        print("\n" + "=" * 80)
+        return df
+        
+    except Exception as e:
+        print(f"❌ Erro ao ler arquivo: {e}")
+        return None
+
 def analyze_tracks(df_tracks):
     """Análises específicas do arquivo tracks.csv"""
     print("\n" + "=" * 80)
@@ -162,6 +602,15 @@ def analyze_artists(df_artists):
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Exploração inicial dos CSVs do Kaggle')
+    parser.add_argument('--stream', action='store_true',
+                        help='perfil em uma única passada por blocos (arquivos maiores que a RAM)')
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNK_SIZE,
+                        help='linhas por bloco no modo --stream')
+    parser.add_argument('--sample', type=int, nargs='?', const=SAMPLE_SIZE, default=None,
+                        help=f'perfil rápido a partir de uma amostra aleatória (padrão: {SAMPLE_SIZE:,} linhas)')
+    args = parser.parse_args()
+    
     print("\n" + "=" * 80)
     print("🎵 MUSICMETRICS - EXPLORAÇÃO INICIAL DOS DADOS")
     print("=" * 80)
@@ -174,7 +623,11 @@ def main():
     
     # Analisar tracks.csv
     tracks_path = os.path.join(DATA_PATH, TRACKS_FILE)
-    if os.path.exists(tracks_path):
+    if os.path.exists(tracks_path) and args.sample:
+        analyze_sample(tracks_path, TRACKS_FILE, args.sample)
+    elif os.path.exists(tracks_path) and args.stream:
+        profile_csv_streaming(tracks_path, TRACKS_FILE, args.chunksize)
+    elif os.path.exists(tracks_path):
         df_tracks = analyze_csv(tracks_path, TRACKS_FILE)
         if df_tracks is not None:
             analyze_tracks(df_tracks)
@@ -183,7 +636,11 @@ def main():
     
     # Analisar artists.csv
     artists_path = os.path.join(DATA_PATH, ARTISTS_FILE)
-    if os.path.exists(artists_path):
+    if os.path.exists(artists_path) and args.sample:
+        analyze_sample(artists_path, ARTISTS_FILE, args.sample)
+    elif os.path.exists(artists_path) and args.stream:
+        profile_csv_streaming(artists_path, ARTISTS_FILE, args.chunksize)
+    elif os.path.exists(artists_path):
         df_artists = analyze_csv(artists_path, ARTISTS_FILE)
         if df_artists is not None:
             analyze_artists(df_artists)
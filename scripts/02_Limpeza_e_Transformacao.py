@@ -8,6 +8,7 @@ import numpy as np
 import os
 from datetime import datetime
 import re
+import time
 
 # ============================================
 
@@ -24,8 +25,91 @@ OUTPUT_TRACKS = 'tracks_limpo.csv'
 OUTPUT_ARTISTS = 'artists_limpo.csv'
 OUTPUT_AUDIO_FEATURES = 'audios_limpos.csv'
 
+# Matriz binária de audio features (memory-mappable com np.load(..., mmap_mode='r'))
+OUTPUT_FEATURE_MATRIX = 'audio_features_matrix.npy'
+OUTPUT_FEATURE_IDS = 'audio_features_ids.npy'
+OUTPUT_FEATURE_SCALE = 'audio_features_escala.npy'
+OUTPUT_FEATURE_COLUMNS = 'audio_features_colunas.npy'
+
+# As nove colunas DECIMAL de dim_audio_features, na ordem das colunas da matriz
+FEATURE_MATRIX_COLUMNS = [
+    'danceability', 'energy', 'loudness', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence', 'tempo'
+]
+
+# 'float32' (padrão) ou 'uint16' / 'uint8' para a versão quantizada
+FEATURE_MATRIX_DTYPE = 'float32'
+
+# Matrizes esparsas artista x gênero / música x gênero e análises de diversidade
+GENRES_PATH = os.path.join(PROCESSED_DATA_PATH, 'generos')
+OUTPUT_ARTIST_GENRE_MATRIX = 'artista_genero.npz'
+OUTPUT_TRACK_GENRE_MATRIX = 'musica_genero.npz'
+OUTPUT_GENRE_VOCABULARY = 'generos.npy'
+OUTPUT_GENRE_COOCCURRENCE = 'coocorrencia_generos.parquet'
+OUTPUT_GENRE_RELATED = 'generos_relacionados.parquet'
+OUTPUT_ARTIST_DIVERSITY = 'diversidade_artistas.parquet'
+OUTPUT_DECADE_DIVERSITY = 'diversidade_decadas.parquet'
+TOP_RELATED_GENRES = 5
+
+# Índice de busca por nome (trigramas -> músicas/artistas), lido por 09_Busca.py
+SEARCH_PATH = os.path.join(PROCESSED_DATA_PATH, 'busca')
+SEARCH_CHUNK_SIZE = 50_000
+
+# Mapas ID do Spotify -> chave substituta de todas as execuções (as chaves nunca mudam)
+KEYS_PATH = os.path.join(PROCESSED_DATA_PATH, 'chaves')
+OUTPUT_ARTIST_KEYS = 'chaves_artistas.parquet'
+OUTPUT_TRACK_KEYS = 'chaves_musicas.parquet'
+
+# Linhas reprovadas nas regras de qualidade (com códigos de motivo)
+OUTPUT_QUARANTINE_TRACKS = 'quarentena_tracks.parquet'
+OUTPUT_QUARANTINE_ARTISTS = 'quarentena_artists.parquet'
+
+# A validação deve custar menos que esta fração do tempo de limpeza
+VALIDATION_BUDGET = 0.10
+
+# Regras de qualidade sobre os dados brutos
+#   'error'   -> linha vai para a quarentena e sai da limpeza
+#   'warning' -> linha vai para a quarentena, mas segue na limpeza (nulos são preenchidos)
+UNIT_INTERVAL_FEATURES = [
+    'danceability', 'energy', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence'
+]
+
+TRACK_RULES = [
+    {'code': 'ID_INVALIDO', 'column': 'id', 'check': 'spotify_id', 'severity': 'error'},
+    {'code': 'NOME_NULO', 'column': 'name', 'check': 'not_null', 'severity': 'warning'},
+    {'code': 'POPULARIDADE_FORA_FAIXA', 'column': 'popularity', 'check': 'range', 'min': 0, 'max': 100, 'severity': 'warning'},
+    {'code': 'DURACAO_INVALIDA', 'column': 'duration_ms', 'check': 'range', 'min': 1, 'severity': 'error'},
+    {'code': 'DATA_FORA_LIMITE', 'column': 'release_date', 'check': 'year_range', 'min': 1900, 'max': datetime.now().year, 'severity': 'warning'},
+    # tempo 0 é o que a API devolve para faixas sem batida detectável (silêncio, ruído, falas):
+    # a faixa segue no catálogo, só o BPM é suspeito
+    {'code': 'TEMPO_INVALIDO', 'column': 'tempo', 'check': 'range', 'min': 0, 'min_exclusive': True, 'severity': 'warning'},
+] + [
+    {'code': f'{col.upper()}_FORA_FAIXA', 'column': col, 'check': 'range', 'min': 0, 'max': 1, 'severity': 'error'}
+    for col in UNIT_INTERVAL_FEATURES
+]
+
+ARTIST_RULES = [
+    {'code': 'ID_INVALIDO', 'column': 'id', 'check': 'spotify_id', 'severity': 'error'},
+    {'code': 'NOME_NULO', 'column': 'name', 'check': 'not_null', 'severity': 'warning'},
+    {'code': 'POPULARIDADE_FORA_FAIXA', 'column': 'popularity', 'check': 'range', 'min': 0, 'max': 100, 'severity': 'warning'},
+    {'code': 'SEGUIDORES_NEGATIVO', 'column': 'followers', 'check': 'range', 'min': 0, 'severity': 'warning'},
+]
+
+# IDs do Spotify: 22 caracteres base62
+SPOTIFY_ID_PATTERN = r'[0-9A-Za-z]{22}'
+
 # ============================================
 
+def normalize_search_key(names):
+    """Chave de busca: sem acentos, casefold, só letras/dígitos separados por um espaço"""
+    return (names.fillna('').astype(str)
+            .str.normalize('NFKD')
+            .str.replace('[\u0300-\u036f]', '', regex=True)  # marcas combinantes (acentos)
+            .str.casefold()
+            .str.replace(r'[\W_]+', ' ', regex=True)
+            .str.strip())
+
 def load_data():
     print("📂 Carregando dados...")
     
@@ -40,6 +124,94 @@ def load_data():
     
     return df_tracks, df_artists
 
+def leading_year(col):
+    """Ano = 4 primeiros caracteres (formatos YYYY, YYYY-MM e YYYY-MM-DD do Kaggle), sem parse de datas"""
+    try:
+        raw = col.to_numpy(dtype='S4', na_value=b'')
+    except UnicodeEncodeError:
+        return pd.to_numeric(col.astype(str).str.slice(0, 4), errors='coerce').to_numpy(dtype=float)
+    
+    # Dígitos ASCII dos 4 bytes -> ano; qualquer byte não numérico invalida
+    digits = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, 4).astype(np.int16) - ord('0')
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    years = (digits @ np.array([1000, 100, 10, 1], dtype=np.int16).astype(np.int64)).astype(float)
+    years[~valid] = np.nan
+    return years
+
+def evaluate_rule(df, rule):
+    """Máscara booleana das linhas que FALHAM em uma regra (avaliação vetorizada por coluna)"""
+    col = df[rule['column']]
+    check = rule['check']
+    
+    if check == 'not_null':
+        return col.isnull().to_numpy()
+    
+    if check == 'spotify_id':
+        return ~col.astype(str).str.fullmatch(SPOTIFY_ID_PATTERN).fillna(False).to_numpy(dtype=bool) | col.isnull().to_numpy()
+    
+    if check == 'year_range':
+        values = leading_year(col)
+    else:
+        values = pd.to_numeric(col, errors='coerce').to_numpy(dtype=float)
+    
+    # Nulos não reprovam regras de faixa (são tratados na limpeza)
+    fails = np.zeros(len(values), dtype=bool)
+    if check == 'year_range':
+        fails |= np.isnan(values) & col.notnull().to_numpy()
+    if 'min' in rule:
+        fails |= (values <= rule['min']) if rule.get('min_exclusive') else (values < rule['min'])
+    if 'max' in rule:
+        fails |= values > rule['max']
+    return fails
+
+def validate(df, rules, label):
+    """Aplica as regras e separa as linhas reprovadas, com os códigos de motivo"""
+    existing = [rule for rule in rules if rule['column'] in df.columns]
+    
+    fails = np.column_stack([evaluate_rule(df, rule) for rule in existing]) if existing else np.zeros((len(df), 0), dtype=bool)
+    severities = np.array([rule['severity'] for rule in existing])
+    codes = np.array([rule['code'] for rule in existing], dtype=object)
+    
+    any_fail = fails.any(axis=1)
+    is_error = fails[:, severities == 'error'].any(axis=1)
+    
+    # Motivos só para as linhas reprovadas (normalmente poucas)
+    failed_rows = fails[any_fail]
+    quarantine = df[any_fail].copy()
+    quarantine['motivos'] = [';'.join(codes[row]) for row in failed_rows]
+    quarantine['severidade'] = np.where(is_error[any_fail], 'error', 'warning')
+    
+    print(f"  🔎 {label}: {any_fail.sum():,} linhas reprovadas ({is_error.sum():,} removidas)")
+    counts = fails.sum(axis=0)
+    for rule, count in zip(existing, counts):
+        if count > 0:
+            print(f"    {rule['code']} ({rule['severity']}): {count:,}")
+    
+    return df[~is_error], quarantine
+
+def validate_data(df_tracks, df_artists):
+    """Valida os dados brutos contra TRACK_RULES e ARTIST_RULES"""
+    print("\n🛡️ Validando regras de qualidade...")
+    
+    df_tracks, quarantine_tracks = validate(df_tracks, TRACK_RULES, 'Tracks')
+    df_artists, quarantine_artists = validate(df_artists, ARTIST_RULES, 'Artistas')
+    
+    return df_tracks, df_artists, quarantine_tracks, quarantine_artists
+
+def save_quarantine(quarantine_tracks, quarantine_artists):
+    """Salva as linhas reprovadas em Parquet (CSV se o pyarrow não estiver instalado)"""
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+    
+    for df, filename in [(quarantine_tracks, OUTPUT_QUARANTINE_TRACKS),
+                         (quarantine_artists, OUTPUT_QUARANTINE_ARTISTS)]:
+        output = os.path.join(PROCESSED_DATA_PATH, filename)
+        try:
+            df.to_parquet(output, index=False)
+        except ImportError:
+            output = output.replace('.parquet', '.csv')
+            df.to_csv(output, index=False, encoding='utf-8-sig')
+        print(f"  ✅ {os.path.basename(output)} salvo ({len(df):,} linhas)")
+
 def clean_tracks(df_tracks):
     print("\n🧹 Limpando dados de tracks...")
     
@@ -69,18 +241,23 @@ def clean_tracks(df_tracks):
     print("  ✨ Padronizando nomes de músicas...")
     df['name'] = df['name'].str.strip()
     df['name'] = df['name'].str.replace(r'\s+', ' ', regex=True)
+    df['search_key'] = normalize_search_key(df['name'])
     
     # 5. Processar datas
     print("  📅 Processando datas...")
-    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
+    # Ano direto do texto: um único to_datetime sobre YYYY e YYYY-MM-DD misturados devolve NaT
+    # para o formato que não for o inferido
+    df['release_year'] = leading_year(df['release_date'])
     
-    # Extrair ano
-    df['release_year'] = df['release_date'].dt.year
+    # format='mixed': cada valor é lido no próprio formato (datas só com ano -> 1º de janeiro)
+    df['release_date'] = pd.to_datetime(df['release_date'], format='mixed', errors='coerce')
     
-    # Preencher anos nulos com a mediana
-    if df['release_year'].isnull().sum() > 0:
+    # Preencher anos nulos com a mediana (a data continua nula: as views por década ignoram a música)
+    missing_years = int(df['release_year'].isnull().sum())
+    if missing_years > 0:
         median_year = df['release_year'].median()
         df['release_year'] = df['release_year'].fillna(median_year)
+        print(f"  ⚠️ {missing_years:,} músicas sem ano de lançamento (preenchido com a mediana {median_year:.0f})")
     
     # 6. Converter explicit para boolean
     if df['explicit'].dtype != bool:
@@ -174,6 +351,7 @@ def clean_artists(df_artists):
     # 4. Limpar nomes
     df['name'] = df['name'].str.strip()
     df['name'] = df['name'].str.replace(r'\s+', ' ', regex=True)
+    df['search_key'] = normalize_search_key(df['name'])
     
     # 5. Tratar popularity
     if df['popularity'].isnull().sum() > 0:
@@ -234,7 +412,7 @@ def prepare_for_mysql(df_tracks, df_artists):
     
     # Para tracks: manter apenas colunas relevantes
     tracks_cols = ['id', 'name', 'popularity', 'duration_ms', 'explicit', 
-                   'artists', 'primary_artist_id', 'release_date', 'release_year']
+                   'artists', 'primary_artist_id', 'release_date', 'release_year', 'search_key']
     
     existing_track_cols = [col for col in tracks_cols if col in df_tracks.columns]
     df_tracks_mysql = df_tracks[existing_track_cols].copy()
@@ -244,11 +422,12 @@ def prepare_for_mysql(df_tracks, df_artists):
         'id': 'track_id',
         'name': 'track_name',
         'popularity': 'track_popularity',
-        'artists': 'artist_name'
+        'artists': 'artist_name',
+        'search_key': 'track_search_key'
     })
     
     # Para artists: manter colunas relevantes
-    artists_cols = ['id', 'name', 'popularity', 'followers', 'genres']
+    artists_cols = ['id', 'name', 'popularity', 'followers', 'genres', 'search_key']
     existing_artist_cols = [col for col in artists_cols if col in df_artists.columns]
     df_artists_mysql = df_artists[existing_artist_cols].copy()
     
@@ -258,13 +437,80 @@ def prepare_for_mysql(df_tracks, df_artists):
         'name': 'artist_name',
         'popularity': 'artist_popularity',
         'followers': 'artist_followers',
-        'genres': 'artist_genres'
+        'genres': 'artist_genres',
+        'search_key': 'artist_search_key'
     })
     
     print(f"✅ Dados preparados para MySQL")
     
     return df_tracks_mysql, df_artists_mysql
 
+def read_key_map(filename):
+    """Mapa ID do Spotify -> chave gravado pelas execuções anteriores (vazio na primeira)"""
+    path = os.path.join(KEYS_PATH, filename)
+    if os.path.exists(path):
+        df = pd.read_parquet(path)
+    elif os.path.exists(path.replace('.parquet', '.csv')):
+        df = pd.read_csv(path.replace('.parquet', '.csv'), dtype={'id': str})
+    else:
+        return pd.Series(dtype=np.int64)
+    return pd.Series(df['sk'].to_numpy(dtype=np.int64), index=df['id'].astype(str))
+
+def extend_key_map(key_map, ids):
+    """Mantém as chaves já atribuídas e dá max+1, max+2... aos IDs novos (em ordem de ID)
+
+    IDs que saíram dos dados continuam no mapa: se voltarem recebem a mesma chave, e a
+    chave deles nunca é reaproveitada por outro ID
+    """
+    new_ids = pd.Index(ids.astype(str)).unique().difference(key_map.index).sort_values()
+    start = int(key_map.max()) if len(key_map) else 0
+    new_keys = pd.Series(np.arange(start + 1, start + 1 + len(new_ids), dtype=np.int64), index=new_ids)
+    return pd.concat([key_map, new_keys]) if len(key_map) else new_keys, len(new_ids)
+
+def save_key_map(key_map, filename):
+    os.makedirs(KEYS_PATH, exist_ok=True)
+    df = pd.DataFrame({'id': key_map.index.to_numpy(dtype=str), 'sk': key_map.to_numpy()})
+    path = os.path.join(KEYS_PATH, filename)
+    try:
+        df.to_parquet(path + '.tmp', index=False)
+    except ImportError:
+        path = path.replace('.parquet', '.csv')
+        df.to_csv(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+def assign_surrogate_keys(df_tracks, df_artists, df_features):
+    """Atribui chaves substitutas INT estáveis para artistas e músicas
+
+    O mapa ID -> chave fica em processed/chaves/: um ID recebe sempre a mesma chave, e IDs
+    novos entram depois da maior chave já usada (a carga faz upsert pela chave)
+    """
+    print("\n🔑 Gerando chaves substitutas...")
+    
+    artist_keys, new_artists = extend_key_map(read_key_map(OUTPUT_ARTIST_KEYS), df_artists['artist_id'])
+    track_keys, new_tracks = extend_key_map(read_key_map(OUTPUT_TRACK_KEYS), df_tracks['track_id'])
+    
+    df_artists.insert(0, 'artist_sk', artist_keys.reindex(df_artists['artist_id'].astype(str)).to_numpy())
+    df_tracks.insert(0, 'track_sk', track_keys.reindex(df_tracks['track_id'].astype(str)).to_numpy())
+    
+    # artist_sk da música (nulo quando o artista não existe em artists)
+    if 'primary_artist_id' in df_tracks.columns:
+        current_artists = pd.Index(df_artists['artist_id'].astype(str))
+        primary = df_tracks['primary_artist_id']
+        found = primary.notnull().to_numpy() & pd.Index(primary.astype(str)).isin(current_artists)
+        artist_sk = artist_keys.reindex(primary.astype(str)).to_numpy()
+        df_tracks['artist_sk'] = pd.array(np.where(found, artist_sk, None), dtype='Int64')
+        print(f"  ⚠️ {(~found).sum():,} músicas sem artist_sk (artista ausente)")
+    
+    if df_features is not None:
+        df_features.insert(0, 'track_sk', track_keys.reindex(df_features['track_id'].astype(str)).to_numpy())
+    
+    save_key_map(artist_keys, OUTPUT_ARTIST_KEYS)
+    save_key_map(track_keys, OUTPUT_TRACK_KEYS)
+    print(f"  ✅ {df_artists['artist_id'].nunique():,} artist_sk ({new_artists:,} novos) | "
+          f"{df_tracks['track_id'].nunique():,} track_sk ({new_tracks:,} novos)")
+    
+    return df_tracks, df_artists, df_features
+
 def save_processed_data(df_tracks, df_artists, df_features):
     print("\n💾 Salvando dados processados...")
     
@@ -287,6 +533,273 @@ def save_processed_data(df_tracks, df_artists, df_features):
         df_features.to_csv(features_output, index=False, encoding='utf-8-sig')
         print(f"  ✅ {OUTPUT_AUDIO_FEATURES} salvo ({len(df_features):,} linhas)")
 
+def save_feature_matrix(df_features):
+    """Salva as audio features como matriz densa .npy + array de track_ids ordenado"""
+    print("\n🧮 Salvando matriz binária de audio features...")
+    
+    if df_features is None:
+        print("  ⚠️ Nenhuma audio feature para salvar")
+        return
+    
+    existing_cols = [col for col in FEATURE_MATRIX_COLUMNS if col in df_features.columns]
+    
+    # Ordenar por track_id para permitir busca binária (np.searchsorted) no array de IDs
+    df = df_features.sort_values('track_id')
+    track_ids = df['track_id'].astype(str).to_numpy()
+    # Largura do maior ID (um 'U22' fixo cortaria IDs maiores sem aviso)
+    id_length = max(int(df['track_id'].astype(str).str.len().max()), 1) if len(df) else 1
+    if id_length != 22:
+        print(f"  ⚠️ IDs fora do padrão do Spotify: maior ID com {id_length} caracteres")
+    track_ids = track_ids.astype(f'U{id_length}')
+    matrix = df[existing_cols].to_numpy(dtype=np.float32)
+    
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+    
+    # Versão quantizada: x ≈ minimo + valor * passo (escala salva por coluna)
+    if FEATURE_MATRIX_DTYPE in ('uint8', 'uint16'):
+        max_code = np.iinfo(FEATURE_MATRIX_DTYPE).max
+        col_min = matrix.min(axis=0)
+        col_range = matrix.max(axis=0) - col_min
+        step = np.where(col_range > 0, col_range / max_code, 1.0).astype(np.float32)
+        matrix = np.rint((matrix - col_min) / step).astype(FEATURE_MATRIX_DTYPE)
+        
+        scale_output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FEATURE_SCALE)
+        np.save(scale_output, np.vstack([col_min, step]).astype(np.float32))
+        print(f"  ✅ {OUTPUT_FEATURE_SCALE} salvo (mínimo e passo por coluna)")
+    
+    matrix_output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FEATURE_MATRIX)
+    np.save(matrix_output, np.ascontiguousarray(matrix))
+    print(f"  ✅ {OUTPUT_FEATURE_MATRIX} salvo ({matrix.shape[0]:,} x {matrix.shape[1]} {matrix.dtype}, "
+          f"{matrix.nbytes / 1024**2:.2f} MB)")
+    
+    ids_output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FEATURE_IDS)
+    np.save(ids_output, track_ids)
+    print(f"  ✅ {OUTPUT_FEATURE_IDS} salvo ({len(track_ids):,} IDs)")
+    
+    # Nomes e ordem das colunas da matriz, para os consumidores não dependerem de uma lista fixa
+    columns_output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FEATURE_COLUMNS)
+    np.save(columns_output, np.array(existing_cols))
+    print(f"  ✅ {OUTPUT_FEATURE_COLUMNS} salvo: {', '.join(existing_cols)}")
+
+def save_table(df, path):
+    """Grava em Parquet (CSV se o pyarrow não estiver instalado)"""
+    try:
+        df.to_parquet(path, index=False)
+    except ImportError:
+        path = path.replace('.parquet', '.csv')
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"  ✅ {os.path.basename(path)} salvo ({len(df):,} linhas)")
+
+def diversity(weights):
+    """Shannon (ln) e Simpson (1 - Σp²) de cada linha de uma matriz esparsa de pesos"""
+    totals = np.asarray(weights.sum(axis=1)).ravel()
+    probs = weights.multiply(1.0 / np.where(totals > 0, totals, 1.0)[:, None]).tocsr()
+    entropy = probs.copy()
+    entropy.data = -entropy.data * np.log(entropy.data)
+    squares = probs.multiply(probs)
+    shannon = np.asarray(entropy.sum(axis=1)).ravel()
+    simpson = np.where(totals > 0, 1.0 - np.asarray(squares.sum(axis=1)).ravel(), 0.0)
+    return shannon, simpson
+
+def build_genre_matrices(df_tracks, df_artists):
+    """Matriz esparsa artista x gênero (linhas = artist_sk - 1) e música x gênero via artista"""
+    print("\n🧬 Montando matrizes de gêneros...")
+    
+    try:
+        import scipy.sparse as sp
+    except ImportError:
+        print("  ⚠️ scipy não instalado: matrizes de gêneros não geradas")
+        return None
+    
+    # 'pop, rock' -> uma linha por (artista, gênero)
+    genres = df_artists['artist_genres'].fillna('').astype(str).reset_index(drop=True)
+    exploded = genres.str.split(',').explode().str.strip()
+    exploded = exploded[exploded != '']
+    
+    codes, vocabulary = pd.factorize(exploded, sort=True)
+    rows = df_artists['artist_sk'].to_numpy()[exploded.index.to_numpy()] - 1
+    
+    n_artists = int(df_artists['artist_sk'].max()) if len(df_artists) else 0
+    artist_genre = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (rows, codes)),
+        shape=(n_artists, len(vocabulary))
+    )
+    artist_genre.data[:] = 1.0  # gênero repetido no mesmo artista conta uma vez
+    
+    # Música -> artista principal (incidência) x artista -> gênero
+    has_artist = df_tracks['artist_sk'].notna().to_numpy()
+    track_rows = df_tracks['track_sk'].to_numpy()[has_artist] - 1
+    artist_cols = df_tracks['artist_sk'].to_numpy()[has_artist].astype(np.int64) - 1
+    n_tracks = int(df_tracks['track_sk'].max()) if len(df_tracks) else 0
+    track_artist = sp.csr_matrix(
+        (np.ones(len(track_rows), dtype=np.float32), (track_rows, artist_cols)),
+        shape=(n_tracks, n_artists)
+    )
+    track_artist.data[:] = 1.0
+    track_genre = (track_artist @ artist_genre).tocsr()
+    
+    print(f"  ✅ {artist_genre.shape[0]:,} artistas x {len(vocabulary):,} gêneros "
+          f"({artist_genre.nnz:,} associações) | {track_genre.shape[0]:,} músicas")
+    
+    return artist_genre, track_genre, np.asarray(vocabulary, dtype=str)
+
+def save_genre_analysis(df_tracks, df_artists, genre_matrices):
+    """Salva as matrizes e as análises de gêneros usadas em Descoberta e Diversidade"""
+    if genre_matrices is None:
+        return
+    
+    import scipy.sparse as sp
+    
+    print("\n🧬 Salvando análises de gêneros...")
+    start = time.perf_counter()
+    artist_genre, track_genre, vocabulary = genre_matrices
+    os.makedirs(GENRES_PATH, exist_ok=True)
+    
+    sp.save_npz(os.path.join(GENRES_PATH, OUTPUT_ARTIST_GENRE_MATRIX), artist_genre, compressed=False)
+    sp.save_npz(os.path.join(GENRES_PATH, OUTPUT_TRACK_GENRE_MATRIX), track_genre, compressed=False)
+    np.save(os.path.join(GENRES_PATH, OUTPUT_GENRE_VOCABULARY), vocabulary)
+    print(f"  ✅ {OUTPUT_ARTIST_GENRE_MATRIX}, {OUTPUT_TRACK_GENRE_MATRIX} e {OUTPUT_GENRE_VOCABULARY} salvos")
+    
+    # Coocorrência: nº de artistas que compartilham os dois gêneros (diagonal = artistas por gênero)
+    cooccurrence = (artist_genre.T @ artist_genre).tocoo()
+    artists_per_genre = cooccurrence.diagonal()
+    off_diagonal = cooccurrence.row != cooccurrence.col
+    i, j = cooccurrence.row[off_diagonal], cooccurrence.col[off_diagonal]
+    shared = cooccurrence.data[off_diagonal]
+    jaccard = shared / (artists_per_genre[i] + artists_per_genre[j] - shared)
+    
+    pairs = pd.DataFrame({
+        'genero': vocabulary[i], 'genero_relacionado': vocabulary[j],
+        'artistas': shared.astype(np.int64), 'jaccard': jaccard.round(4)
+    })
+    save_table(pairs[i < j].rename(columns={'genero': 'genero_a', 'genero_relacionado': 'genero_b'}),
+               os.path.join(GENRES_PATH, OUTPUT_GENRE_COOCCURRENCE))
+    
+    related = pairs.sort_values(['genero', 'jaccard', 'artistas'], ascending=[True, False, False])
+    related = related.groupby('genero', sort=False).head(TOP_RELATED_GENRES)
+    related.insert(1, 'posicao', related.groupby('genero', sort=False).cumcount() + 1)
+    save_table(related, os.path.join(GENRES_PATH, OUTPUT_GENRE_RELATED))
+    
+    # Diversidade por artista: o peso do artista é dividido igualmente entre seus gêneros
+    shannon, simpson = diversity(artist_genre)
+    n_genres = artist_genre.getnnz(axis=1)
+    save_table(pd.DataFrame({
+        'artist_sk': np.arange(1, artist_genre.shape[0] + 1),
+        'total_generos': n_genres,
+        'shannon': shannon.round(4),
+        'simpson': simpson.round(4),
+    })[n_genres > 0], os.path.join(GENRES_PATH, OUTPUT_ARTIST_DIVERSITY))
+    
+    # Diversidade por década: cada música vale 1, dividido entre os gêneros do artista
+    per_track = np.asarray(track_genre.sum(axis=1)).ravel()
+    track_weights = sp.diags(1.0 / np.where(per_track > 0, per_track, 1.0)) @ track_genre
+    
+    year = np.full(track_genre.shape[0], np.nan)
+    year[df_tracks['track_sk'].to_numpy() - 1] = pd.to_numeric(df_tracks['release_year'], errors='coerce')
+    valid = ~np.isnan(year) & (per_track > 0)
+    decades, decade_codes = np.unique(year[valid] // 10 * 10, return_inverse=True)
+    decade_track = sp.csr_matrix(
+        (np.ones(valid.sum()), (decade_codes, np.flatnonzero(valid))),
+        shape=(len(decades), track_genre.shape[0])
+    )
+    decade_genre = (decade_track @ track_weights).tocsr()
+    shannon, simpson = diversity(decade_genre)
+    save_table(pd.DataFrame({
+        'decada': decades.astype(np.int64),
+        'total_musicas': np.asarray(decade_track.sum(axis=1)).ravel().astype(np.int64),
+        'generos_distintos': decade_genre.getnnz(axis=1),
+        'shannon': shannon.round(4),
+        'simpson': simpson.round(4),
+    }), os.path.join(GENRES_PATH, OUTPUT_DECADE_DIVERSITY))
+    
+    print(f"  ⏱️ Análises de gêneros em {time.perf_counter() - start:.2f} s")
+
+def encode_trigrams(keys):
+    """(linha, código) de cada trigrama de '^chave$'; código = 3 code points de 21 bits em um uint64"""
+    marked = np.asarray(['^' + key + '$' for key in keys], dtype=str)
+    width = marked.dtype.itemsize // 4
+    points = marked.view(np.uint32).reshape(len(marked), width).astype(np.uint64)
+
+    codes = (points[:, :-2] << np.uint64(42)) | (points[:, 1:-1] << np.uint64(21)) | points[:, 2:]
+    valid = points[:, 2:] != 0  # posições além do fim da chave (preenchidas com zero)
+    rows = np.broadcast_to(np.arange(len(marked))[:, None], codes.shape)
+    return rows[valid], codes[valid]
+
+def pack_strings(values):
+    """Strings em um único buffer UTF-8 + posições de início (n + 1), para leitura via mmap"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def build_search_index(entity, keys, labels, sks, popularity):
+    """Índice invertido de trigramas (CSR) com os documentos em ordem de popularidade"""
+    order = np.lexsort((keys, -popularity))
+    keys, labels, sks = keys[order], labels[order], sks[order]
+
+    # Lotes por tamanho de chave: a matriz de code points de cada lote fica estreita
+    by_length = np.argsort(np.char.str_len(keys), kind='stable')
+    rows, codes = [], []
+    for start in range(0, len(keys), SEARCH_CHUNK_SIZE):
+        chunk = by_length[start:start + SEARCH_CHUNK_SIZE]
+        chunk_rows, chunk_codes = encode_trigrams(keys[chunk])
+        rows.append(chunk[chunk_rows].astype(np.int32))
+        codes.append(chunk_codes)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.uint64)
+
+    # Ordena por (trigrama, documento) e remove trigramas repetidos na mesma chave
+    sort = np.lexsort((rows, codes))
+    rows, codes = rows[sort], codes[sort]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    rows, codes = rows[distinct], codes[distinct]
+
+    vocabulary, starts = np.unique(codes, return_index=True)
+    pointers = np.append(starts, len(codes)).astype(np.int64)
+    key_bytes, key_offsets = pack_strings(keys)
+    label_bytes, label_offsets = pack_strings(labels)
+
+    directory = os.path.join(SEARCH_PATH, entity)
+    os.makedirs(directory, exist_ok=True)
+    arrays = {
+        'trigramas': vocabulary, 'ponteiros': pointers, 'documentos': rows,
+        'chaves': key_bytes, 'chaves_pos': key_offsets,
+        'rotulos': label_bytes, 'rotulos_pos': label_offsets,
+        'sk': sks.astype(np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), array)
+
+    size_mb = sum(array.nbytes for array in arrays.values()) / 1024**2
+    print(f"  ✅ {entity}: {len(keys):,} nomes, {len(vocabulary):,} trigramas, "
+          f"{len(rows):,} ocorrências ({size_mb:.1f} MB)")
+
+def save_search_index(df_tracks, df_artists):
+    """Índices de busca por nome (prefixo/substring, sem acento) de músicas e artistas"""
+    print("\n🔎 Construindo índice de busca por nome...")
+    start = time.perf_counter()
+
+    # Rótulo exibido no resultado: "Música — Artista" (artists vem como "['A', 'B']")
+    artists = df_tracks['artist_name'].fillna('').astype(str).str.strip('[]').str.replace("'", '', regex=False)
+    track_labels = df_tracks['track_name'].astype(str) + ' — ' + artists
+    build_search_index(
+        'musicas',
+        df_tracks['track_search_key'].fillna('').to_numpy(dtype=str),
+        track_labels.to_numpy(dtype=str),
+        df_tracks['track_sk'].to_numpy(),
+        df_tracks['track_popularity'].fillna(0).to_numpy(),
+    )
+    build_search_index(
+        'artistas',
+        df_artists['artist_search_key'].fillna('').to_numpy(dtype=str),
+        df_artists['artist_name'].astype(str).to_numpy(dtype=str),
+        df_artists['artist_sk'].to_numpy(),
+        df_artists['artist_popularity'].fillna(0).to_numpy(),
+    )
+
+    print(f"  ⏱️ Índices de busca em {time.perf_counter() - start:.2f} s")
+
 def generate_report(df_tracks, df_artists):
     print("\n" + "=" * 80)
     print("📊 RELATÓRIO DE QUALIDADE DOS DADOS")
@@ -314,22 +827,41 @@ def main():
     # 1. Carregar dados
     df_tracks, df_artists = load_data()
     
-    # 2. Limpar tracks
+    # 2. Validar regras de qualidade
+    start = time.perf_counter()
+    df_tracks, df_artists, quarantine_tracks, quarantine_artists = validate_data(df_tracks, df_artists)
+    validation_time = time.perf_counter() - start
+    
+    # 3. Limpar tracks
+    start = time.perf_counter()
     df_tracks_clean = clean_tracks(df_tracks)
     
-    # 3. Limpar artists
+    # 4. Limpar artists
     df_artists_clean = clean_artists(df_artists)
     
-    # 4. Extrair audio features
+    # 5. Extrair audio features
     df_features = extract_audio_features(df_tracks_clean)
     
-    # 5. Preparar para MySQL
+    # 6. Preparar para MySQL
     df_tracks_mysql, df_artists_mysql = prepare_for_mysql(df_tracks_clean, df_artists_clean)
+    df_tracks_mysql, df_artists_mysql, df_features = assign_surrogate_keys(df_tracks_mysql, df_artists_mysql, df_features)
+    cleaning_time = time.perf_counter() - start
+    
+    validation_share = validation_time / cleaning_time
+    print(f"\n⏱️ Validação: {validation_time:.2f} s | Limpeza: {cleaning_time:.2f} s "
+          f"({validation_share * 100:.1f}% da limpeza)")
+    if validation_share >= VALIDATION_BUDGET:
+        print(f"  ⚠️ Validação acima do orçamento de {VALIDATION_BUDGET:.0%} do tempo de limpeza")
     
-    # 6. Salvar dados processados
+    # 7. Salvar dados processados
     save_processed_data(df_tracks_mysql, df_artists_mysql, df_features)
+    save_feature_matrix(df_features)
+    save_quarantine(quarantine_tracks, quarantine_artists)
+    genre_matrices = build_genre_matrices(df_tracks_mysql, df_artists_mysql)
+    save_genre_analysis(df_tracks_mysql, df_artists_mysql, genre_matrices)
+    save_search_index(df_tracks_mysql, df_artists_mysql)
     
-    # 7. Gerar relatório
+    # 8. Gerar relatório
     generate_report(df_tracks_mysql, df_artists_mysql)
     
     print("\n✅ PROCESSAMENTO CONCLUÍDO!")
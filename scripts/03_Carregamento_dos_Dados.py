@@ -1,17 +1,23 @@
 """
 MusicMetrics - Carga de Dados no MySQL
 Carrega os dados limpos e processados no banco de dados MySQL
+(ou, com --backend duckdb, em um banco DuckDB local, sem servidor)
 """
 
 import pandas as pd
-import mysql.connector
-from mysql.connector import Error
-from dotenv import load_dotenv
 import os
+import re
+import argparse
+import sys
+import time
 from datetime import datetime
 
-# Carregar variáveis de ambiente
-load_dotenv()
+# Raiz do repositório no path: o script também roda direto, fora da CLI
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+from musicmetrics.config import DB_CONFIG, load_db_config
 
 # ============================================
 
@@ -21,19 +27,27 @@ TRACKS_FILE = 'tracks_limpo.csv'
 ARTISTS_FILE = 'artists_limpo.csv'
 AUDIO_FEATURES_FILE = 'audios_limpos.csv'
 
-# Configurações do banco
-DB_CONFIG = {
-    'host': os.getenv('MYSQL_HOST', 'localhost'),
-    'user': os.getenv('MYSQL_USER', 'root'),
-    'password': os.getenv('MYSQL_PASSWORD'),
-    'database': os.getenv('MYSQL_DATABASE', 'MusicMetrics'),
-    'port': int(os.getenv('MYSQL_PORT', 3306))
-}
+# Backend embarcado (DuckDB): arquivo do banco e scripts SQL traduzidos do MySQL
+DUCKDB_PATH = '../MusicMetrics/data/musicmetrics.duckdb'
+SQL_PATH = '../MusicMetrics/sql/'
+SCHEMA_SQL_FILE = '01_Criacao_Banco_de_Dados.sql'
+MIGRATIONS_SQL_DIR = 'migracoes'
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__\w+\.sql$')
+QUERIES_SQL_FILE = '02_Queries_Analiticas.sql'
+VIEWS_SQL_FILE = '03_Views_e_Procedures.sql'
+
+# Particionamento por década (RANGE sobre release_year)
+FIRST_DECADE = 1900
+LAST_DECADE = 2020
 
 # ============================================
 
 def connect_to_mysql():
     """Conecta ao banco de dados MySQL"""
+    import mysql.connector
+    from mysql.connector import Error
+    
+    load_db_config()
     try:
         connection = mysql.connector.connect(**DB_CONFIG)
         if connection.is_connected():
@@ -53,16 +67,86 @@ def load_csv(filepath):
         print(f"❌ Erro ao carregar {filepath}: {e}")
         return None
 
+def check_surrogate_keys(cursor, table, sk_column, id_column, df):
+    """Confere que o arquivo usa as mesmas chaves já gravadas no banco (mesmo ID <-> mesma chave)
+
+    As chaves vêm do mapa persistido pela limpeza; se ele for apagado, a renumeração
+    trocaria os dados de linha no upsert, então a carga é recusada
+    """
+    duplicated = df[sk_column].duplicated() | df[id_column].duplicated()
+    if duplicated.any():
+        print(f"  ❌ {duplicated.sum():,} linhas com {sk_column} ou {id_column} repetido no arquivo")
+        return False
+    
+    cursor.execute(f"SELECT {sk_column}, {id_column} FROM {table}")
+    stored = pd.DataFrame(cursor.fetchall(), columns=[sk_column, id_column])
+    if stored.empty:
+        return True
+    
+    incoming = df[[sk_column, id_column]].astype({sk_column: 'int64', id_column: str})
+    stored = stored.astype({sk_column: 'int64', id_column: str})
+    same_key = incoming.merge(stored, on=sk_column, suffixes=('', '_banco'))
+    same_id = incoming.merge(stored, on=id_column, suffixes=('', '_banco'))
+    conflicts = pd.concat([
+        same_key.loc[same_key[id_column] != same_key[f'{id_column}_banco'], [sk_column, id_column]],
+        same_id.loc[same_id[sk_column] != same_id[f'{sk_column}_banco'], [sk_column, id_column]],
+    ]).drop_duplicates()
+    
+    if len(conflicts):
+        print(f"  ❌ {len(conflicts):,} linhas com {sk_column} diferente do gravado em {table} "
+              f"(ex.: {conflicts.iloc[0][id_column]}): o mapa de chaves em processed/chaves/ "
+              "foi perdido ou trocado")
+        return False
+    return True
+
+def remove_moved_tracks(connection, cursor, df_tracks):
+    """Apaga as linhas antigas de músicas que mudaram de ano nas tabelas particionadas
+
+    Com PRIMARY KEY (track_sk, release_year) o MySQL não garante track_sk único: o upsert de
+    uma música com ano novo criaria uma segunda linha em outra partição
+    """
+    from mysql.connector import Error
+    
+    if not is_partitioned(cursor, 'dim_tracks'):
+        return True
+    
+    cursor.execute("SELECT track_sk, release_year FROM dim_tracks")
+    stored = pd.DataFrame(cursor.fetchall(), columns=['track_sk', 'release_year'], dtype='int64')
+    incoming = df_tracks[['track_sk', 'release_year']].astype('int64')
+    merged = incoming.merge(stored, on='track_sk', suffixes=('', '_banco'))
+    moved = merged.loc[merged['release_year'] != merged['release_year_banco'], ['track_sk', 'release_year_banco']]
+    if moved.empty:
+        return True
+    
+    rows = [(int(sk), int(year)) for sk, year in moved.itertuples(index=False)]
+    try:
+        for table in ['dim_audio_features', 'dim_tracks']:
+            cursor.executemany(f"DELETE FROM {table} WHERE track_sk = %s AND release_year = %s", rows)
+        connection.commit()
+    except Error as e:
+        print(f"  ❌ Erro ao remover músicas que mudaram de ano: {e}")
+        connection.rollback()
+        return False
+    
+    print(f"  🔁 {len(rows):,} músicas mudaram de ano: linhas da partição antiga removidas")
+    return True
+
 def load_artists(connection, df_artists):
     """Carrega dados de artistas na tabela dim_artists"""
+    from mysql.connector import Error
+    
     print("\n🎤 Carregando artistas...")
     
     cursor = connection.cursor()
     
-    # SQL para inserir ou atualizar artistas
+    if not check_surrogate_keys(cursor, 'dim_artists', 'artist_sk', 'artist_id', df_artists):
+        cursor.close()
+        return False
+    
+    # SQL para inserir ou atualizar artistas (nunca a chave natural: artist_sk -> artist_id é fixo)
     insert_query = """
-        INSERT INTO dim_artists (artist_id, artist_name, genres, followers, popularity)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO dim_artists (artist_sk, artist_id, artist_name, genres, followers, popularity)
+        VALUES (%s, %s, %s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE
             artist_name = VALUES(artist_name),
             genres = VALUES(genres),
@@ -75,6 +159,7 @@ def load_artists(connection, df_artists):
     records = []
     for _, row in df_artists.iterrows():
         records.append((
+            int(row['artist_sk']),
             str(row['artist_id']),
             str(row['artist_name']),
             str(row.get('artist_genres', '')),
@@ -105,39 +190,47 @@ def load_artists(connection, df_artists):
 
 def load_tracks(connection, df_tracks):
     """Carrega dados de tracks na tabela dim_tracks"""
+    from mysql.connector import Error
+    
     print("\n🎵 Carregando músicas...")
     
     cursor = connection.cursor()
     
-    # SQL para inserir ou atualizar tracks
+    if not check_surrogate_keys(cursor, 'dim_tracks', 'track_sk', 'track_id', df_tracks) \
+            or not remove_moved_tracks(connection, cursor, df_tracks):
+        cursor.close()
+        return False
+    
+    # SQL para inserir ou atualizar tracks (nunca a chave natural: track_sk -> track_id é fixo)
     insert_query = """
         INSERT INTO dim_tracks (
-            track_id, track_name, artist_id, album_id,
-            duration_ms, explicit, popularity, release_date
+            track_sk, track_id, track_name, artist_sk, album_id,
+            duration_ms, explicit, popularity, release_date, release_year
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE
             track_name = VALUES(track_name),
-            artist_id = VALUES(artist_id),
+            artist_sk = VALUES(artist_sk),
             duration_ms = VALUES(duration_ms),
             explicit = VALUES(explicit),
             popularity = VALUES(popularity),
             release_date = VALUES(release_date),
+            release_year = VALUES(release_year),
             updated_at = CURRENT_TIMESTAMP
     """
     
-    # NOVO: Buscar todos os artist_ids válidos que existem no banco
+    # NOVO: Buscar todos os artist_sk válidos que existem no banco
     print("  🔍 Verificando artistas válidos no banco...")
-    cursor.execute("SELECT artist_id FROM dim_artists")
-    valid_artist_ids = set(row[0] for row in cursor.fetchall())
-    print(f"  ✅ {len(valid_artist_ids):,} artistas válidos encontrados")
+    cursor.execute("SELECT artist_sk FROM dim_artists")
+    valid_artist_sks = set(row[0] for row in cursor.fetchall())
+    print(f"  ✅ {len(valid_artist_sks):,} artistas válidos encontrados")
     
-    # Preparar dados
+    # Preparar dados (ordenados por ano: os lotes preenchem uma partição por vez)
     records = []
     skipped = 0
     errors = 0
     
-    for _, row in df_tracks.iterrows():
+    for _, row in df_tracks.sort_values('release_year', kind='stable').iterrows():
         try:
             # Processar data de lançamento
             release_date = None
@@ -147,35 +240,25 @@ def load_tracks(connection, df_tracks):
                 except:
                     release_date = None
             
-            # Pegar artist_id
-            artist_id = str(row.get('primary_artist_id', '')) if pd.notna(row.get('primary_artist_id')) else None
+            # Pegar artist_sk (nulo quando o artista não existe em artists)
+            artist_sk = int(row['artist_sk']) if pd.notna(row.get('artist_sk')) else None
             
-            # NOVO: Verificar se o artist_id existe antes de inserir
-            if artist_id and artist_id not in valid_artist_ids:
+            # NOVO: Verificar se o artista existe antes de inserir
+            if pd.notna(row.get('primary_artist_id')) and artist_sk not in valid_artist_sks:
                 skipped += 1
                 continue  # Pular esta música
             
-<<<<<<< Updated upstream
             records.append((
+                int(row['track_sk']),
                 str(row['track_id']),
                 str(row['track_name'])[:255],
-                artist_id,  # Pode ser None se não tiver artista
-=======
-            # NOVO: Limitar track_name a 255 caracteres
-            track_name = str(row['track_name'])
-            if len(track_name) > 255:
-                track_name = track_name[:255]
-            
-            records.append((
-                str(row['track_id']),
-                track_name,  # Já limitado a 255 caracteres
-                artist_id,
->>>>>>> Stashed changes
+                artist_sk,  # Pode ser None se não tiver artista
                 None,  # album_id (não temos no dataset)
                 int(row.get('duration_ms', 0)),
                 bool(row.get('explicit', False)),
                 int(row.get('track_popularity', 0)),
-                release_date
+                release_date,
+                int(row['release_year'])
             ))
         except Exception as e:
             errors += 1
@@ -185,18 +268,11 @@ def load_tracks(connection, df_tracks):
     if skipped > 0:
         print(f"  ⚠️ {skipped:,} músicas puladas (artista não encontrado)")
     
-    if skipped > 0:
-        print(f"  ⚠️ {skipped:,} músicas puladas (artista não encontrado)")
-    
     if errors > 5:
         print(f"  ⚠️ Total de erros ao processar: {errors}")
     
     try:
-<<<<<<< Updated upstream
         # Inserir em lotes
-=======
-        # Inserir em lotes menores para evitar timeout
->>>>>>> Stashed changes
         batch_size = 500
         total_inserted = 0
         
@@ -218,6 +294,8 @@ def load_tracks(connection, df_tracks):
 
 def load_audio_features(connection, df_features):
     """Carrega audio features na tabela dim_audio_features"""
+    from mysql.connector import Error
+    
     print("\n🎚️ Carregando audio features...")
     
     cursor = connection.cursor()
@@ -225,11 +303,11 @@ def load_audio_features(connection, df_features):
     # SQL para inserir ou atualizar audio features
     insert_query = """
         INSERT INTO dim_audio_features (
-            track_id, danceability, energy, key_value, loudness, mode_value,
+            track_sk, release_year, danceability, energy, key_value, loudness, mode_value,
             speechiness, acousticness, instrumentalness, liveness, valence,
             tempo, time_signature
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE
             danceability = VALUES(danceability),
             energy = VALUES(energy),
@@ -243,29 +321,31 @@ def load_audio_features(connection, df_features):
             valence = VALUES(valence),
             tempo = VALUES(tempo),
             time_signature = VALUES(time_signature),
+            release_year = VALUES(release_year),
             updated_at = CURRENT_TIMESTAMP
     """
     
-    # NOVO: Buscar track_ids válidos
+    # NOVO: Buscar track_sk válidos (com o ano, chave de partição das features)
     print("  🔍 Verificando músicas válidas no banco...")
-    cursor.execute("SELECT track_id FROM dim_tracks")
-    valid_track_ids = set(row[0] for row in cursor.fetchall())
-    print(f"  ✅ {len(valid_track_ids):,} músicas válidas encontradas")
+    cursor.execute("SELECT track_sk, release_year FROM dim_tracks")
+    valid_track_sks = dict(cursor.fetchall())
+    print(f"  ✅ {len(valid_track_sks):,} músicas válidas encontradas")
     
     # Preparar dados
     records = []
     skipped = 0
     
     for _, row in df_features.iterrows():
-        track_id = str(row['track_id'])
+        track_sk = int(row['track_sk'])
         
         # Verificar se a música existe no banco
-        if track_id not in valid_track_ids:
+        if track_sk not in valid_track_sks:
             skipped += 1
             continue
         
         records.append((
-            track_id,
+            track_sk,
+            valid_track_sks[track_sk],
             float(row.get('danceability', 0)),
             float(row.get('energy', 0)),
             int(row.get('key', 0)),
@@ -283,6 +363,9 @@ def load_audio_features(connection, df_features):
     if skipped > 0:
         print(f"  ⚠️ {skipped:,} audio features puladas (música não encontrada)")
     
+    # Uma partição por vez
+    records.sort(key=lambda record: record[1])
+    
     try:
         # Inserir em lotes
         batch_size = 500
@@ -304,6 +387,321 @@ def load_audio_features(connection, df_features):
     finally:
         cursor.close()
 
+def decade_partitions(first_decade=FIRST_DECADE, last_decade=LAST_DECADE):
+    """Cláusula PARTITION BY RANGE (release_year) com uma partição por década"""
+    partitions = [f"    PARTITION p_antigas VALUES LESS THAN ({first_decade})"]
+    for decade in range(first_decade, last_decade + 1, 10):
+        partitions.append(f"    PARTITION p{decade} VALUES LESS THAN ({decade + 10})")
+    partitions.append("    PARTITION p_futuras VALUES LESS THAN MAXVALUE")
+    return "PARTITION BY RANGE (release_year) (\n" + ",\n".join(partitions) + "\n)"
+
+def partition_name(year, first_decade=FIRST_DECADE, last_decade=LAST_DECADE):
+    """Nome da partição que contém um ano"""
+    if year < first_decade:
+        return 'p_antigas'
+    if year >= last_decade + 10:
+        return 'p_futuras'
+    return f"p{year // 10 * 10}"
+
+def partitioned_ddl(first_decade=FIRST_DECADE, last_decade=LAST_DECADE):
+    """Gera o DDL de dim_tracks e dim_audio_features particionadas por década
+    
+    Restrições do MySQL para tabelas particionadas: toda chave única precisa conter
+    release_year e não há FOREIGN KEYs. O que o esquema deixa de garantir:
+      - track_sk e track_id únicos em dim_tracks: garantidos pela carga (check_surrogate_keys
+        recusa chaves repetidas ou trocadas, remove_moved_tracks apaga a linha antiga de uma
+        música que mudou de ano)
+      - dim_tracks.artist_sk -> dim_artists e dim_audio_features.track_sk -> dim_tracks:
+        a carga só insere artistas/músicas existentes, e diagnostico.py verifica os arquivos
+      - dim_tracks.album_id -> dim_albums: sem verificação (album_id não é carregado)
+    
+    Os índices precisam acompanhar os das migrações em sql/migracoes: schema_migracoes continua
+    marcando todas como aplicadas depois que as tabelas são recriadas
+    """
+    partitions = decade_partitions(first_decade, last_decade)
+    return [
+        "DROP TABLE IF EXISTS dim_audio_features",
+        "DROP TABLE IF EXISTS dim_tracks",
+        f"""CREATE TABLE dim_tracks (
+    track_sk INT UNSIGNED NOT NULL,
+    track_id VARCHAR(50) NOT NULL,
+    track_name VARCHAR(255) NOT NULL,
+    artist_sk INT UNSIGNED,
+    album_id VARCHAR(50),
+    duration_ms INT,
+    explicit BOOLEAN,
+    popularity INT,
+    release_date DATE,
+    release_year SMALLINT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- Sem UNIQUE em track_sk/track_id nem FOREIGN KEYs (ver partitioned_ddl): a carga garante
+    PRIMARY KEY (track_sk, release_year),
+    INDEX idx_track_id (track_id),
+    INDEX idx_artist_sk (artist_sk),
+    INDEX idx_track_name (track_name),
+    INDEX idx_popularity (popularity),
+    INDEX idx_release_date (release_date),
+    -- V003: paginação por chave da API (/musicas/top)
+    INDEX idx_popularity_track_id (popularity, track_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+{partitions}""",
+        f"""CREATE TABLE dim_audio_features (
+    track_sk INT UNSIGNED NOT NULL,
+    release_year SMALLINT NOT NULL,
+    danceability DECIMAL(5,4),
+    energy DECIMAL(5,4),
+    key_value INT,
+    loudness DECIMAL(6,3),
+    mode_value INT,
+    speechiness DECIMAL(5,4),
+    acousticness DECIMAL(5,4),
+    instrumentalness DECIMAL(5,4),
+    liveness DECIMAL(5,4),
+    valence DECIMAL(5,4),
+    tempo DECIMAL(6,3),
+    time_signature INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- Sem FOREIGN KEY para dim_tracks (ver partitioned_ddl)
+    PRIMARY KEY (track_sk, release_year),
+    INDEX idx_danceability (danceability),
+    INDEX idx_energy (energy),
+    INDEX idx_valence (valence)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+{partitions}""",
+    ]
+
+def create_partitioned_tables(connection):
+    """Recria dim_tracks e dim_audio_features particionadas (apaga os dados das duas tabelas)"""
+    from mysql.connector import Error
+    
+    print("\n🧱 Recriando tabelas particionadas por década...")
+    
+    cursor = connection.cursor()
+    try:
+        for statement in partitioned_ddl():
+            cursor.execute(statement)
+        connection.commit()
+        print(f"  ✅ dim_tracks e dim_audio_features particionadas ({FIRST_DECADE}-{LAST_DECADE})")
+        return True
+    except Error as e:
+        print(f"  ❌ Erro ao criar tabelas particionadas: {e}")
+        return False
+    finally:
+        cursor.close()
+
+def is_partitioned(cursor, table):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.PARTITIONS
+        WHERE table_schema = %s AND table_name = %s AND partition_name IS NOT NULL
+    """, (DB_CONFIG['database'], table))
+    return cursor.fetchone()[0] > 0
+
+def decade_track_sks(connection, decade):
+    """track_sk das músicas que hoje estão gravadas na década (antes de esvaziá-la)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT track_sk FROM dim_tracks WHERE release_year >= %s AND release_year < %s",
+            (decade, decade + 10)
+        )
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def clear_decade(connection, decade):
+    """Esvazia uma década em dim_audio_features e dim_tracks (TRUNCATE PARTITION quando particionadas)"""
+    from mysql.connector import Error
+    
+    cursor = connection.cursor()
+    try:
+        for table in ['dim_audio_features', 'dim_tracks']:
+            if is_partitioned(cursor, table):
+                cursor.execute(f"ALTER TABLE {table} TRUNCATE PARTITION {partition_name(decade)}")
+            else:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE release_year >= %s AND release_year < %s",
+                    (decade, decade + 10)
+                )
+        connection.commit()
+        print(f"  🧹 Década {decade} esvaziada ({partition_name(decade)})")
+        return True
+    except Error as e:
+        print(f"  ❌ Erro ao esvaziar a década {decade}: {e}")
+        connection.rollback()
+        return False
+    finally:
+        cursor.close()
+
+def split_sql_statements(sql_text):
+    """Remove comentários '--' e separa um script SQL em comandos"""
+    lines = [re.sub(r'--.*$', '', line) for line in sql_text.splitlines()]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+def translate_to_duckdb(statement):
+    """Traduz um comando MySQL dos scripts em sql/ para DuckDB (None = não se aplica)"""
+    keyword = statement.split(None, 1)[0].upper()
+    
+    # Comandos de sessão/servidor e limpeza manual não existem no banco embarcado
+    if keyword in ('USE', 'SET', 'TRUNCATE', 'DESCRIBE') or statement.upper().startswith('CREATE DATABASE'):
+        return None
+    
+    if statement.upper().startswith('CREATE TABLE') and 'SELECT' not in statement.upper():
+        # Índices e FKs inline não são suportados (a integridade é verificada por diagnostico.py)
+        lines = [line for line in statement.splitlines()
+                 if not re.match(r'\s*(INDEX|KEY|FOREIGN KEY)\b', line, re.IGNORECASE)]
+        statement = '\n'.join(lines)
+        statement = re.sub(r',(\s*)\)', r'\1)', statement)
+        statement = re.sub(r'\)\s*ENGINE=.*$', ')', statement, flags=re.DOTALL)
+        statement = re.sub(r'\bINT UNSIGNED\b', 'UINTEGER', statement, flags=re.IGNORECASE)
+        statement = re.sub(r'\s+AUTO_INCREMENT\b', '', statement, flags=re.IGNORECASE)
+        statement = re.sub(r'\s+ON UPDATE CURRENT_TIMESTAMP', '', statement, flags=re.IGNORECASE)
+        return statement
+    
+    # Tabelas auxiliares criadas a partir de SELECT podem ser recriadas
+    statement = re.sub(r'^CREATE TABLE\s+(\w+)\s+AS', r'CREATE OR REPLACE TABLE \1 AS', statement, flags=re.IGNORECASE)
+    statement = re.sub(r'^CREATE INDEX\b', 'CREATE INDEX IF NOT EXISTS', statement, flags=re.IGNORECASE)
+    
+    # FORMAT(x, 0) do MySQL -> separador de milhar
+    statement = re.sub(r'FORMAT\(([^,()]+),\s*0\)', r"format('{:,}', \1)", statement, flags=re.IGNORECASE)
+    
+    # Aspas duplas como literal de texto (THEN "x", ELSE "x") -> aspas simples
+    statement = re.sub(r'\b(THEN|ELSE)(\s+)"([^"]*)"', r"\1\2'\3'", statement, flags=re.IGNORECASE)
+    
+    return statement
+
+def read_sql_file(filename):
+    with open(os.path.join(SQL_PATH, filename), encoding='utf-8') as f:
+        return split_sql_statements(f.read())
+
+def run_duckdb_script(connection, filename, kinds):
+    """Executa os comandos traduzidos de um script cujo tipo (1ª palavra) está em kinds"""
+    executed = 0
+    for statement in read_sql_file(filename):
+        translated = translate_to_duckdb(statement)
+        if translated is None or translated.split(None, 1)[0].upper() not in kinds:
+            continue
+        connection.execute(translated)
+        executed += 1
+    return executed
+
+def migration_files():
+    """Arquivos de sql/migracoes/ em ordem de versão (o esquema vem só das migrações)"""
+    path = os.path.join(SQL_PATH, MIGRATIONS_SQL_DIR)
+    matches = [MIGRATION_FILE_PATTERN.match(name) for name in os.listdir(path)]
+    return [os.path.join(MIGRATIONS_SQL_DIR, m.group(0))
+            for m in sorted((m for m in matches if m), key=lambda m: int(m.group(1)))]
+
+def connect_to_duckdb(path=DUCKDB_PATH, recreate=False):
+    """Abre (ou recria) o banco DuckDB local"""
+    try:
+        import duckdb
+    except ImportError:
+        print("❌ Backend DuckDB indisponível: instale o pacote 'duckdb'")
+        return None
+    
+    if recreate and os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = duckdb.connect(path)
+    print(f"✅ Conectado ao DuckDB: {path}")
+    return connection
+
+def load_into_duckdb(connection, tracks_path, artists_path, features_path):
+    """Carga completa no DuckDB: esquema de sql/migracoes, dados lidos direto dos arquivos, views de sql/03"""
+    print("\n🦆 Carregando no DuckDB...")
+    
+    # ALTER TABLE das migrações só mexe em índices, que o DuckDB não usa aqui
+    files = migration_files()
+    created = sum(run_duckdb_script(connection, filename, {'CREATE'}) for filename in files)
+    print(f"  ✅ {created} tabelas criadas a partir de {len(files)} migrações em {MIGRATIONS_SQL_DIR}/")
+    
+    def quote(path):
+        return "'" + path.replace("'", "''") + "'"
+    
+    # Mesmas regras do loader MySQL: músicas só com artista existente, features só de músicas carregadas
+    connection.execute(f"""
+        INSERT INTO dim_artists (artist_sk, artist_id, artist_name, genres, followers, popularity)
+        SELECT artist_sk, artist_id, artist_name, CAST(artist_genres AS VARCHAR),
+               COALESCE(artist_followers, 0), COALESCE(artist_popularity, 0)
+        FROM read_csv({quote(artists_path)}, header = true)
+    """)
+    connection.execute(f"""
+        INSERT INTO dim_tracks (
+            track_sk, track_id, track_name, artist_sk, album_id,
+            duration_ms, explicit, popularity, release_date, release_year
+        )
+        SELECT track_sk, track_id, LEFT(CAST(track_name AS VARCHAR), 255), artist_sk, NULL,
+               duration_ms, explicit, COALESCE(track_popularity, 0),
+               TRY_CAST(release_date AS DATE), CAST(release_year AS SMALLINT)
+        FROM read_csv({quote(tracks_path)}, header = true)
+        WHERE primary_artist_id IS NULL OR artist_sk IN (SELECT artist_sk FROM dim_artists)
+    """)
+    if os.path.exists(features_path):
+        connection.execute(f"""
+            INSERT INTO dim_audio_features (
+                track_sk, release_year, danceability, energy, key_value, loudness, mode_value,
+                speechiness, acousticness, instrumentalness, liveness, valence,
+                tempo, time_signature
+            )
+            SELECT f.track_sk, t.release_year, f.danceability, f.energy, f."key", f.loudness, f."mode",
+                   f.speechiness, f.acousticness, f.instrumentalness, f.liveness, f.valence,
+                   f.tempo, f.time_signature
+            FROM read_csv({quote(features_path)}, header = true) f
+            INNER JOIN dim_tracks t ON t.track_sk = f.track_sk
+        """)
+    
+    # Ajustes pós-carga do script de criação (ex.: genres 'nan' -> NULL)
+    run_duckdb_script(connection, SCHEMA_SQL_FILE, {'UPDATE'})
+    
+    views = run_duckdb_script(connection, VIEWS_SQL_FILE, {'CREATE'})
+    print(f"  ✅ {views} views/tabelas auxiliares criadas a partir de {VIEWS_SQL_FILE}")
+    bump_data_version(connection, backend='duckdb')
+    
+    for name, table in [("Artistas", "dim_artists"), ("Músicas", "dim_tracks"), ("Audio Features", "dim_audio_features")]:
+        count = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"  {name}: {count:,} registros")
+
+def run_analytical_queries(connection):
+    """Executa as queries de sql/02 traduzidas, no próprio processo"""
+    for statement in read_sql_file(QUERIES_SQL_FILE):
+        translated = translate_to_duckdb(statement)
+        if translated is None or translated.split(None, 1)[0].upper() != 'SELECT':
+            continue
+        
+        print("\n" + "-" * 80)
+        print(" ".join(statement.split())[:100])
+        print("-" * 80)
+        print(connection.execute(translated).df().to_string(index=False))
+
+def bump_data_version(connection, backend='mysql'):
+    """Grava uma versão nova em dados_versao, invalidando o cache de consultas
+
+    A versão é o instante da carga (µs) e não um contador: o DuckDB é recriado a cada
+    carga e um contador voltaria a valores já usados por entradas antigas do cache
+    """
+    version = time.time_ns() // 1000
+    if backend == 'duckdb':
+        connection.execute("INSERT OR REPLACE INTO dados_versao VALUES (1, ?, current_timestamp)", [version])
+        return version
+
+    from mysql.connector import Error
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO dados_versao (id, versao, carregado_em) VALUES (1, %s, CURRENT_TIMESTAMP)
+            ON DUPLICATE KEY UPDATE versao = VALUES(versao), carregado_em = VALUES(carregado_em)
+        """, (version,))
+        connection.commit()
+        print(f"  🏷️ Versão dos dados: {version}")
+        return version
+    except Error as e:
+        print(f"  ⚠️ Versão dos dados não atualizada ({e}): execute python -m musicmetrics migrar")
+        return None
+    finally:
+        cursor.close()
+
 def verify_load(connection):
     """Verifica a carga dos dados"""
     print("\n" + "=" * 80)
@@ -328,6 +726,27 @@ def verify_load(connection):
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Carga dos dados processados no MySQL')
+    parser.add_argument('--ddl-particionado', action='store_true',
+                        help='apenas imprime o DDL das tabelas particionadas por década')
+    parser.add_argument('--criar-particionado', action='store_true',
+                        help='recria dim_tracks e dim_audio_features particionadas antes da carga')
+    parser.add_argument('--decada', type=int, default=None,
+                        help='recarrega somente a década informada (ex.: 1980)')
+    parser.add_argument('--backend', choices=['mysql', 'duckdb'], default='mysql',
+                        help='destino da carga (duckdb = banco local embarcado)')
+    parser.add_argument('--consultas', action='store_true',
+                        help='com --backend duckdb: executa as queries de 02_Queries_Analiticas.sql após a carga')
+    args = parser.parse_args()
+    
+    if args.ddl_particionado:
+        print(";\n\n".join(partitioned_ddl()) + ";")
+        return
+    
+    if args.decada is not None and not FIRST_DECADE <= args.decada < LAST_DECADE + 10:
+        print(f"❌ Década fora das partições ({FIRST_DECADE}-{LAST_DECADE}): {args.decada}")
+        return
+    
     print("\n" + "=" * 80)
     print("🎵 MUSICMETRICS - CARGA DE DADOS NO MYSQL")
     print("=" * 80)
@@ -342,6 +761,19 @@ def main():
         print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
         return
     
+    if args.backend == 'duckdb':
+        connection = connect_to_duckdb(recreate=True)
+        if connection is None:
+            return
+        try:
+            load_into_duckdb(connection, tracks_path, artists_path, features_path)
+            if args.consultas:
+                run_analytical_queries(connection)
+            print("\n✅ CARGA NO DUCKDB CONCLUÍDA!")
+        finally:
+            connection.close()
+        return
+    
     # Conectar ao MySQL
     connection = connect_to_mysql()
     if not connection:
@@ -349,6 +781,9 @@ def main():
         print("   Verifique suas credenciais no arquivo .env")
         return
     
+    # Ligado antes da primeira escrita: cada lote é confirmado na hora, então mesmo uma carga
+    # interrompida muda os dados e precisa de uma versão nova (ver finally)
+    data_changed = False
     try:
         # Carregar arquivos CSV
         print("\n📂 Carregando arquivos processados...")
@@ -363,16 +798,38 @@ def main():
             print("❌ Erro ao carregar arquivos")
             return
         
+        if args.criar_particionado and not create_partitioned_tables(connection):
+            return
+        
         # Carregar no MySQL (ordem importa devido às foreign keys)
         print("\n" + "=" * 80)
         print("🗄️ INICIANDO CARGA NO BANCO DE DADOS")
         print("=" * 80)
         
-        # 1. Carregar artistas primeiro (tabela pai)
-        success = load_artists(connection, df_artists)
-        if not success:
-            print("❌ Falha ao carregar artistas")
-            return
+        if args.decada is not None:
+            # Recarga de uma única década: artistas já estão no banco
+            decade = args.decada // 10 * 10
+            in_decade = (df_tracks['release_year'] >= decade) & (df_tracks['release_year'] < decade + 10)
+            # Músicas gravadas na década que mudaram de ano também são recarregadas (no ano novo):
+            # o esvaziamento apaga a linha delas e só o filtro pelo ano novo não as reinseriria
+            stored = df_tracks['track_sk'].isin(decade_track_sks(connection, decade))
+            moved_out = int((stored & ~in_decade).sum())
+            df_tracks = df_tracks[in_decade | stored]
+            if df_features is not None:
+                df_features = df_features[df_features['track_sk'].isin(df_tracks['track_sk'])]
+            print(f"\n📅 Recarregando década {decade}: {len(df_tracks):,} músicas"
+                  f" ({moved_out:,} saíram da década)")
+            
+            data_changed = True
+            if not clear_decade(connection, decade):
+                return
+        else:
+            # 1. Carregar artistas primeiro (tabela pai)
+            data_changed = True
+            success = load_artists(connection, df_artists)
+            if not success:
+                print("❌ Falha ao carregar artistas")
+                return
         
         # 2. Carregar tracks
         success = load_tracks(connection, df_tracks)
@@ -398,6 +855,9 @@ def main():
     except Exception as e:
         print(f"\n❌ Erro durante a carga: {e}")
     finally:
+        # Nova versão dos dados: o cache de consultas passa a ignorar os resultados anteriores
+        if data_changed and connection.is_connected():
+            bump_data_version(connection)
         if connection and connection.is_connected():
             connection.close()
             print("\n🔌 Conexão com MySQL fechada")
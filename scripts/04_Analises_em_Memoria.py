@@ -0,0 +1,394 @@
+"""
+MusicMetrics - Análises em Memória
+Reproduz as queries de 02_Queries_Analiticas.sql com pandas/NumPy sobre os dados processados,
+sem precisar de um servidor MySQL
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import sys
+import time
+import argparse
+
+# Raiz do repositório no path: o script também roda direto, fora da CLI
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+# ============================================
+
+# Caminhos dos arquivos processados
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TRACKS_FILE = 'tracks_limpo.csv'
+ARTISTS_FILE = 'artists_limpo.csv'
+AUDIO_FEATURES_FILE = 'audios_limpos.csv'
+
+# Casas decimais das colunas DECIMAL de dim_audio_features (ver sql/migracoes/V001__esquema_inicial.sql)
+DECIMAL_FEATURES = {
+    'danceability': 4, 'energy': 4, 'speechiness': 4, 'acousticness': 4,
+    'instrumentalness': 4, 'liveness': 4, 'valence': 4,
+    'loudness': 3, 'tempo': 3
+}
+
+# --comparar: ganho mínimo esperado sobre as mesmas queries no banco e repetições por medida
+TARGET_SPEEDUP = 10
+COMPARE_RUNS = 5
+
+# ============================================
+
+def round_half_up(values, decimals=0):
+    """Arredonda como o ROUND() do MySQL (metade para longe do zero)"""
+    values = np.asarray(values, dtype=float)
+    factor = 10.0 ** decimals
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5) / factor
+
+def load_model():
+    """Monta tracks, artistas e features como ficam no banco após 03_Carregamento_dos_Dados.py"""
+    print("📂 Carregando dados processados...")
+
+    df_artists = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, ARTISTS_FILE),
+        usecols=['artist_sk', 'artist_id', 'artist_name', 'artist_popularity', 'artist_followers', 'artist_genres'],
+        dtype={'artist_id': str, 'artist_name': str, 'artist_genres': str}
+    ).rename(columns={
+        'artist_popularity': 'popularity',
+        'artist_followers': 'followers',
+        'artist_genres': 'genres'
+    })
+    df_artists['popularity'] = df_artists['popularity'].fillna(0).astype(np.int64)
+    df_artists['followers'] = df_artists['followers'].fillna(0).astype(np.int64)
+
+    # O loader grava str(genres): vazio vira 'nan', e o UPDATE do script SQL converte em NULL
+    genres = df_artists['genres'].fillna('nan')
+    df_artists['genres'] = genres.where(~genres.isin(['nan', '', '[]']))
+
+    df_tracks = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE),
+        usecols=['track_id', 'track_popularity', 'duration_ms', 'explicit',
+                 'primary_artist_id', 'release_date'],
+        dtype={'track_id': str, 'primary_artist_id': str}
+    ).rename(columns={'track_popularity': 'popularity', 'primary_artist_id': 'artist_id'})
+    df_tracks = df_tracks.drop_duplicates(subset=['track_id'], keep='last')
+
+    # Músicas com artista inexistente são puladas pelo loader
+    has_artist = df_tracks['artist_id'].notna()
+    valid_artist = df_tracks['artist_id'].isin(df_artists['artist_id'])
+    df_tracks = df_tracks[~has_artist | valid_artist].reset_index(drop=True)
+
+    df_tracks['release_year'] = pd.to_datetime(df_tracks['release_date'], errors='coerce').dt.year
+    df_tracks['explicit'] = df_tracks['explicit'].astype(bool)
+
+    df_features = None
+    features_path = os.path.join(PROCESSED_DATA_PATH, AUDIO_FEATURES_FILE)
+    if os.path.exists(features_path):
+        df_features = pd.read_csv(features_path, dtype={'track_id': str})
+        df_features = df_features.drop_duplicates(subset=['track_id'], keep='last')
+        df_features = df_features[df_features['track_id'].isin(df_tracks['track_id'])]
+
+        # Mesma precisão das colunas DECIMAL do MySQL
+        for col, decimals in DECIMAL_FEATURES.items():
+            if col in df_features.columns:
+                df_features[col] = round_half_up(df_features[col], decimals)
+
+        # Anexar as features às tracks (equivalente ao LEFT JOIN dim_audio_features)
+        feature_cols = [col for col in DECIMAL_FEATURES if col in df_features.columns]
+        df_tracks = df_tracks.merge(df_features[['track_id'] + feature_cols], on='track_id', how='left')
+
+    print(f"✅ {len(df_artists):,} artistas | {len(df_tracks):,} músicas")
+
+    return df_tracks, df_artists
+
+def top_artists_with_tracks(df_tracks, df_artists):
+    """Equivalente à view vw_top_artists_with_tracks"""
+    stats = df_tracks.groupby('artist_id', sort=False)['popularity'].agg(
+        total_tracks='count', avg_track_popularity='mean', max_track_popularity='max'
+    )
+
+    df = df_artists[df_artists['popularity'] > 0].join(stats, on='artist_id', how='inner')
+    df['avg_track_popularity'] = round_half_up(df['avg_track_popularity'], 1)
+
+    # Empates desfeitos por artist_sk, como nas queries de 02_Queries_Analiticas.sql
+    return df.sort_values(['popularity', 'artist_sk'], ascending=[False, True]).reset_index(drop=True)
+
+def music_by_decade(df_tracks):
+    """Equivalente à view vw_music_by_decade"""
+    df = df_tracks[df_tracks['release_year'].between(1900, 2025)]
+    decade = (df['release_year'] // 10 * 10).astype(np.int64).rename('decade')
+
+    result = df.groupby(decade).agg(
+        total_tracks=('track_id', 'count'),
+        avg_popularity=('popularity', 'mean'),
+        avg_duration_min=('duration_ms', lambda x: (x / 60000).mean()),
+        **{f'avg_{col}': (col, 'mean') for col in ['danceability', 'energy', 'valence', 'tempo', 'acousticness']
+           if col in df.columns}
+    )
+
+    return result.reset_index()
+
+def query_top_artists(df_tracks, df_artists):
+    """Top 10 artistas mais populares"""
+    df = top_artists_with_tracks(df_tracks, df_artists).head(10)
+    return pd.DataFrame({
+        'Artista': df['artist_name'],
+        'Popularidade': df['popularity'],
+        'Seguidores': df['followers'].map('{:,}'.format)
+    })
+
+def query_explicit(df_tracks, df_artists):
+    """Músicas explicítas x Não explicítas"""
+    counts = df_tracks['explicit'].value_counts().sort_index()
+    return pd.DataFrame({
+        'Tipo': np.where(counts.index, 'Explicíta', 'Não Explicíta'),
+        'Contagem': counts.values,
+        'Percentual': round_half_up(counts.values * 100.0 / len(df_tracks), 2)
+    })
+
+def query_duration(df_tracks, df_artists):
+    """Duração média das músicas"""
+    duration = df_tracks['duration_ms'].to_numpy(dtype=float)
+    return pd.DataFrame({
+        'Duração Média (min)': [round_half_up(np.nanmean(duration) / 60000, 2)],
+        'Música mais Longa (min)': [round_half_up(np.nanmax(duration) / 60000, 2)],
+        'Música mais Curta (min)': [round_half_up(np.nanmin(duration) / 60000, 2)]
+    })
+
+def query_most_tracks(df_tracks, df_artists):
+    """Top 5 artistas com mais músicas"""
+    df = top_artists_with_tracks(df_tracks, df_artists)
+    df = df[df['total_tracks'] >= 10].sort_values(['total_tracks', 'artist_sk'], ascending=[False, True]).head(5)
+    return pd.DataFrame({'Artista': df['artist_name'], 'Total de Músicas': df['total_tracks']})
+
+def query_decade_popularity(df_tracks, df_artists):
+    """Evolução da popularidade por década"""
+    df = music_by_decade(df_tracks)
+    return pd.DataFrame({
+        'Decáda': df['decade'],
+        'Total de Músicas': df['total_tracks'],
+        'Popularidade Média': round_half_up(df['avg_popularity'], 1),
+        'Categoria': pd.cut(df['avg_popularity'], bins=[-np.inf, 10, 25, 40, np.inf], right=False,
+                            labels=['Muito Baixa', 'Baixa', 'Média', 'Alta']).astype(str)
+    })
+
+def query_top_genres(df_tracks, df_artists):
+    """Top 10 gêneros musicais mais comuns"""
+    counts = df_artists.dropna(subset=['genres']).groupby('genres').agg(
+        total=('artist_sk', 'size'), first_sk=('artist_sk', 'min')
+    )
+    counts = counts.sort_values(['total', 'first_sk'], ascending=[False, True]).head(10)
+    return pd.DataFrame({'Gênero': counts.index, 'Quantidade de Artistas': counts['total'].values})
+
+def query_one_hit(df_tracks, df_artists):
+    """Artistas com apenas one-hit"""
+    df = top_artists_with_tracks(df_tracks, df_artists)
+    df = df[(df['total_tracks'] == 1) & (df['max_track_popularity'] > 70)]
+    df = df.sort_values(['max_track_popularity', 'artist_sk'], ascending=[False, True])
+    return pd.DataFrame({
+        'Artista': df['artist_name'],
+        'Total de Músicas': df['total_tracks'],
+        'Popularidade da Música': df['max_track_popularity']
+    })
+
+def query_decade_features(df_tracks, df_artists):
+    """Características Musicais a partir da Década de 1980"""
+    df = music_by_decade(df_tracks)
+    df = df[df['decade'] >= 1980]
+    return pd.DataFrame({
+        'Década': df['decade'],
+        'Dançabilidade': round_half_up(df['avg_danceability'], 3),
+        'Energizada': round_half_up(df['avg_energy'], 3),
+        'Valencia': round_half_up(df['avg_valence'], 3),
+        'Tempo': round_half_up(df['avg_tempo'], 3)
+    })
+
+def query_versatility(df_tracks, df_artists):
+    """Artistas mais versáteis (tb_artist_versatility)"""
+    df = df_tracks[df_tracks['danceability'].notna() & df_tracks['artist_id'].notna()]
+    stats = df.groupby('artist_id', sort=False)['danceability'].agg(
+        total_tracks='count', max_danceability='max', min_danceability='min'
+    )
+    stats['variacao'] = round_half_up(stats['max_danceability'] - stats['min_danceability'], 3)
+    stats['max_danceability'] = round_half_up(stats['max_danceability'], 3)
+    stats['min_danceability'] = round_half_up(stats['min_danceability'], 3)
+
+    df = df_artists.join(stats, on='artist_id', how='inner')
+    df = df[df['total_tracks'] >= 20].sort_values(['variacao', 'artist_sk'], ascending=[False, True]).head(10)
+    return pd.DataFrame({
+        'Artista': df['artist_name'],
+        'Total de Músicas': df['total_tracks'],
+        'Maior Dançabilidade': df['max_danceability'],
+        'Menor Dançabilidade': df['min_danceability'],
+        'Variação': df['variacao']
+    })
+
+def query_popularity_features(df_tracks, df_artists):
+    """Correlação: Popularidade vs Features de Áudio"""
+    df = df_tracks.dropna(subset=['energy', 'danceability', 'valence'])
+    popularity = df['popularity']
+    categoria = np.select(
+        [popularity > 80, popularity.between(40, 60), popularity < 20],
+        ['Populares', 'Medianas', 'Pouco Populares'],
+        default=''
+    )
+    df = df[categoria != ''].assign(Categoria=categoria[categoria != ''])
+
+    result = df.groupby('Categoria').agg(
+        Energia=('energy', 'mean'),
+        Dançabilidade=('danceability', 'mean'),
+        Valência=('valence', 'mean'),
+        **{'Total de Músicas': ('track_id', 'count')}
+    )
+    result = result.reindex([c for c in ['Populares', 'Medianas', 'Pouco Populares'] if c in result.index])
+    for col in ['Energia', 'Dançabilidade', 'Valência']:
+        result[col] = round_half_up(result[col], 3)
+
+    return result.reset_index()
+
+# Queries na mesma ordem de 02_Queries_Analiticas.sql
+QUERIES = {
+    'top_artistas': query_top_artists,
+    'explicitas': query_explicit,
+    'duracao': query_duration,
+    'artistas_mais_musicas': query_most_tracks,
+    'popularidade_por_decada': query_decade_popularity,
+    'top_generos': query_top_genres,
+    'one_hit': query_one_hit,
+    'features_por_decada': query_decade_features,
+    'artistas_versateis': query_versatility,
+    'popularidade_vs_features': query_popularity_features,
+}
+
+# Nome da query equivalente em 02_Queries_Analiticas.sql ('-- nome:'), quando difere
+SQL_QUERY_NAMES = {
+    'duracao': 'duracao_media',
+    'features_por_decada': 'features_desde_1980',
+}
+
+def run_all(df_tracks, df_artists):
+    """Executa todas as queries e retorna {nome: (DataFrame, segundos)}"""
+    results = {}
+    for name, query in QUERIES.items():
+        start = time.perf_counter()
+        df = query(df_tracks, df_artists)
+        results[name] = (df.reset_index(drop=True), time.perf_counter() - start)
+    return results
+
+def best_time(function, runs=COMPARE_RUNS):
+    """(resultado, menor tempo em segundos entre as repetições)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def normalize_result(df):
+    """Colunas por posição, números como float (DECIMAL do MySQL vem como Decimal) e o resto como texto"""
+    df = df.reset_index(drop=True)
+    df.columns = range(df.shape[1])
+    for col in df.columns:
+        numbers = pd.to_numeric(df[col], errors='coerce')
+        if numbers.notna().sum() == df[col].notna().sum():
+            df[col] = numbers.astype(float)
+        else:
+            df[col] = df[col].astype(str)
+    return df
+
+def connect_backend(backend):
+    """Conexão com o banco carregado por 03_Carregamento_dos_Dados.py (None se indisponível)"""
+    from musicmetrics.pipeline import load_script
+
+    loader = load_script('carregar')
+    return loader.connect_to_duckdb() if backend == 'duckdb' else loader.connect_to_mysql()
+
+def compare_with_database(df_tracks, df_artists, backend):
+    """Executa cada query em memória e no banco: exige resultados iguais e mede o ganho
+
+    Retorna True se todos os resultados bateram
+    """
+    from musicmetrics.queries import QueryCache
+
+    connection = connect_backend(backend)
+    if connection is None:
+        print(f"\n❌ Banco {backend} indisponível (execute: carregar --backend {backend})")
+        return False
+
+    try:
+        cache = QueryCache(connection, backend)
+        print(f"\n⚖️ Memória x {backend} (menor tempo de {COMPARE_RUNS} execuções)")
+        print(f"   {'Query':<28}{'banco':>12}{'memória':>12}{'ganho':>9}  resultado")
+
+        all_equal = True
+        database_total = memory_total = 0.0
+        for name, query in QUERIES.items():
+            sql = cache.sql(SQL_QUERY_NAMES.get(name, name))
+            expected, database_time = best_time(lambda: cache.execute(sql))
+            result, memory_time = best_time(lambda: query(df_tracks, df_artists))
+            database_total += database_time
+            memory_total += memory_time
+
+            try:
+                pd.testing.assert_frame_equal(normalize_result(result), normalize_result(expected),
+                                              check_exact=False, rtol=1e-9)
+                status = "✅ igual"
+            except AssertionError as e:
+                all_equal = False
+                status = "❌ diferente: " + " ".join(str(e).split())[:120]
+
+            print(f"   {name:<26}{database_time * 1000:>9.2f} ms{memory_time * 1000:>9.2f} ms"
+                  f"{database_time / memory_time:>8.1f}x  {status}")
+    finally:
+        connection.close()
+
+    speedup = database_total / memory_total
+    print(f"\n   Total: banco {database_total * 1000:.1f} ms | memória {memory_total * 1000:.1f} ms "
+          f"| ganho {speedup:.1f}x (meta: {TARGET_SPEEDUP}x)")
+    if speedup < TARGET_SPEEDUP:
+        print(f"  ⚠️ Ganho abaixo da meta de {TARGET_SPEEDUP}x")
+    if not all_equal:
+        print("  ❌ Há resultados diferentes dos do banco")
+    return all_equal
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Queries analíticas em memória (sem MySQL)')
+    parser.add_argument('--comparar', action='store_true',
+                        help='executa as mesmas queries no banco, confere os resultados e mede o ganho')
+    parser.add_argument('--backend', choices=['mysql', 'duckdb'], default='mysql',
+                        help='banco usado por --comparar')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🎵 MUSICMETRICS - ANÁLISES EM MEMÓRIA")
+    print("=" * 80)
+
+    tracks_path = os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE)
+    artists_path = os.path.join(PROCESSED_DATA_PATH, ARTISTS_FILE)
+
+    if not os.path.exists(tracks_path) or not os.path.exists(artists_path):
+        print("\n❌ ERRO: Arquivos processados não encontrados!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    start = time.perf_counter()
+    df_tracks, df_artists = load_model()
+    load_time = time.perf_counter() - start
+
+    results = run_all(df_tracks, df_artists)
+
+    for name, (df, elapsed) in results.items():
+        print("\n" + "-" * 80)
+        print(f"📊 {QUERIES[name].__doc__} ({elapsed * 1000:.1f} ms)")
+        print("-" * 80)
+        print(df.to_string(index=False) if not df.empty else "  (sem resultados)")
+
+    total_time = sum(elapsed for _, elapsed in results.values())
+    print("\n" + "=" * 80)
+    print(f"⏱️ Carga: {load_time:.2f} s | Queries: {total_time * 1000:.1f} ms")
+    print("=" * 80)
+
+    if args.comparar and not compare_with_database(df_tracks, df_artists, args.backend):
+        return 1
+
+if __name__ == "__main__":
+    main()
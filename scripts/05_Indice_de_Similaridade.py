@@ -0,0 +1,306 @@
+"""
+MusicMetrics - Índice de Similaridade entre Músicas
+Constrói um índice IVF (k-means + listas invertidas) sobre a matriz de audio features
+e responde "músicas parecidas" para um track_id, individualmente ou em lote
+"""
+
+import numpy as np
+import os
+import argparse
+import time
+from multiprocessing import Pool
+
+# ============================================
+
+# Caminhos
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+INDEX_PATH = os.path.join(PROCESSED_DATA_PATH, 'similarity_index')
+
+# Arquivos gerados por 02_Limpeza_e_Transformacao.py
+FEATURE_MATRIX_FILE = 'audio_features_matrix.npy'
+FEATURE_IDS_FILE = 'audio_features_ids.npy'
+FEATURE_SCALE_FILE = 'audio_features_escala.npy'
+
+# Arquivos do índice
+INDEX_VECTORS = 'vectors.npy'
+INDEX_CENTROIDS = 'centroids.npy'
+INDEX_ORDER = 'order.npy'
+INDEX_OFFSETS = 'offsets.npy'
+INDEX_ASSIGNMENTS = 'assignments.npy'
+INDEX_NEIGHBORS = 'neighbors.npy'
+INDEX_DISTANCES = 'distances.npy'
+
+# Parâmetros do índice
+KMEANS_ITERATIONS = 15
+KMEANS_SAMPLE_SIZE = 100_000
+DEFAULT_NPROBE = 16
+DEFAULT_TOP_K = 10
+CHUNK_SIZE = 50_000
+RANDOM_SEED = 42
+
+# ============================================
+
+def load_feature_matrix():
+    """Carrega a matriz de features (desquantizando se necessário) e os track_ids"""
+    matrix = np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_MATRIX_FILE), mmap_mode='r')
+    track_ids = np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_IDS_FILE))
+
+    scale_path = os.path.join(PROCESSED_DATA_PATH, FEATURE_SCALE_FILE)
+    if matrix.dtype != np.float32 and os.path.exists(scale_path):
+        col_min, step = np.load(scale_path)
+        matrix = col_min + matrix.astype(np.float32) * step
+
+    return np.asarray(matrix, dtype=np.float32), track_ids
+
+def squared_distances(queries, candidates):
+    """Distâncias euclidianas ao quadrado entre duas matrizes (||q||² - 2q·c + ||c||²)"""
+    dist = -2.0 * queries @ candidates.T
+    dist += np.einsum('ij,ij->i', queries, queries)[:, None]
+    dist += np.einsum('ij,ij->i', candidates, candidates)[None, :]
+    return np.maximum(dist, 0.0, out=dist)
+
+def assign_to_centroids(vectors, centroids):
+    """Atribui cada vetor ao centróide mais próximo, em blocos"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), CHUNK_SIZE):
+        block = vectors[start:start + CHUNK_SIZE]
+        labels[start:start + CHUNK_SIZE] = squared_distances(block, centroids).argmin(axis=1)
+    return labels
+
+def train_kmeans(vectors, n_lists):
+    """K-means (Lloyd) treinado sobre uma amostra dos vetores"""
+    rng = np.random.default_rng(RANDOM_SEED)
+    sample_size = min(len(vectors), KMEANS_SAMPLE_SIZE)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        labels = assign_to_centroids(sample, centroids)
+        counts = np.bincount(labels, minlength=n_lists).astype(np.float32)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+
+        # Clusters vazios recebem um ponto aleatório da amostra
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = sample[rng.choice(sample_size, empty.sum(), replace=False)]
+
+    return centroids
+
+def build_index(n_lists=None):
+    """Normaliza as features, treina o quantizador e salva o índice em disco"""
+    print("\n🏗️ Construindo índice de similaridade...")
+    start = time.perf_counter()
+
+    matrix, track_ids = load_feature_matrix()
+    print(f"  ✅ Matriz carregada: {matrix.shape[0]:,} músicas x {matrix.shape[1]} features")
+
+    # Padronização (z-score) para que tempo e loudness não dominem a distância
+    mean = matrix.mean(axis=0)
+    std = matrix.std(axis=0)
+    std[std == 0] = 1.0
+    vectors = ((matrix - mean) / std).astype(np.float32)
+
+    if n_lists is None:
+        n_lists = max(1, int(np.sqrt(len(vectors))))
+    n_lists = min(n_lists, len(vectors))
+
+    print(f"  🔧 Treinando k-means com {n_lists:,} listas...")
+    centroids = train_kmeans(vectors, n_lists)
+    assignments = assign_to_centroids(vectors, centroids)
+
+    # Listas invertidas: linhas ordenadas por cluster + offsets de cada lista
+    order = np.argsort(assignments, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=n_lists), out=offsets[1:])
+
+    os.makedirs(INDEX_PATH, exist_ok=True)
+    np.save(os.path.join(INDEX_PATH, INDEX_VECTORS), vectors)
+    np.save(os.path.join(INDEX_PATH, INDEX_CENTROIDS), centroids)
+    np.save(os.path.join(INDEX_PATH, INDEX_ORDER), order)
+    np.save(os.path.join(INDEX_PATH, INDEX_OFFSETS), offsets)
+    np.save(os.path.join(INDEX_PATH, INDEX_ASSIGNMENTS), assignments)
+
+    print(f"  ✅ Índice salvo em {INDEX_PATH} ({time.perf_counter() - start:.2f} s)")
+
+def load_index():
+    """Abre o índice salvo (vetores via memory-map)"""
+    return {
+        'vectors': np.load(os.path.join(INDEX_PATH, INDEX_VECTORS), mmap_mode='r'),
+        'centroids': np.load(os.path.join(INDEX_PATH, INDEX_CENTROIDS)),
+        'order': np.load(os.path.join(INDEX_PATH, INDEX_ORDER), mmap_mode='r'),
+        'offsets': np.load(os.path.join(INDEX_PATH, INDEX_OFFSETS)),
+        'assignments': np.load(os.path.join(INDEX_PATH, INDEX_ASSIGNMENTS), mmap_mode='r'),
+        'track_ids': np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_IDS_FILE)),
+    }
+
+def candidate_rows(index, lists):
+    """Linhas pertencentes às listas invertidas informadas"""
+    order, offsets = index['order'], index['offsets']
+    return np.concatenate([order[offsets[c]:offsets[c + 1]] for c in lists])
+
+def nearest_lists(index, queries, nprobe):
+    """As nprobe listas cujos centróides estão mais próximos das queries"""
+    dist = squared_distances(np.atleast_2d(queries), index['centroids'])
+    nprobe = min(nprobe, dist.shape[1])
+    lists = np.argpartition(dist, nprobe - 1, axis=1)[:, :nprobe]
+    return np.unique(lists)
+
+def top_k(dist, k):
+    """Índices e distâncias dos k menores valores de cada linha, em ordem crescente"""
+    k = min(k, dist.shape[1])
+    part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    part_dist = np.take_along_axis(dist, part, axis=1)
+    ordering = np.argsort(part_dist, axis=1)
+    return np.take_along_axis(part, ordering, axis=1), np.take_along_axis(part_dist, ordering, axis=1)
+
+def find_similar(index, track_id, k=DEFAULT_TOP_K, nprobe=DEFAULT_NPROBE):
+    """Retorna [(track_id, distância)] das k músicas mais parecidas com track_id"""
+    track_ids = index['track_ids']
+    row = np.searchsorted(track_ids, track_id)
+    if row >= len(track_ids) or track_ids[row] != track_id:
+        return None
+
+    query = np.asarray(index['vectors'][row:row + 1])
+    # Listas pequenas (ou só com a própria música): amplia o nprobe até ter k candidatos
+    n_lists = len(index['centroids'])
+    while True:
+        rows = np.sort(candidate_rows(index, nearest_lists(index, query, nprobe)))
+        rows = rows[rows != row]
+        if len(rows) >= k or nprobe >= n_lists:
+            break
+        nprobe = min(nprobe * 2, n_lists)
+    if len(rows) == 0:
+        return []
+
+    best, dist = top_k(squared_distances(query, np.asarray(index['vectors'][rows])), k)
+    rows = rows[best[0]]
+    return list(zip(track_ids[rows].tolist(), np.sqrt(dist[0]).tolist()))
+
+# Índice aberto uma vez por processo do pool
+_worker_index = None
+
+def _init_worker():
+    global _worker_index
+    _worker_index = load_index()
+
+def _batch_lists(args):
+    """Vizinhos de todas as músicas das listas informadas (executado nos workers)"""
+    lists, k, nprobe = args
+    index = _worker_index
+    results = []
+
+    for c in lists:
+        queries_rows = candidate_rows(index, [c])
+        if len(queries_rows) == 0:
+            continue
+
+        # Todas as músicas de uma lista compartilham os mesmos candidatos
+        rows = np.sort(candidate_rows(index, nearest_lists(index, index['centroids'][c], nprobe)))
+        queries = np.asarray(index['vectors'][queries_rows])
+        candidates = np.asarray(index['vectors'][rows])
+
+        dist = squared_distances(queries, candidates)
+        # Excluir a própria música
+        self_pos = np.minimum(np.searchsorted(rows, queries_rows), len(rows) - 1)
+        is_self = rows[self_pos] == queries_rows
+        dist[np.nonzero(is_self)[0], self_pos[is_self]] = np.inf
+
+        best, best_dist = top_k(dist, k)
+        # Com k ou menos candidatos a própria música (distância inf) entra no top-k: vira -1
+        found = np.isfinite(best_dist)
+        results.append((queries_rows, np.where(found, rows[best], -1), np.sqrt(best_dist)))
+
+    return results
+
+def batch_neighbors(k=DEFAULT_TOP_K, nprobe=DEFAULT_NPROBE, workers=None):
+    """Calcula os k vizinhos de todas as músicas em paralelo e salva em disco"""
+    print("\n⚡ Calculando vizinhos de todas as músicas...")
+    start = time.perf_counter()
+
+    index = load_index()
+    n_tracks = len(index['track_ids'])
+    n_lists = len(index['centroids'])
+    k = min(k, n_tracks - 1)
+
+    neighbors = np.full((n_tracks, k), -1, dtype=np.int32)
+    distances = np.full((n_tracks, k), np.inf, dtype=np.float32)
+
+    workers = workers or os.cpu_count()
+    tasks = [(lists, k, nprobe) for lists in np.array_split(np.arange(n_lists), workers * 4) if len(lists)]
+
+    with Pool(workers, initializer=_init_worker) as pool:
+        for results in pool.imap_unordered(_batch_lists, tasks):
+            for queries_rows, rows, dist in results:
+                width = rows.shape[1]
+                neighbors[queries_rows, :width] = rows
+                distances[queries_rows, :width] = dist
+
+    np.save(os.path.join(INDEX_PATH, INDEX_NEIGHBORS), neighbors)
+    np.save(os.path.join(INDEX_PATH, INDEX_DISTANCES), distances)
+
+    print(f"  ✅ {n_tracks:,} músicas x {k} vizinhos ({workers} processos, "
+          f"{time.perf_counter() - start:.2f} s)")
+    print(f"  📂 {INDEX_NEIGHBORS} / {INDEX_DISTANCES} salvos em {INDEX_PATH}")
+
+def positive_int(text):
+    """Tipo do argparse para -k, --nprobe e --lists (0 listas sondadas não tem candidatos)"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"deve ser um inteiro >= 1: {text}")
+    return value
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Índice de similaridade de músicas por audio features')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='constrói o índice a partir da matriz de features')
+    build_parser.add_argument('--lists', type=positive_int, default=None, help='número de listas invertidas (padrão: √n)')
+
+    query_parser = subparsers.add_parser('query', help='músicas parecidas com um track_id')
+    query_parser.add_argument('track_id')
+    query_parser.add_argument('-k', type=positive_int, default=DEFAULT_TOP_K)
+    query_parser.add_argument('--nprobe', type=positive_int, default=DEFAULT_NPROBE)
+
+    batch_parser = subparsers.add_parser('batch', help='vizinhos de todas as músicas')
+    batch_parser.add_argument('-k', type=positive_int, default=DEFAULT_TOP_K)
+    batch_parser.add_argument('--nprobe', type=positive_int, default=DEFAULT_NPROBE)
+    batch_parser.add_argument('--workers', type=int, default=None)
+
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🎵 MUSICMETRICS - ÍNDICE DE SIMILARIDADE")
+    print("=" * 80)
+
+    if args.command == 'build':
+        if not os.path.exists(os.path.join(PROCESSED_DATA_PATH, FEATURE_MATRIX_FILE)):
+            print("\n❌ ERRO: Matriz de features não encontrada!")
+            print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+            return
+        build_index(args.lists)
+
+    elif not os.path.exists(os.path.join(INDEX_PATH, INDEX_CENTROIDS)):
+        print("\n❌ ERRO: Índice não encontrado! Execute primeiro o comando 'build'")
+
+    elif args.command == 'query':
+        index = load_index()
+        start = time.perf_counter()
+        similar = find_similar(index, args.track_id, args.k, args.nprobe)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if similar is None:
+            print(f"\n⚠️ track_id não encontrado: {args.track_id}")
+            return
+
+        print(f"\n🔍 Top {len(similar)} músicas parecidas com {args.track_id} ({elapsed:.1f} ms):")
+        for idx, (track_id, dist) in enumerate(similar, 1):
+            print(f"  {idx}. {track_id} (distância: {dist:.3f})")
+
+    elif args.command == 'batch':
+        batch_neighbors(args.k, args.nprobe, args.workers)
+
+if __name__ == "__main__":
+    main()
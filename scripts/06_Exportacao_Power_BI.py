@@ -0,0 +1,332 @@
+"""
+MusicMetrics - Exportação para o Power BI
+Calcula uma única vez, a cada carga, os agregados de cada página do dashboard
+e grava tabelas-resumo pequenas (Parquet), para o Power BI importar no lugar das views
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+
+# ============================================
+
+# Caminhos dos arquivos processados
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TRACKS_FILE = 'tracks_limpo.csv'
+ARTISTS_FILE = 'artists_limpo.csv'
+AUDIO_FEATURES_FILE = 'audios_limpos.csv'
+
+# Pasta com as tabelas-resumo do dashboard
+EXPORT_PATH = os.path.join(PROCESSED_DATA_PATH, 'powerbi')
+MANIFEST_FILE = 'manifesto.json'
+
+# Features exibidas no radar e nas tendências (escala 0-1, exceto tempo e loudness)
+FEATURES = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+            'liveness', 'speechiness', 'tempo', 'loudness']
+
+TOP_N = 10
+TOP_GENRES = 20
+POPULARITY_BIN_WIDTH = 5
+FIRST_YEAR, LAST_YEAR = 1900, 2025
+
+# Histogramas de faixas fixas: coluna -> (início, fim, nº de faixas); valores fora do
+# intervalo caem na primeira/última faixa
+HISTOGRAM_BINS = {
+    'danceability': (0.0, 1.0, 20), 'energy': (0.0, 1.0, 20), 'valence': (0.0, 1.0, 20),
+    'acousticness': (0.0, 1.0, 20), 'instrumentalness': (0.0, 1.0, 20),
+    'liveness': (0.0, 1.0, 20), 'speechiness': (0.0, 1.0, 20),
+    'tempo': (0.0, 250.0, 25), 'loudness': (-60.0, 5.0, 13),
+    'popularity': (0.0, 100.0, 20),
+}
+
+# Pares para os histogramas conjuntos (x, y) e nº de faixas em cada eixo
+JOINT_HISTOGRAMS = [('energy', 'valence'), ('danceability', 'valence'),
+                    ('danceability', 'energy'), ('acousticness', 'energy')]
+JOINT_BINS = 10
+
+# ============================================
+
+def load_data():
+    """Lê só as colunas usadas, aplicando as mesmas regras de descarte do loader"""
+    print("📂 Carregando dados processados...")
+
+    df_artists = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, ARTISTS_FILE),
+        usecols=['artist_sk', 'artist_name', 'artist_popularity', 'artist_followers', 'artist_genres'],
+        dtype={'artist_name': str, 'artist_genres': str}
+    ).rename(columns={
+        'artist_popularity': 'popularity',
+        'artist_followers': 'followers',
+        'artist_genres': 'genres'
+    })
+    df_artists['popularity'] = df_artists['popularity'].fillna(0).astype(np.int64)
+    df_artists['followers'] = df_artists['followers'].fillna(0).astype(np.int64)
+
+    df_tracks = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE),
+        usecols=['track_sk', 'track_name', 'track_popularity', 'duration_ms', 'explicit',
+                 'primary_artist_id', 'artist_sk', 'release_year'],
+        dtype={'track_name': str, 'primary_artist_id': str}
+    ).rename(columns={'track_popularity': 'popularity'})
+
+    # Músicas com artista inexistente (sem artist_sk) são puladas pelo loader
+    has_artist = df_tracks['primary_artist_id'].notna()
+    valid_artist = df_tracks['artist_sk'].isin(df_artists['artist_sk'])
+    df_tracks = df_tracks[~has_artist | valid_artist].drop(columns='primary_artist_id').reset_index(drop=True)
+    df_tracks['popularity'] = df_tracks['popularity'].fillna(0).astype(np.int64)
+    df_tracks['explicit'] = df_tracks['explicit'].astype(bool)
+
+    features_path = os.path.join(PROCESSED_DATA_PATH, AUDIO_FEATURES_FILE)
+    if os.path.exists(features_path):
+        header = pd.read_csv(features_path, nrows=0).columns
+        feature_cols = [col for col in FEATURES if col in header]
+        df_features = pd.read_csv(features_path, usecols=['track_sk'] + feature_cols)
+        df_tracks = df_tracks.merge(df_features, on='track_sk', how='left')
+
+    print(f"✅ {len(df_artists):,} artistas | {len(df_tracks):,} músicas")
+
+    return df_tracks, df_artists
+
+def feature_columns(df):
+    return [col for col in FEATURES if col in df.columns]
+
+def explode_genres(df_artists):
+    """Uma linha por (artist_sk, gênero), a partir da lista separada por vírgula"""
+    genres = df_artists[['artist_sk', 'genres']].dropna()
+    genres = genres.assign(genre=genres['genres'].str.split(',')).explode('genre')
+    genres['genre'] = genres['genre'].str.strip()
+    return genres.loc[genres['genre'] != '', ['artist_sk', 'genre']].drop_duplicates()
+
+# -------- Página 1: Visão Geral --------
+
+def build_kpis(df_tracks, df_artists, df_genres):
+    """KPIs principais em uma única linha"""
+    return pd.DataFrame([{
+        'total_artistas': len(df_artists),
+        'total_musicas': len(df_tracks),
+        'total_generos': df_genres['genre'].nunique(),
+        'popularidade_media': round(df_tracks['popularity'].mean(), 1),
+        'duracao_media_min': round(df_tracks['duration_ms'].mean() / 60000, 2),
+        'percentual_explicitas': round(df_tracks['explicit'].mean() * 100, 2),
+        'seguidores_total': int(df_artists['followers'].sum()),
+    }])
+
+def build_top_artists(df_tracks, df_artists, df_genres):
+    """Top N artistas por popularidade, com as estatísticas das músicas"""
+    stats = df_tracks.groupby('artist_sk')['popularity'].agg(
+        total_musicas='count', popularidade_media_musicas='mean'
+    )
+    df = df_artists.join(stats, on='artist_sk', how='inner')
+    df = df.nlargest(TOP_N, ['popularity', 'followers'])
+    df['popularidade_media_musicas'] = df['popularidade_media_musicas'].round(1)
+    return df[['artist_sk', 'artist_name', 'popularity', 'followers', 'total_musicas',
+               'popularidade_media_musicas']].reset_index(drop=True)
+
+def build_top_tracks(df_tracks, df_artists, df_genres):
+    """Top N músicas por popularidade"""
+    df = df_tracks.nlargest(TOP_N, 'popularity')
+    df = df.merge(df_artists[['artist_sk', 'artist_name']], on='artist_sk', how='left')
+    return df[['track_sk', 'track_name', 'artist_name', 'popularity', 'release_year']].reset_index(drop=True)
+
+# -------- Página 2: Audio Features --------
+
+def build_sound_profile(df_tracks, df_artists, df_genres):
+    """Perfil sonoro médio (radar), em formato longo: feature, média, desvio"""
+    cols = feature_columns(df_tracks)
+    return pd.DataFrame({
+        'feature': cols,
+        'media': df_tracks[cols].mean().round(4).to_numpy(),
+        'desvio': df_tracks[cols].std().round(4).to_numpy(),
+    })
+
+def build_features_by_genre(df_tracks, df_artists, df_genres):
+    """Médias das features para os gêneros com mais músicas"""
+    cols = feature_columns(df_tracks)
+    df = df_tracks[['artist_sk', 'popularity'] + cols].merge(df_genres, on='artist_sk')
+    result = df.groupby('genre').agg(total_musicas=('popularity', 'size'),
+                                     popularidade_media=('popularity', 'mean'),
+                                     **{col: (col, 'mean') for col in cols})
+    result = result.nlargest(TOP_GENRES, 'total_musicas').round(4)
+    return result.reset_index()
+
+# -------- Página 3: Tendências Temporais --------
+
+def build_features_by_decade(df_tracks, df_artists, df_genres):
+    """Décadas x médias das features"""
+    df = df_tracks[df_tracks['release_year'].between(FIRST_YEAR, LAST_YEAR)]
+    decade = (df['release_year'] // 10 * 10).astype(np.int64).rename('decada')
+    cols = feature_columns(df)
+    result = df.groupby(decade).agg(total_musicas=('popularity', 'size'),
+                                    popularidade_media=('popularity', 'mean'),
+                                    duracao_media_min=('duration_ms', 'mean'),
+                                    **{col: (col, 'mean') for col in cols})
+    result['duracao_media_min'] = result['duracao_media_min'] / 60000
+    return result.round(4).reset_index()
+
+# -------- Página 4: Descoberta e Diversidade --------
+
+def build_genre_matrix(df_tracks, df_artists, df_genres):
+    """Matriz gênero x década (formato longo), restrita aos gêneros com mais músicas"""
+    df = df_tracks.loc[df_tracks['release_year'].between(FIRST_YEAR, LAST_YEAR),
+                       ['artist_sk', 'release_year', 'popularity']].merge(df_genres, on='artist_sk')
+    top = df['genre'].value_counts().head(TOP_GENRES).index
+    df = df[df['genre'].isin(top)]
+    decade = (df['release_year'] // 10 * 10).astype(np.int64).rename('decada')
+    result = df.groupby(['genre', decade])['popularity'].agg(total_musicas='size', popularidade_media='mean')
+    return result.round(1).reset_index()
+
+def build_popularity_histogram(df_tracks, df_artists, df_genres):
+    """Histograma de popularidade (faixas fixas) de músicas e artistas"""
+    edges = np.arange(0, 100 + POPULARITY_BIN_WIDTH, POPULARITY_BIN_WIDTH)
+    edges[-1] = 101  # inclui a popularidade 100 na última faixa
+    tracks, _ = np.histogram(df_tracks['popularity'], bins=edges)
+    artists, _ = np.histogram(df_artists['popularity'], bins=edges)
+    return pd.DataFrame({
+        'faixa_inicio': edges[:-1],
+        'faixa_fim': np.minimum(edges[1:] - 1, 100),
+        'musicas': tracks,
+        'artistas': artists,
+    })
+
+# -------- Distribuições (histogramas) --------
+
+def bin_index(values, low, high, bins):
+    """Índice da faixa de cada valor (NaN continua NaN)"""
+    idx = np.floor((values - low) / (high - low) * bins)
+    return np.clip(idx, 0, bins - 1)
+
+def bin_edges(low, high, bins):
+    edges = np.linspace(low, high, bins + 1)
+    return edges[:-1], edges[1:]
+
+def build_histograms(df_tracks, df_artists, df_genres):
+    """Histogramas de cada feature e da popularidade, geral e por década (decada vazia = todas)"""
+    year = df_tracks['release_year'].to_numpy(dtype=float)
+    in_range = (year >= FIRST_YEAR) & (year <= LAST_YEAR)
+    decade = np.where(in_range, year // 10 * 10, np.nan)
+    decades = np.unique(decade[in_range]).astype(np.int64)
+    decade_code = np.searchsorted(decades, np.nan_to_num(decade)).clip(0, max(len(decades) - 1, 0))
+
+    frames = []
+    for col, (low, high, bins) in HISTOGRAM_BINS.items():
+        if col not in df_tracks.columns:
+            continue
+        idx = bin_index(df_tracks[col].to_numpy(dtype=float), low, high, bins)
+        valid = ~np.isnan(idx)
+        starts, ends = bin_edges(low, high, bins)
+
+        # Geral + todas as décadas com um bincount cada (custo O(linhas), saída O(faixas))
+        overall = np.bincount(idx[valid].astype(np.int64), minlength=bins)
+        by_decade = valid & in_range
+        combined = decade_code[by_decade] * bins + idx[by_decade].astype(np.int64)
+        per_decade = np.bincount(combined, minlength=len(decades) * bins).reshape(len(decades), bins)
+
+        frames.append(pd.DataFrame({
+            'variavel': col, 'decada': pd.NA,
+            'faixa_inicio': starts, 'faixa_fim': ends, 'contagem': overall,
+        }))
+        frames.append(pd.DataFrame({
+            'variavel': col, 'decada': np.repeat(decades, bins),
+            'faixa_inicio': np.tile(starts, len(decades)), 'faixa_fim': np.tile(ends, len(decades)),
+            'contagem': per_decade.ravel(),
+        }))
+
+    result = pd.concat(frames, ignore_index=True)
+    result['decada'] = result['decada'].astype('Int64')
+    return result
+
+def build_joint_histograms(df_tracks, df_artists, df_genres):
+    """Histogramas 2-D (x, y) dos pares de JOINT_HISTOGRAMS, em formato longo"""
+    frames = []
+    for x_col, y_col in JOINT_HISTOGRAMS:
+        if x_col not in df_tracks.columns or y_col not in df_tracks.columns:
+            continue
+        x_low, x_high, _ = HISTOGRAM_BINS[x_col]
+        y_low, y_high, _ = HISTOGRAM_BINS[y_col]
+        ix = bin_index(df_tracks[x_col].to_numpy(dtype=float), x_low, x_high, JOINT_BINS)
+        iy = bin_index(df_tracks[y_col].to_numpy(dtype=float), y_low, y_high, JOINT_BINS)
+        valid = ~np.isnan(ix) & ~np.isnan(iy)
+
+        combined = ix[valid].astype(np.int64) * JOINT_BINS + iy[valid].astype(np.int64)
+        counts = np.bincount(combined, minlength=JOINT_BINS * JOINT_BINS)
+        x_starts, x_ends = bin_edges(x_low, x_high, JOINT_BINS)
+        y_starts, y_ends = bin_edges(y_low, y_high, JOINT_BINS)
+
+        frames.append(pd.DataFrame({
+            'par': f'{x_col} x {y_col}',
+            'x_inicio': np.repeat(x_starts, JOINT_BINS), 'x_fim': np.repeat(x_ends, JOINT_BINS),
+            'y_inicio': np.tile(y_starts, JOINT_BINS), 'y_fim': np.tile(y_ends, JOINT_BINS),
+            'contagem': counts,
+        }))
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+# Tabela -> (página do dashboard, função); todas recebem (df_tracks, df_artists, df_genres)
+EXPORTS = {
+    'kpis': ('Visão Geral', build_kpis),
+    'top_artistas': ('Visão Geral', build_top_artists),
+    'top_musicas': ('Visão Geral', build_top_tracks),
+    'perfil_sonoro': ('Audio Features', build_sound_profile),
+    'features_por_genero': ('Audio Features', build_features_by_genre),
+    'histogramas': ('Audio Features', build_histograms),
+    'histogramas_2d': ('Audio Features', build_joint_histograms),
+    'features_por_decada': ('Tendências Temporais', build_features_by_decade),
+    'matriz_generos': ('Descoberta e Diversidade', build_genre_matrix),
+    'histograma_popularidade': ('Descoberta e Diversidade', build_popularity_histogram),
+}
+
+def save_table(df, name):
+    """Grava em Parquet (CSV se o pyarrow não estiver instalado)"""
+    output = os.path.join(EXPORT_PATH, f'{name}.parquet')
+    try:
+        df.to_parquet(output, index=False)
+    except ImportError:
+        output = output.replace('.parquet', '.csv')
+        df.to_csv(output, index=False, encoding='utf-8-sig')
+    return os.path.basename(output)
+
+def main():
+    """Função principal"""
+    print("\n" + "=" * 80)
+    print("📊 MUSICMETRICS - EXPORTAÇÃO PARA O POWER BI")
+    print("=" * 80)
+
+    tracks_path = os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE)
+    artists_path = os.path.join(PROCESSED_DATA_PATH, ARTISTS_FILE)
+
+    if not os.path.exists(tracks_path) or not os.path.exists(artists_path):
+        print("\n❌ ERRO: Arquivos processados não encontrados!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    start = time.perf_counter()
+    df_tracks, df_artists = load_data()
+    df_genres = explode_genres(df_artists)
+
+    os.makedirs(EXPORT_PATH, exist_ok=True)
+    manifest = {
+        'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'source_rows': {'tracks': len(df_tracks), 'artists': len(df_artists)},
+        'tables': {}
+    }
+
+    print("\n💾 Gerando tabelas-resumo...")
+    for name, (page, build) in EXPORTS.items():
+        df = build(df_tracks, df_artists, df_genres)
+        filename = save_table(df, name)
+        manifest['tables'][name] = {'page': page, 'file': filename, 'rows': len(df)}
+        print(f"  ✅ [{page}] {filename} ({len(df):,} linhas)")
+
+    manifest['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(EXPORT_PATH, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"✅ Exportação concluída em {manifest['elapsed_seconds']:.2f} s: {EXPORT_PATH}")
+    print("   No Power BI, use 'Obter dados > Parquet' nesta pasta (modo Importação)")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+MusicMetrics - Correlações entre Audio Features e Popularidade
+Calcula as matrizes de correlação de Pearson e Spearman sobre a matriz binária de features,
+no geral e por década ou gênero ("músicas felizes são mais dançantes?")
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import argparse
+import time
+from multiprocessing import Pool
+
+# ============================================
+
+# Caminhos
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TRACKS_FILE = 'tracks_limpo.csv'
+ARTISTS_FILE = 'artists_limpo.csv'
+
+# Arquivos gerados por 02_Limpeza_e_Transformacao.py
+FEATURE_MATRIX_FILE = 'audio_features_matrix.npy'
+FEATURE_IDS_FILE = 'audio_features_ids.npy'
+FEATURE_SCALE_FILE = 'audio_features_escala.npy'
+# Nomes das colunas da matriz, na ordem (as variáveis são essas colunas + popularidade)
+FEATURE_COLUMNS_FILE = 'audio_features_colunas.npy'
+
+OUTPUT_FILE = 'correlacoes.parquet'
+
+CHUNK_SIZE = 200_000
+MIN_GROUP_SIZE = 30
+TOP_GENRES = 15
+FIRST_YEAR, LAST_YEAR = 1900, 2025
+
+# ============================================
+
+# Dados compartilhados com os processos (carregados uma vez por processo)
+_data = {}
+
+def load_data():
+    """Matriz de features (memory-mapped), popularidade, ano e artista alinhados às linhas da matriz"""
+    matrix = np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_MATRIX_FILE), mmap_mode='r')
+    track_ids = np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_IDS_FILE))
+
+    scale = None
+    scale_path = os.path.join(PROCESSED_DATA_PATH, FEATURE_SCALE_FILE)
+    if matrix.dtype != np.float32 and os.path.exists(scale_path):
+        scale = np.load(scale_path)
+
+    df_tracks = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE),
+        usecols=['track_id', 'track_popularity', 'release_year', 'primary_artist_id'],
+        dtype={'track_id': str, 'primary_artist_id': str}
+    ).drop_duplicates(subset=['track_id'], keep='last').sort_values('track_id')
+
+    # track_ids da matriz estão ordenados: busca binária das músicas nas linhas da matriz
+    sorted_ids = df_tracks['track_id'].to_numpy(dtype=str)
+    pos = np.searchsorted(sorted_ids, track_ids).clip(0, max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[pos] == track_ids if len(sorted_ids) else np.zeros(len(track_ids), dtype=bool)
+
+    popularity = np.where(found, df_tracks['track_popularity'].to_numpy(dtype=float)[pos], np.nan)
+    year = np.where(found, df_tracks['release_year'].to_numpy(dtype=float)[pos], np.nan)
+    artist_ids = np.where(found, df_tracks['primary_artist_id'].to_numpy(dtype=object)[pos], None)
+
+    columns = [str(col) for col in np.load(os.path.join(PROCESSED_DATA_PATH, FEATURE_COLUMNS_FILE))]
+
+    return {
+        'matrix': matrix,
+        'scale': scale,
+        'variables': columns + ['popularity'],
+        'popularity': popularity.astype(np.float32),
+        'year': year,
+        'artist_ids': artist_ids,
+    }
+
+def _init_worker():
+    _data.update(load_data())
+
+def load_block(rows):
+    """Linhas da matriz (desquantizadas) + popularidade, em float64"""
+    block = np.asarray(_data['matrix'][rows], dtype=np.float64)
+    if _data['scale'] is not None:
+        col_min, step = _data['scale']
+        block = col_min + block * step
+    return np.column_stack([block, _data['popularity'][rows]])
+
+def load_column(rows, j):
+    """Uma única coluna (variável j) para as linhas informadas"""
+    if j == len(_data['variables']) - 1:
+        return _data['popularity'][rows].astype(np.float64)
+    column = np.asarray(_data['matrix'][rows, j], dtype=np.float64)
+    if _data['scale'] is not None:
+        col_min, step = _data['scale']
+        column = col_min[j] + column * step[j]
+    return column
+
+def average_ranks(values):
+    """Postos (1..n) com média nos empates, como o Spearman exige"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return ((ends - counts + 1 + ends) / 2.0)[inverse]
+
+def accumulate_correlation(blocks):
+    """Correlação de Pearson acumulando somas e produtos cruzados bloco a bloco"""
+    n, shift, sums, cross = 0, None, None, None
+    for block in blocks:
+        if shift is None:
+            # Deslocamento pela média do primeiro bloco, para estabilidade numérica
+            shift = block.mean(axis=0)
+            sums = np.zeros(block.shape[1])
+            cross = np.zeros((block.shape[1], block.shape[1]))
+        centered = block - shift
+        n += len(block)
+        sums += centered.sum(axis=0)
+        cross += centered.T @ centered
+
+    if n < 2:
+        return None, n
+
+    cov = (cross - np.outer(sums, sums) / n) / (n - 1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(std, std)
+    return np.clip(corr, -1.0, 1.0), n
+
+def complete_rows(rows):
+    """Remove linhas com algum valor ausente (análise de casos completos)"""
+    keep = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        keep.append(chunk[~np.isnan(load_block(chunk)).any(axis=1)])
+    return np.concatenate(keep) if keep else rows[:0]
+
+def correlate(rows):
+    """Pearson (em blocos, out-of-core) e Spearman (postos por coluna) para um conjunto de linhas"""
+    rows = complete_rows(np.sort(rows))
+
+    pearson, n = accumulate_correlation(
+        load_block(rows[start:start + CHUNK_SIZE]) for start in range(0, len(rows), CHUNK_SIZE)
+    )
+    if pearson is None:
+        return None, None, n
+
+    # Spearman = Pearson sobre os postos; os postos são calculados uma coluna por vez
+    ranks = np.empty((len(rows), len(_data['variables'])), dtype=np.float64)
+    for j in range(len(_data['variables'])):
+        ranks[:, j] = average_ranks(load_column(rows, j))
+
+    spearman, _ = accumulate_correlation(
+        ranks[start:start + CHUNK_SIZE] for start in range(0, len(rows), CHUNK_SIZE)
+    )
+    return pearson, spearman, n
+
+def _correlate_group(task):
+    scope, group, rows = task
+    return scope, group, *correlate(rows)
+
+def build_groups(by):
+    """(recorte, grupo, linhas da matriz) para cada década e/ou gênero"""
+    groups = []
+
+    if by in ('decada', 'ambos'):
+        year = _data['year']
+        in_range = (year >= FIRST_YEAR) & (year <= LAST_YEAR)
+        decade = np.where(in_range, year // 10 * 10, -1).astype(np.int64)
+        for value in np.unique(decade[in_range]):
+            groups.append(('decada', str(value), np.flatnonzero(decade == value)))
+
+    if by in ('genero', 'ambos'):
+        df_artists = pd.read_csv(os.path.join(PROCESSED_DATA_PATH, ARTISTS_FILE),
+                                 usecols=['artist_id', 'artist_genres'], dtype=str).dropna()
+        df_genres = df_artists.assign(genre=df_artists['artist_genres'].str.split(',')).explode('genre')
+        df_genres['genre'] = df_genres['genre'].str.strip()
+        df_genres = df_genres[df_genres['genre'] != ''].drop_duplicates(['artist_id', 'genre'])
+
+        # Uma música entra em todos os gêneros do seu artista principal
+        rows = pd.DataFrame({'row': np.arange(len(_data['artist_ids'])), 'artist_id': _data['artist_ids']})
+        rows = rows.dropna().merge(df_genres[['artist_id', 'genre']], on='artist_id')
+        for genre in rows['genre'].value_counts().head(TOP_GENRES).index:
+            groups.append(('genero', genre, rows.loc[rows['genre'] == genre, 'row'].to_numpy()))
+
+    return [g for g in groups if len(g[2]) >= MIN_GROUP_SIZE]
+
+def to_long(scope, group, method, corr, n):
+    """Matriz p x p -> linhas (variavel_x, variavel_y, correlacao)"""
+    return pd.DataFrame({
+        'recorte': scope,
+        'grupo': group,
+        'metodo': method,
+        'variavel_x': np.repeat(_data['variables'], len(_data['variables'])),
+        'variavel_y': np.tile(_data['variables'], len(_data['variables'])),
+        'correlacao': corr.ravel().round(4),
+        'n': n,
+    })
+
+def print_matrix(title, corr):
+    print(f"\n📊 {title}")
+    print("-" * 80)
+    df = pd.DataFrame(corr, index=_data['variables'], columns=[v[:6] for v in _data['variables']])
+    print(df.round(2).to_string())
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Correlações entre audio features e popularidade')
+    parser.add_argument('--por', choices=['nenhum', 'decada', 'genero', 'ambos'], default='ambos',
+                        help='recortes calculados além da matriz geral')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processos para os recortes (padrão: nº de CPUs; 1 = sem paralelismo)')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🎵 MUSICMETRICS - CORRELAÇÕES")
+    print("=" * 80)
+
+    if not all(os.path.exists(os.path.join(PROCESSED_DATA_PATH, name))
+               for name in (FEATURE_MATRIX_FILE, FEATURE_COLUMNS_FILE)):
+        print("\n❌ ERRO: Matriz de features não encontrada!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    start = time.perf_counter()
+    _data.update(load_data())
+    n_rows = len(_data['popularity'])
+    print(f"✅ {n_rows:,} músicas x {len(_data['variables'])} variáveis")
+
+    pearson, spearman, n = correlate(np.arange(n_rows))
+    if pearson is None:
+        print("\n⚠️ Linhas completas insuficientes para calcular correlações")
+        return
+
+    print_matrix(f"Pearson - geral ({n:,} músicas)", pearson)
+    print_matrix(f"Spearman - geral ({n:,} músicas)", spearman)
+
+    i, j = _data['variables'].index('valence'), _data['variables'].index('danceability')
+    print(f"\n😊 Músicas felizes são mais dançantes? valence x danceability: "
+          f"Pearson {pearson[i, j]:.3f} | Spearman {spearman[i, j]:.3f}")
+
+    frames = [to_long('geral', 'todas', 'pearson', pearson, n),
+              to_long('geral', 'todas', 'spearman', spearman, n)]
+
+    if args.por != 'nenhum':
+        groups = build_groups(args.por)
+        workers = min(args.workers or os.cpu_count(), len(groups)) or 1
+        print(f"\n⚡ Calculando {len(groups)} recortes ({workers} processos)...")
+
+        if workers > 1:
+            with Pool(workers, initializer=_init_worker) as pool:
+                results = pool.map(_correlate_group, groups)
+        else:
+            results = [_correlate_group(task) for task in groups]
+
+        for scope, group, group_pearson, group_spearman, group_n in results:
+            if group_pearson is None:
+                continue
+            frames.append(to_long(scope, group, 'pearson', group_pearson, group_n))
+            frames.append(to_long(scope, group, 'spearman', group_spearman, group_n))
+            print(f"  {scope} {group}: valence x danceability = {group_pearson[i, j]:.3f} "
+                  f"({group_n:,} músicas)")
+
+    result = pd.concat(frames, ignore_index=True)
+    output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FILE)
+    try:
+        result.to_parquet(output, index=False)
+    except ImportError:
+        output = output.replace('.parquet', '.csv')
+        result.to_csv(output, index=False, encoding='utf-8-sig')
+
+    print("\n" + "=" * 80)
+    print(f"✅ {len(result):,} correlações salvas em {output} ({time.perf_counter() - start:.2f} s)")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
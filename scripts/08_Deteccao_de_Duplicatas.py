@@ -0,0 +1,260 @@
+"""
+MusicMetrics - Detecção de Músicas Duplicadas
+Agrupa relançamentos da mesma música com IDs diferentes ("Remastered", "Live",
+"- 2011 Remaster"...) por nome normalizado + artista principal + duração, usando
+MinHash-LSH em vez de comparar todos os pares
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import zlib
+import argparse
+import time
+from multiprocessing import Pool
+
+# ============================================
+
+# Caminhos
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TRACKS_FILE = 'tracks_limpo.csv'
+OUTPUT_FILE = 'musicas_canonicas.parquet'
+
+# Sufixos de versão removidos antes da comparação (e guardados na coluna 'versao').
+# Remixes, instrumentais e covers ficam de fora: são outras obras, não relançamentos.
+# Os termos casam com o nome já sem acentos e em minúsculas: 'versao', nunca 'versão'
+VERSION_TERMS = [
+    r'remaster(?:ed)?', r'remasterizad[ao]', r'live', r'ao vivo', r'en vivo', r'en directo',
+    r'mono', r'stereo', r'single version', r'album version', r'radio edit', r'versao',
+    r'version', r'acustic[ao]', r'deluxe', r'bonus track', r'original mix', r're-?recorded', r'\d{4} mix',
+]
+VERSION_PATTERN = (r'\s*(?:\s-\s|\(|\[)[^()\[\]]*?\b(?P<versao>' + '|'.join(VERSION_TERMS)
+                   + r')\b[^()\[\]]*[)\]]?\s*$')
+FEATURING_PATTERN = r'\s*[(\[]?\b(?:feat|ft|featuring)\.?\s[^)\]]*[)\]]?'
+
+# MinHash: 32 permutações em 8 bandas de 4 linhas -> pares com Jaccard ~0.6 já colidem
+NUM_PERM = 32
+BANDS = 8
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 31) - 1
+SEED = 42
+
+# Confirmação de cada par candidato
+SIMILARITY_THRESHOLD = 0.8        # Jaccard estimado dos trigramas do nome normalizado
+DURATION_TOLERANCE_S = 15         # diferença de duração aceita: o maior entre 15 s e 10%
+DURATION_TOLERANCE_PCT = 0.10
+
+CHUNK_SIZE = 50_000
+
+# ============================================
+
+def load_tracks():
+    df = pd.read_csv(
+        os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE),
+        usecols=['track_sk', 'track_id', 'track_name', 'track_popularity', 'duration_ms',
+                 'primary_artist_id', 'release_year'],
+        dtype={'track_id': str, 'track_name': str, 'primary_artist_id': str}
+    )
+    return df.drop_duplicates(subset=['track_id'], keep='last').reset_index(drop=True)
+
+def normalize_names(names):
+    """Nome base (sem acentos, sufixo de versão e participações) e a versão encontrada"""
+    names = names.fillna('').astype(str)
+    # NFKD + remoção das marcas combinantes: 'Canção' -> 'cancao', sem apagar letras não latinas
+    base = names.str.normalize('NFKD').str.replace('[\u0300-\u036f]', '', regex=True).str.casefold()
+
+    version = base.str.extract(VERSION_PATTERN, expand=True)['versao']
+    base = base.str.replace(VERSION_PATTERN, '', regex=True)
+    base = base.str.replace(FEATURING_PATTERN, '', regex=True)
+    base = base.str.replace(r'[^\w\s]', ' ', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+    # Nome só com a versão (ex.: "(Live)"): compara pelo nome inteiro
+    empty = base == ''
+    base[empty] = names[empty].str.casefold()
+    return base, version
+
+def hash_functions():
+    rng = np.random.RandomState(SEED)
+    a = rng.randint(1, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+    b = rng.randint(0, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+    return a, b
+
+def minhash_signatures(names):
+    """Assinaturas MinHash (n x NUM_PERM) dos trigramas de caracteres de cada nome"""
+    shingles, lengths = [], []
+    for name in names:
+        padded = f' {name} '
+        grams = {padded[i:i + SHINGLE_SIZE] for i in range(max(len(padded) - SHINGLE_SIZE + 1, 1))}
+        shingles.extend(zlib.crc32(gram.encode('utf-8')) for gram in grams)
+        lengths.append(len(grams))
+
+    values = np.asarray(shingles, dtype=np.uint64) % MERSENNE_PRIME
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    a, b = hash_functions()
+
+    signatures = np.empty((len(lengths), NUM_PERM), dtype=np.uint32)
+    for k in range(NUM_PERM):
+        hashed = (a[k] * values + b[k]) % MERSENNE_PRIME
+        signatures[:, k] = np.minimum.reduceat(hashed, offsets)
+    return signatures
+
+def candidate_pairs(signatures, artist_codes, durations):
+    """Pares que colidem em alguma banda do LSH, do mesmo artista
+
+    Em cada balde, as músicas são ordenadas pela duração e só vizinhas viram pares
+    (vizinhança ordenada): o custo fica linear mesmo em baldes grandes
+    """
+    rows_per_band = NUM_PERM // BANDS
+    pairs = []
+    for band in range(BANDS):
+        keys = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        order = np.lexsort((durations, *keys.T[::-1], artist_codes))
+        sorted_keys = np.column_stack([artist_codes[order], keys[order]])
+        same = (sorted_keys[1:] == sorted_keys[:-1]).all(axis=1)
+        pairs.append(np.column_stack([order[:-1][same], order[1:][same]]))
+
+    # Mesmo par vindo de várias bandas: deduplica pela chave i * n + j (i < j)
+    pairs = np.concatenate(pairs)
+    pairs.sort(axis=1)
+    keys = np.unique(pairs[:, 0] * len(signatures) + pairs[:, 1])
+    return np.column_stack(np.divmod(keys, len(signatures)))
+
+def confirm_pairs(pairs, signatures, durations, number_codes):
+    """Mantém os pares com nome parecido, mesmos números no nome e duração compatível"""
+    i, j = pairs[:, 0], pairs[:, 1]
+    similarity = (signatures[i] == signatures[j]).mean(axis=1)
+    # 'Symphony No. 5' x 'Symphony No. 6' diferem em poucos trigramas, mas são outras músicas
+    same_numbers = number_codes[i] == number_codes[j]
+
+    diff_s = np.abs(durations[i] - durations[j]) / 1000
+    longest_s = np.maximum(durations[i], durations[j]) / 1000
+    tolerance = np.maximum(DURATION_TOLERANCE_S, longest_s * DURATION_TOLERANCE_PCT)
+
+    keep = (similarity >= SIMILARITY_THRESHOLD) & same_numbers & (diff_s <= tolerance)
+    return pairs[keep]
+
+def cluster_tracks(n, pairs):
+    """Componentes conexos do grafo de pares confirmados"""
+    import scipy.sparse as sp
+    from scipy.sparse.csgraph import connected_components
+
+    graph = sp.csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+def choose_canonical(df):
+    """Versão canônica do grupo: sem sufixo de versão, mais popular, mais antiga"""
+    ranked = df.assign(
+        _tagged=df['versao'].notna(),
+        _popularity=-df['track_popularity'].fillna(0),
+        _year=df['release_year'].fillna(9999),
+    ).sort_values(['grupo', '_tagged', '_popularity', '_year', 'track_id'])
+    canonical = ranked.drop_duplicates('grupo').set_index('grupo')['track_sk']
+    return df['grupo'].map(canonical)
+
+def detect_duplicates(df, workers=None):
+    start = time.perf_counter()
+    base, version = normalize_names(df['track_name'])
+    print(f"  ✨ Nomes normalizados ({version.notna().sum():,} com sufixo de versão) "
+          f"em {time.perf_counter() - start:.1f} s")
+
+    # Músicas sem artista principal não entram: o artista é parte da chave
+    eligible = np.flatnonzero(df['primary_artist_id'].notna().to_numpy())
+    names = base.to_numpy()[eligible].tolist()
+
+    start = time.perf_counter()
+    chunks = [names[i:i + CHUNK_SIZE] for i in range(0, len(names), CHUNK_SIZE)]
+    workers = min(workers or os.cpu_count(), len(chunks)) or 1
+    if workers > 1:
+        with Pool(workers) as pool:
+            parts = pool.map(minhash_signatures, chunks)
+    else:
+        parts = [minhash_signatures(chunk) for chunk in chunks]
+    signatures = np.concatenate(parts) if parts else np.empty((0, NUM_PERM), dtype=np.uint32)
+    print(f"  #️⃣ Assinaturas MinHash de {len(names):,} músicas ({workers} processos) "
+          f"em {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    artist_codes, _ = pd.factorize(df['primary_artist_id'].to_numpy()[eligible])
+    durations = df['duration_ms'].fillna(0).to_numpy(dtype=np.float64)[eligible]
+    number_codes, _ = pd.factorize(base.str.findall(r'\d+').str.join(' ').to_numpy()[eligible])
+    pairs = candidate_pairs(signatures, artist_codes.astype(np.int64), durations)
+    confirmed = confirm_pairs(pairs, signatures, durations, number_codes)
+    print(f"  🔗 {len(pairs):,} pares candidatos -> {len(confirmed):,} confirmados "
+          f"em {time.perf_counter() - start:.1f} s")
+
+    labels = np.full(len(df), -1, dtype=np.int64)
+    labels[eligible] = cluster_tracks(len(eligible), confirmed)
+
+    result = df[['track_sk', 'track_id', 'track_name', 'track_popularity', 'release_year']].copy()
+    result['nome_normalizado'] = base
+    result['versao'] = version
+    result['grupo'] = pd.Series(labels).where(labels >= 0).astype('Int64')
+
+    sizes = result.groupby('grupo')['track_sk'].transform('size')
+    result['tamanho_grupo'] = sizes.fillna(1).astype(np.int64)
+    # Grupos de uma música só não são duplicatas
+    result.loc[result['tamanho_grupo'] == 1, 'grupo'] = pd.NA
+    result['grupo'] = (result['grupo'].rank(method='dense') - 1).astype('Int64')
+
+    grouped = result['grupo'].notna()
+    result['canonical_track_sk'] = result['track_sk']
+    result.loc[grouped, 'canonical_track_sk'] = choose_canonical(result[grouped])
+    result['is_canonical'] = result['canonical_track_sk'] == result['track_sk']
+    return result
+
+def print_report(result):
+    grouped = result[result['grupo'].notna()]
+    duplicates = (~grouped['is_canonical']).sum()
+    print(f"\n📊 {grouped['grupo'].nunique():,} grupos com {len(grouped):,} músicas "
+          f"({duplicates:,} duplicatas = {duplicates / max(len(result), 1) * 100:.2f}% do catálogo)")
+
+    top_versions = grouped['versao'].value_counts().head(5)
+    if len(top_versions):
+        print("   Sufixos mais comuns: " + ', '.join(f"{v} ({c:,})" for v, c in top_versions.items()))
+
+    print("\n📋 Exemplos:")
+    largest = grouped.sort_values(['tamanho_grupo', 'grupo'], ascending=[False, True])
+    for group in largest['grupo'].drop_duplicates().head(3):
+        members = largest[largest['grupo'] == group]
+        for _, row in members.head(5).iterrows():
+            marker = '⭐' if row['is_canonical'] else '  '
+            print(f"   {marker} {row['track_name']} ({row['track_popularity']:.0f})")
+        print()
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Agrupa versões e remasters da mesma música')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processos para as assinaturas MinHash (padrão: nº de CPUs)')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🎵 MUSICMETRICS - DETECÇÃO DE DUPLICATAS")
+    print("=" * 80)
+
+    if not os.path.exists(os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE)):
+        print("\n❌ ERRO: Arquivo de músicas processado não encontrado!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    start = time.perf_counter()
+    df = load_tracks()
+    print(f"✅ {len(df):,} músicas carregadas")
+
+    result = detect_duplicates(df, args.workers)
+    print_report(result)
+
+    output = os.path.join(PROCESSED_DATA_PATH, OUTPUT_FILE)
+    try:
+        result.to_parquet(output, index=False)
+    except ImportError:
+        output = output.replace('.parquet', '.csv')
+        result.to_csv(output, index=False, encoding='utf-8-sig')
+
+    print("=" * 80)
+    print(f"✅ Mapeamento música -> versão canônica salvo em {output} ({time.perf_counter() - start:.1f} s)")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+MusicMetrics - Busca por Nome
+Busca de músicas e artistas por prefixo ou trecho do nome, sem acento e sem diferenciar
+maiúsculas, usando o índice de trigramas gerado por 02_Limpeza_e_Transformacao.py
+(em vez de LIKE '%...%' no MySQL, que não usa idx_track_name / idx_artist_name)
+"""
+
+import numpy as np
+import os
+import re
+import unicodedata
+import argparse
+import time
+
+# ============================================
+
+# Caminhos
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+SEARCH_PATH = os.path.join(PROCESSED_DATA_PATH, 'busca')
+ENTITIES = ['musicas', 'artistas']
+
+DEFAULT_LIMIT = 10
+
+# Documentos da lista mais curta conferidos por vez na interseção
+CANDIDATE_BLOCK = 512
+
+# Benchmark: consultas sorteadas entre os próprios nomes do índice
+BENCHMARK_QUERIES = 1_000
+LATENCY_BUDGET_MS = 10
+SEED = 42
+
+# ============================================
+
+def normalize_search_key(text):
+    """Mesma normalização das chaves de busca (normalize_search_key em 02_Limpeza_e_Transformacao.py)"""
+    text = re.sub('[\u0300-\u036f]', '', unicodedata.normalize('NFKD', text))
+    return re.sub(r'[\W_]+', ' ', text.casefold()).strip()
+
+def trigram_code(gram):
+    points = [ord(char) for char in gram]
+    return np.uint64((points[0] << 42) | (points[1] << 21) | points[2])
+
+class SearchIndex:
+    """Índice invertido de trigramas de uma entidade (arquivos .npy abertos via mmap)"""
+
+    def __init__(self, entity):
+        directory = os.path.join(SEARCH_PATH, entity)
+        load = lambda name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+        self.entity = entity
+        self.trigrams = load('trigramas')
+        self.pointers = load('ponteiros')
+        self.documents = load('documentos')
+        self.keys, self.key_offsets = load('chaves'), load('chaves_pos')
+        self.labels, self.label_offsets = load('rotulos'), load('rotulos_pos')
+        self.sk = load('sk')
+
+    def __len__(self):
+        return len(self.sk)
+
+    def _string(self, data, offsets, doc):
+        return bytes(data[offsets[doc]:offsets[doc + 1]]).decode('utf-8')
+
+    def key(self, doc):
+        return self._string(self.keys, self.key_offsets, doc)
+
+    def label(self, doc):
+        return self._string(self.labels, self.label_offsets, doc)
+
+    def postings(self, code):
+        """Documentos (em ordem de popularidade) que contêm o trigrama"""
+        pos = np.searchsorted(self.trigrams, code)
+        if pos == len(self.trigrams) or self.trigrams[pos] != code:
+            return np.empty(0, dtype=np.int32)
+        return self.documents[self.pointers[pos]:self.pointers[pos + 1]]
+
+    def short_candidates(self, text, limit):
+        """Consultas com menos de 3 caracteres: união das listas dos trigramas que contêm o texto
+
+        As listas estão em ordem de popularidade, então os 'limit' primeiros da união
+        estão entre os 'limit' primeiros de cada lista
+        """
+        points = [ord(char) for char in text]
+        first = (self.trigrams >> np.uint64(42)) & np.uint64(0x1FFFFF)
+        middle = (self.trigrams >> np.uint64(21)) & np.uint64(0x1FFFFF)
+        last = self.trigrams & np.uint64(0x1FFFFF)
+        if len(points) == 1:
+            match = (first == points[0]) | (middle == points[0]) | (last == points[0])
+        else:
+            match = ((first == points[0]) & (middle == points[1])) | ((middle == points[0]) & (last == points[1]))
+        heads = [self.documents[self.pointers[i]:min(self.pointers[i] + limit, self.pointers[i + 1])]
+                 for i in np.flatnonzero(match)]
+        return np.unique(np.concatenate(heads))[:limit] if heads else np.empty(0, dtype=np.int32)
+
+    def candidates(self, marked):
+        """Documentos com todos os trigramas do texto, em blocos e em ordem de popularidade
+
+        Percorre a lista mais curta e busca cada bloco nas demais (busca binária), sem
+        materializar a interseção inteira: a busca para assim que há resultados suficientes
+        """
+        lists = sorted((self.postings(trigram_code(marked[i:i + 3])) for i in range(len(marked) - 2)), key=len)
+        shortest, others = lists[0], lists[1:]
+        for start in range(0, len(shortest), CANDIDATE_BLOCK):
+            block = np.asarray(shortest[start:start + CANDIDATE_BLOCK])
+            for other in others:
+                pos = np.searchsorted(other, block).clip(max=len(other) - 1)
+                block = block[other[pos] == block]
+                if len(block) == 0:
+                    break
+            yield from block
+
+    def search(self, query, mode='trecho', limit=DEFAULT_LIMIT):
+        """Até 'limit' resultados (sk, rótulo), dos mais populares aos menos
+
+        mode='prefixo' casa o início do nome; mode='trecho' casa qualquer parte
+        """
+        text = normalize_search_key(query)
+        if not text:
+            return []
+
+        # No modo prefixo a âncora '^' faz parte do primeiro trigrama
+        marked = '^' + text if mode == 'prefixo' else text
+        if len(marked) < 3:
+            docs = self.short_candidates(marked, limit)
+        else:
+            docs = self.candidates(marked)
+
+        # Até 3 caracteres o trigrama já é o texto inteiro; acima disso, trigramas em comum
+        # não garantem o trecho: confere na chave
+        check = str.startswith if mode == 'prefixo' else str.__contains__
+        exact = len(marked) <= 3
+        results = []
+        for doc in docs:
+            if exact or check(self.key(doc), text):
+                results.append((int(self.sk[doc]), self.label(doc)))
+                if len(results) == limit:
+                    break
+        return results
+
+def run_benchmark(index, mode, n_queries=BENCHMARK_QUERIES):
+    """Latência (p50/p99) de consultas com trechos de nomes reais do índice"""
+    rng = np.random.default_rng(SEED)
+    queries = []
+    for doc in rng.integers(0, len(index), n_queries):
+        key = index.key(doc)
+        if not key:
+            continue
+        size = int(rng.integers(3, 9))
+        start = 0 if mode == 'prefixo' else int(rng.integers(0, max(len(key) - size, 0) + 1))
+        queries.append(key[start:start + size])
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, mode)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    p50, p99 = np.percentile(timings, [50, 99])
+    ok = p99 <= LATENCY_BUDGET_MS
+    print(f"  {'✅' if ok else '⚠️'} {index.entity} ({mode}): {len(queries):,} consultas | "
+          f"p50 {p50:.2f} ms | p99 {p99:.2f} ms (orçamento {LATENCY_BUDGET_MS} ms)")
+    return ok
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Busca de músicas e artistas por nome')
+    parser.add_argument('consulta', nargs='?', help='texto buscado (sem acento/maiúsculas tanto faz)')
+    parser.add_argument('--em', choices=ENTITIES + ['ambos'], default='ambos',
+                        help='onde buscar')
+    parser.add_argument('--modo', choices=['trecho', 'prefixo'], default='trecho',
+                        help='trecho em qualquer parte do nome ou só no início')
+    parser.add_argument('--limite', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--benchmark', action='store_true',
+                        help='mede a latência de consultas sorteadas')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🔎 MUSICMETRICS - BUSCA")
+    print("=" * 80)
+
+    entities = ENTITIES if args.em == 'ambos' else [args.em]
+    if not all(os.path.isdir(os.path.join(SEARCH_PATH, entity)) for entity in entities):
+        print("\n❌ ERRO: Índice de busca não encontrado!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    indexes = [SearchIndex(entity) for entity in entities]
+
+    if args.benchmark:
+        print("\n⏱️ Benchmark de latência...")
+        for index in indexes:
+            for mode in ('prefixo', 'trecho'):
+                run_benchmark(index, mode)
+
+    if args.consulta:
+        for index in indexes:
+            start = time.perf_counter()
+            results = index.search(args.consulta, args.modo, args.limite)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"\n{'🎵' if index.entity == 'musicas' else '🎤'} {index.entity.capitalize()} "
+                  f"({len(results)} resultados em {elapsed:.2f} ms):")
+            for sk, label in results:
+                print(f"   [{sk}] {label}")
+    elif not args.benchmark:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+MusicMetrics - Análise de Letras
+Lê um corpus local de letras (um .txt por track_id ou arquivos .jsonl) em fluxo, tokeniza
+em um pool de processos e gera estatísticas por música e uma matriz TF-IDF esparsa alinhada
+a dim_tracks (linha = track_sk - 1), para cruzar as letras com as audio features
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import re
+import json
+import zlib
+import argparse
+import time
+import unicodedata
+from collections import Counter
+from multiprocessing import Pool
+
+# ============================================
+
+# Caminhos
+RAW_DATA_PATH = '../MusicMetrics/data/raw/'
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+LYRICS_PATH = os.path.join(RAW_DATA_PATH, 'letras')
+OUTPUT_PATH = os.path.join(PROCESSED_DATA_PATH, 'letras')
+
+TRACKS_FILE = 'tracks_limpo.csv'
+FEATURES_FILE = 'audios_limpos.csv'
+
+OUTPUT_TFIDF = 'letras_tfidf.npz'
+OUTPUT_TERMS = 'letras_termos.npy'
+OUTPUT_STATS = 'letras_estatisticas.parquet'
+OUTPUT_CORRELATIONS = 'letras_correlacoes.parquet'
+
+# Campos aceitos para o texto nos arquivos .jsonl ({"track_id": ..., "lyrics": ...})
+JSONL_TEXT_FIELDS = ['lyrics', 'letra', 'text']
+
+# Hashing dos termos: workers independentes geram os mesmos índices, sem vocabulário compartilhado.
+# Termos que caem na mesma coluna têm as contagens somadas; o rótulo da coluna lista todos ('a|b')
+HASH_BITS = 20
+
+# Letras por lote enviado aos processos
+BATCH_SIZE = 2_000
+
+# Termos em menos de MIN_DF letras ou em mais de MAX_DF_RATIO delas ficam fora do TF-IDF
+MIN_DF = 2
+MAX_DF_RATIO = 0.8
+
+# Só letras (sem dígitos), 2+ caracteres, depois de remover acentos
+TOKEN_PATTERN = re.compile(r'[^\W\d_]{2,}')
+
+STOPWORDS = set("""
+a o e de da do das dos em no na nos nas um uma uns umas que se por para com sem mas
+ao aos eu tu ele ela nos vos eles elas me te lhe meu minha teu tua seu sua nao sim
+the and of to in on at for with is it be are was were you your my me we our they
+them he she his her this that these those but or so if as not no yes oh ooh ah yeah
+la el los las un una y en del al lo le les que por con para es se mi tu su
+""".split())
+
+STAT_COLUMNS = ['total_palavras', 'palavras_distintas', 'total_versos', 'versos_repetidos',
+                'tamanho_medio_palavra']
+
+# Estatísticas correlacionadas com as features de audios_limpos.csv
+AUDIO_FEATURES = ['danceability', 'energy', 'loudness', 'speechiness', 'acousticness',
+                  'instrumentalness', 'liveness', 'valence', 'tempo']
+LYRIC_FEATURES = ['total_palavras', 'diversidade_lexica', 'repeticao_versos', 'tamanho_medio_palavra']
+
+# ============================================
+
+def iter_corpus(path=LYRICS_PATH):
+    """Percorre o corpus sem carregar os textos: (track_id, origem) com o arquivo e a posição da letra
+
+    Os processos leem o texto direto do disco, então a fila de lotes só carrega caminhos
+    """
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.name.endswith('.txt'):
+            yield entry.name[:-4], (entry.path, None)
+        elif entry.name.endswith('.jsonl'):
+            with open(entry.path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        yield None, (entry.path, offset)
+                    offset += len(line)
+
+def iter_batches(items, size=BATCH_SIZE):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def read_lyrics(track_id, source, handles):
+    """Texto de um .txt inteiro ou de uma linha de .jsonl (na posição indicada)"""
+    path, offset = source
+    if offset is None:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return track_id, f.read()
+
+    if path not in handles:
+        handles[path] = open(path, 'rb')
+    handles[path].seek(offset)
+    record = json.loads(handles[path].readline())
+    text = next((record[field] for field in JSONL_TEXT_FIELDS if record.get(field)), '')
+    return record.get('track_id'), text
+
+def normalize_text(text):
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+
+def tokenize_batch(batch):
+    """Tokeniza um lote: estatísticas por letra + contagens de termos (CSR com colunas por hash)"""
+    mask = (1 << HASH_BITS) - 1
+    track_ids, stats, terms = [], [], {}
+    indptr, indices, counts = [0], [], []
+
+    handles = {}
+    for track_id, source in batch:
+        track_id, text = read_lyrics(track_id, source, handles)
+        if not track_id or not text:
+            continue
+
+        text = normalize_text(text)
+        tokens = TOKEN_PATTERN.findall(text)
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        distinct_lines = len(set(lines))
+
+        track_ids.append(track_id)
+        stats.append((
+            len(tokens), len(set(tokens)), len(lines), len(lines) - distinct_lines,
+            sum(map(len, tokens)) / len(tokens) if tokens else 0.0,
+        ))
+
+        term_counts = Counter(token for token in tokens if token not in STOPWORDS)
+        for term, count in term_counts.items():
+            column = zlib.crc32(term.encode('utf-8')) & mask
+            terms.setdefault(column, set()).add(term)
+            indices.append(column)
+            counts.append(count)
+        indptr.append(len(indices))
+
+    for handle in handles.values():
+        handle.close()
+    return (track_ids, np.array(stats, dtype=np.float64).reshape(-1, len(STAT_COLUMNS)),
+            np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int32),
+            np.array(counts, dtype=np.int32), terms)
+
+def ingest_corpus(workers=None):
+    """Consome o corpus em fluxo; só as contagens esparsas ficam em memória"""
+    import scipy.sparse as sp
+
+    workers = workers or os.cpu_count() or 1
+    track_ids, stats, blocks, terms = [], [], [], {}
+    n_docs = 0
+
+    batches = iter_batches(iter_corpus())
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        results = pool.imap(tokenize_batch, batches) if pool else map(tokenize_batch, batches)
+        for batch_ids, batch_stats, indptr, indices, counts, batch_terms in results:
+            track_ids.extend(batch_ids)
+            stats.append(batch_stats)
+            blocks.append(sp.csr_matrix((counts, indices, indptr), shape=(len(batch_ids), 1 << HASH_BITS)))
+            for column, column_terms in batch_terms.items():
+                terms.setdefault(column, set()).update(column_terms)
+            n_docs += len(batch_ids)
+            if len(blocks) % 25 == 0:
+                print(f"    {n_docs:,} letras tokenizadas...")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    if not blocks:
+        return None
+
+    counts = sp.vstack(blocks, format='csr')
+    counts.sum_duplicates()  # termos diferentes que caíram no mesmo hash
+    stats = pd.DataFrame(np.vstack(stats), columns=STAT_COLUMNS)
+    stats.insert(0, 'track_id', track_ids)
+    return counts, stats, terms
+
+def build_tfidf(counts, terms):
+    """Compacta as colunas usadas, aplica MIN_DF/MAX_DF e calcula TF-IDF (tf sublinear, norma L2)"""
+    import scipy.sparse as sp
+
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    keep = np.flatnonzero((df >= MIN_DF) & (df <= MAX_DF_RATIO * n_docs))
+    matrix = counts[:, keep].tocsr().astype(np.float32)
+
+    idf = np.log((1 + n_docs) / (1 + df[keep])).astype(np.float32) + 1
+    matrix.data = 1 + np.log(matrix.data)
+    matrix = matrix @ sp.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sp.diags(1 / np.where(norms > 0, norms, 1).astype(np.float32)) @ matrix
+    vocabulary = np.array(['|'.join(sorted(terms[column])) for column in keep], dtype=str)
+    return matrix.tocsr(), vocabulary
+
+def align_to_tracks(matrix, stats):
+    """Reordena as linhas por track_sk (linha = track_sk - 1); letras sem música são descartadas"""
+    import scipy.sparse as sp
+
+    df_tracks = pd.read_csv(os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE),
+                            usecols=['track_sk', 'track_id'], dtype={'track_id': str})
+    sk_by_id = df_tracks.drop_duplicates('track_id').set_index('track_id')['track_sk']
+
+    stats['track_sk'] = stats['track_id'].map(sk_by_id)
+    found = stats['track_sk'].notna().to_numpy()
+    # Mesma música repetida no corpus: fica a última ocorrência
+    last = ~stats['track_id'].duplicated(keep='last').to_numpy()
+    rows = np.flatnonzero(found & last)
+
+    n_tracks = int(df_tracks['track_sk'].max()) if len(df_tracks) else 0
+    sks = stats['track_sk'].to_numpy()[rows].astype(np.int64)
+    selector = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (sks - 1, rows)),
+                             shape=(n_tracks, matrix.shape[0]))
+    aligned = (selector @ matrix).tocsr()
+
+    stats = stats.iloc[rows].copy()
+    stats['track_sk'] = sks
+    return aligned, stats, int((~found).sum())
+
+def add_derived_stats(stats):
+    words = stats['total_palavras']
+    stats['diversidade_lexica'] = (stats['palavras_distintas'] / words.where(words > 0)).round(4)
+    stats['repeticao_versos'] = (stats['versos_repetidos'] / stats['total_versos'].where(stats['total_versos'] > 0)).round(4)
+    stats['tamanho_medio_palavra'] = stats['tamanho_medio_palavra'].round(3)
+    for column in ['total_palavras', 'palavras_distintas', 'total_versos', 'versos_repetidos']:
+        stats[column] = stats[column].astype(np.int64)
+    return stats
+
+def correlate_with_audio(stats):
+    """Pearson/Spearman entre as estatísticas das letras e as audio features"""
+    features_path = os.path.join(PROCESSED_DATA_PATH, FEATURES_FILE)
+    if not os.path.exists(features_path):
+        return None
+
+    features = pd.read_csv(features_path, usecols=['track_sk'] + AUDIO_FEATURES)
+    df = stats[['track_sk'] + LYRIC_FEATURES].merge(features, on='track_sk', how='inner')
+    if len(df) < 3:
+        return None
+
+    frames = []
+    for method in ('pearson', 'spearman'):
+        corr = df[LYRIC_FEATURES + AUDIO_FEATURES].corr(method=method).loc[LYRIC_FEATURES, AUDIO_FEATURES]
+        long = corr.stack().rename('correlacao').reset_index()
+        long.columns = ['variavel_letra', 'feature', 'correlacao']
+        frames.append(long.assign(metodo=method, n=len(df)))
+    return pd.concat(frames, ignore_index=True)
+
+def save_table(df, path):
+    """Grava em Parquet (CSV se o pyarrow não estiver instalado)"""
+    try:
+        df.to_parquet(path, index=False)
+    except ImportError:
+        path = path.replace('.parquet', '.csv')
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"  ✅ {os.path.basename(path)} salvo ({len(df):,} linhas)")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Estatísticas e TF-IDF das letras das músicas')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processos de tokenização (padrão: nº de CPUs; 1 = sem paralelismo)')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("📝 MUSICMETRICS - ANÁLISE DE LETRAS")
+    print("=" * 80)
+
+    if not os.path.isdir(LYRICS_PATH):
+        print(f"\n❌ ERRO: Corpus de letras não encontrado em {LYRICS_PATH}")
+        print("   Um arquivo <track_id>.txt por música ou .jsonl com {\"track_id\": ..., \"lyrics\": ...}")
+        return
+    if not os.path.exists(os.path.join(PROCESSED_DATA_PATH, TRACKS_FILE)):
+        print("\n❌ ERRO: Arquivo de músicas processado não encontrado!")
+        print(f"   Execute primeiro o script: 02_Limpeza_e_Transformacao.py")
+        return
+
+    try:
+        import scipy.sparse as sp
+    except ImportError:
+        print("\n❌ scipy não instalado: a matriz TF-IDF é esparsa (scipy.sparse)")
+        return
+
+    start = time.perf_counter()
+    print(f"\n📥 Lendo e tokenizando {LYRICS_PATH}...")
+    ingested = ingest_corpus(args.workers)
+    if ingested is None:
+        print("  ⚠️ Nenhuma letra encontrada")
+        return
+    counts, stats, terms = ingested
+    print(f"  ✅ {counts.shape[0]:,} letras em {time.perf_counter() - start:.1f} s")
+
+    matrix, vocabulary = build_tfidf(counts, terms)
+    matrix, stats, unknown = align_to_tracks(matrix, stats)
+    stats = add_derived_stats(stats)
+    if unknown:
+        print(f"  ⚠️ {unknown:,} letras sem música correspondente em {TRACKS_FILE} (descartadas)")
+    print(f"  🧮 TF-IDF: {matrix.shape[0]:,} músicas x {len(vocabulary):,} termos ({matrix.nnz:,} valores)")
+    # Os tokens só têm letras: '|' no rótulo marca uma coluna com mais de um termo
+    collided = int((np.char.find(vocabulary, '|') >= 0).sum())
+    if collided:
+        print(f"  ⚠️ {collided:,} colunas com termos que colidiram no hash (contagens somadas, "
+              f"rótulo 'termo_a|termo_b'; aumente HASH_BITS para separá-los)")
+
+    print("\n💾 Salvando...")
+    os.makedirs(OUTPUT_PATH, exist_ok=True)
+    sp.save_npz(os.path.join(OUTPUT_PATH, OUTPUT_TFIDF), matrix, compressed=False)
+    np.save(os.path.join(OUTPUT_PATH, OUTPUT_TERMS), vocabulary)
+    print(f"  ✅ {OUTPUT_TFIDF} e {OUTPUT_TERMS} salvos")
+    save_table(stats[['track_sk', 'track_id'] + [c for c in stats.columns if c not in ('track_sk', 'track_id')]],
+               os.path.join(OUTPUT_PATH, OUTPUT_STATS))
+
+    correlations = correlate_with_audio(stats)
+    if correlations is not None:
+        save_table(correlations, os.path.join(OUTPUT_PATH, OUTPUT_CORRELATIONS))
+        pearson = correlations[correlations['metodo'] == 'pearson']
+        strongest = pearson.reindex(pearson['correlacao'].abs().sort_values(ascending=False).index).head(3)
+        print("\n🔗 Maiores correlações (Pearson) letra x áudio:")
+        for _, row in strongest.iterrows():
+            print(f"   {row['variavel_letra']} x {row['feature']}: {row['correlacao']:.3f}")
+
+    weights = np.asarray(matrix.sum(axis=0)).ravel()
+    top_terms = vocabulary[np.argsort(weights)[::-1][:10]]
+    print(f"\n🔤 Termos com maior peso TF-IDF: {', '.join(top_terms)}")
+
+    print("\n" + "=" * 80)
+    print(f"✅ Concluído em {time.perf_counter() - start:.1f} s | Resultados em: {OUTPUT_PATH}")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,18 @@ MusicMetrics - Extração de Dados do Spotify
 Extrai dados pessoais do Spotify e salva em arquivos CSV para análise
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from dotenv import load_dotenv
 import os
+import sys
 import pandas as pd
 from datetime import datetime
 import time
 
-# Carregar variáveis de ambiente
-load_dotenv()
+# Raiz do repositório no path: o script também roda direto, fora da CLI
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
 
-# Configurar autenticação
-sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=os.getenv('SPOTIFY_CLIENT_ID'),
-    client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
-    redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI'),
-    scope='user-top-read user-read-recently-played user-library-read playlist-read-private'
-))
+from musicmetrics.config import get_spotify_client
 
 def extract_top_artists(time_ranges=['short_term', 'medium_term', 'long_term'], limit=50):
     """Extrai top artistas para diferentes períodos"""
@@ -30,7 +24,7 @@ def extract_top_artists(time_ranges=['short_term', 'medium_term', 'long_term'],
         print(f"📊 Extraindo top artistas - {time_range}...")
         
         try:
-            results = sp.current_user_top_artists(time_range=time_range, limit=limit)
+            results = get_spotify_client().current_user_top_artists(time_range=time_range, limit=limit)
             
             for idx, artist in enumerate(results['items'], 1):
                 all_artists.append({
@@ -60,7 +54,7 @@ def extract_top_tracks(time_ranges=['short_term', 'medium_term', 'long_term'], l
         print(f"📊 Extraindo top músicas - {time_range}...")
         
         try:
-            results = sp.current_user_top_tracks(time_range=time_range, limit=limit)
+            results = get_spotify_client().current_user_top_tracks(time_range=time_range, limit=limit)
             
             for idx, track in enumerate(results['items'], 1):
                 all_tracks.append({
@@ -98,7 +92,7 @@ def extract_audio_features(track_ids):
         batch = track_ids[i:i+batch_size]
         
         try:
-            features = sp.audio_features(batch)
+            features = get_spotify_client().audio_features(batch)
             
             for feature in features:
                 if feature:  # Algumas músicas podem não ter features disponíveis
@@ -133,7 +127,7 @@ def extract_recently_played(limit=50):
     all_played = []
     
     try:
-        results = sp.current_user_recently_played(limit=limit)
+        results = get_spotify_client().current_user_recently_played(limit=limit)
         
         for item in results['items']:
             track = item['track']
@@ -209,5 +203,8 @@ def save_data():
     print("✅ Extração concluída com sucesso!")
     print("=" * 60)
 
-if __name__ == "__main__":
+def main():
     save_data()
+
+if __name__ == "__main__":
+    main()
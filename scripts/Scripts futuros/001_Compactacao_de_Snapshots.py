@@ -0,0 +1,207 @@
+"""
+MusicMetrics - Compactação dos Snapshots do Spotify
+Junta os CSVs com timestamp gerados por 000_Extracao_de_Dados_Pessoais_Spotify.py em
+datasets Parquet particionados por time_range e mês, para as análises históricas
+"""
+
+import pandas as pd
+import os
+import re
+import json
+import argparse
+from datetime import datetime
+
+# ============================================
+
+# Mesma pasta de saída da extração
+RAW_DATA_PATH = '../data/raw'
+HISTORY_PATH = '../data/historico'
+MANIFEST_FILE = 'manifesto.json'
+
+# <dataset>_<AAAAMMDD_HHMMSS>.csv
+SNAPSHOT_PATTERN = re.compile(r'^(top_artists|top_tracks|audio_features|recently_played)_(\d{8}_\d{6})\.csv$')
+
+# Partição mensal: poucos arquivos mesmo com anos de extrações diárias
+PARTITION_FORMAT = '%Y-%m'
+
+# Partição das linhas sem valor na coluna de partição (o pyarrow não lê partições nulas)
+UNKNOWN_PARTITION = 'desconhecido'
+
+# Como cada dataset é particionado, ordenado e deduplicado
+DATASETS = {
+    'top_artists': {
+        'partition_by': ['time_range'], 'time_column': 'extracted_at',
+        'sort': ['time_range', 'extracted_at', 'rank'],
+        'unique': ['snapshot_at', 'time_range', 'rank'],
+    },
+    'top_tracks': {
+        'partition_by': ['time_range'], 'time_column': 'extracted_at',
+        'sort': ['time_range', 'extracted_at', 'rank'],
+        'unique': ['snapshot_at', 'time_range', 'rank'],
+    },
+    'recently_played': {
+        'partition_by': [], 'time_column': 'played_at',
+        'sort': ['played_at'],
+        'unique': ['played_at', 'track_id'],
+    },
+    # Features não mudam: um único arquivo, uma linha por música (a mais recente)
+    'audio_features': {
+        'partition_by': None, 'time_column': None,
+        'sort': ['track_id'],
+        'unique': ['track_id'],
+    },
+}
+
+# ============================================
+
+def find_snapshots(raw_path=RAW_DATA_PATH):
+    """{dataset: [(caminho, datetime do snapshot), ...]} em ordem cronológica"""
+    snapshots = {name: [] for name in DATASETS}
+    if not os.path.isdir(raw_path):
+        return snapshots
+
+    for filename in sorted(os.listdir(raw_path)):
+        match = SNAPSHOT_PATTERN.match(filename)
+        if match:
+            dataset, stamp = match.groups()
+            snapshots[dataset].append((os.path.join(raw_path, filename),
+                                       datetime.strptime(stamp, '%Y%m%d_%H%M%S')))
+    return snapshots
+
+def read_snapshots(files):
+    """Concatena os CSVs, marcando cada linha com o horário do snapshot de origem"""
+    frames = []
+    for path, snapshot_at in files:
+        df = pd.read_csv(path)
+        if not df.empty:
+            frames.append(df.assign(snapshot_at=snapshot_at))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def partition_dir(dataset, keys):
+    """Caminho no estilo Hive: dataset/time_range=short_term/mes=2025-01"""
+    parts = [f"{column}={value if pd.notna(value) else UNKNOWN_PARTITION}" for column, value in keys.items()]
+    return os.path.join(HISTORY_PATH, dataset, *parts)
+
+def write_partition(df, directory, config):
+    """Une a partição existente com as linhas novas, deduplica, ordena e regrava"""
+    path = os.path.join(directory, 'part-0.parquet')
+    if os.path.exists(path):
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+
+    # Linhas sem valor em alguma coluna da chave (ex.: played_at ilegível) não são deduplicadas:
+    # NaT == NaT no drop_duplicates e reproduções diferentes virariam uma só
+    missing_key = df[config['unique']].isna().any(axis=1)
+    df = pd.concat([
+        df[~missing_key].sort_values('snapshot_at', kind='stable').drop_duplicates(config['unique'], keep='last'),
+        df[missing_key],
+    ], ignore_index=True)
+    df = df.sort_values(config['sort'], kind='stable').reset_index(drop=True)
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)  # nunca deixa uma partição pela metade
+    return len(df)
+
+def compact_dataset(dataset, files):
+    """Compacta os snapshots de um dataset; retorna nº de partições e linhas gravadas"""
+    config = DATASETS[dataset]
+    df = read_snapshots(files)
+    if df.empty:
+        return 0, 0
+
+    if config['time_column']:
+        # ISO8601: o Spotify manda played_at com e sem milissegundos no mesmo arquivo, e o formato
+        # inferido do primeiro valor transformaria os demais em NaT
+        raw = df[config['time_column']]
+        df[config['time_column']] = pd.to_datetime(raw, format='ISO8601', errors='coerce', utc=True)
+        df[config['time_column']] = df[config['time_column']].dt.tz_localize(None)
+        invalid = int((df[config['time_column']].isna() & raw.notna()).sum())
+        if invalid:
+            print(f"  ⚠️ {dataset}: {invalid:,} valores de {config['time_column']} ilegíveis (mantidos sem deduplicar)")
+
+    if config['partition_by'] is None:
+        return 1, write_partition(df, os.path.join(HISTORY_PATH, dataset), config)
+
+    # Colunas de partição ficam só no caminho (são recuperadas na leitura do dataset).
+    # dropna=False: linhas sem time_range vão para a partição 'desconhecido' em vez de sumirem
+    month = df[config['time_column']].fillna(df['snapshot_at']).dt.strftime(PARTITION_FORMAT).rename('mes')
+    partitions, rows = 0, 0
+    for keys, group in df.groupby([df[col] for col in config['partition_by']] + [month], sort=True, dropna=False):
+        keys = dict(zip(config['partition_by'] + ['mes'], keys))
+        group = group.drop(columns=config['partition_by'])
+        partition_config = {
+            **config,
+            'sort': [c for c in config['sort'] if c not in keys],
+            'unique': [c for c in config['unique'] if c not in keys],
+        }
+        rows += write_partition(group, partition_dir(dataset, keys), partition_config)
+        partitions += 1
+    return partitions, rows
+
+def read_manifest():
+    path = os.path.join(HISTORY_PATH, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'compacted_files': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def compact_snapshots(remove_csv=False):
+    """Compacta os snapshots ainda não processados (incremental, pelo manifesto)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("❌ pyarrow não instalado: a compactação grava Parquet")
+        return False
+
+    os.makedirs(HISTORY_PATH, exist_ok=True)
+    manifest = read_manifest()
+    done = set(manifest['compacted_files'])
+    snapshots = find_snapshots()
+    compacted = []
+
+    for dataset, files in snapshots.items():
+        new_files = [(path, stamp) for path, stamp in files if os.path.basename(path) not in done]
+        if not new_files:
+            continue
+
+        partitions, rows = compact_dataset(dataset, new_files)
+        compacted.extend(os.path.basename(path) for path, _ in new_files)
+        print(f"  ✅ {dataset}: {len(new_files)} CSVs -> {partitions} partições ({rows:,} linhas)")
+
+    if compacted:
+        done.update(compacted)
+        manifest['compacted_files'] = sorted(done)
+        manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        with open(os.path.join(HISTORY_PATH, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    else:
+        print("  ⏭️ Nenhum snapshot novo")
+
+    if remove_csv:
+        # Só apaga o que já está registrado no manifesto (ou seja, gravado em Parquet)
+        removable = [path for files in snapshots.values() for path, _ in files
+                     if os.path.basename(path) in done]
+        for path in removable:
+            os.remove(path)
+        print(f"  🗑️ {len(removable)} CSVs compactados removidos de {RAW_DATA_PATH}")
+
+    return True
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Compacta os snapshots CSV do Spotify em Parquet particionado')
+    parser.add_argument('--remover-csv', action='store_true',
+                        help='apaga os CSVs depois de compactados')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗜️ MUSICMETRICS - Compactação de Snapshots")
+    print("=" * 60)
+
+    if compact_snapshots(args.remover_csv):
+        print(f"\n📂 Datasets em: {HISTORY_PATH}")
+        print(f"   Ex.: pd.read_parquet('{HISTORY_PATH}/top_artists', filters=[('time_range', '==', 'short_term')])")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+MusicMetrics - Evolução do Gosto Musical
+Compara os rankings de top artistas/músicas entre snapshots consecutivos (por time_range):
+sobreposição, Jaccard, rank-biased overlap, churn e variação de posição
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import json
+import argparse
+import time
+
+# ============================================
+
+# Datasets compactados por 001_Compactacao_de_Snapshots.py
+HISTORY_PATH = '../data/historico'
+EVOLUTION_PATH = os.path.join(HISTORY_PATH, 'evolucao')
+METRICS_FILE = 'metricas.parquet'
+MOVEMENTS_FILE = 'movimentos.parquet'
+STATE_FILE = 'estado.json'
+
+# entidade -> (dataset, coluna de ID, coluna de nome)
+ENTITIES = {
+    'artistas': ('top_artists', 'artist_id', 'artist_name'),
+    'musicas': ('top_tracks', 'track_id', 'track_name'),
+}
+
+# Persistência do RBO: com p = 0.9, o topo 10 concentra ~86% do peso
+RBO_P = 0.9
+
+# Pares de snapshots comparados por bloco (limita a memória das comparações n x K x K)
+PAIR_CHUNK = 2_000
+
+# ============================================
+
+def load_rankings(dataset, id_column, name_column, since=None):
+    """Lê os rankings (a partir de 'since', inclusive) e monta a matriz snapshots x posições"""
+    path = os.path.join(HISTORY_PATH, dataset)
+    filters = [('snapshot_at', '>=', pd.Timestamp(since))] if since else None
+    df = pd.read_parquet(path, columns=['time_range', 'snapshot_at', 'rank', id_column, name_column],
+                         filters=filters)
+    df['time_range'] = df['time_range'].astype(str)
+    return df.rename(columns={id_column: 'item_id', name_column: 'item_name'})
+
+def ranking_matrix(df):
+    """(snapshots ordenados, códigos dos itens, matriz n x K de códigos por posição, -1 = vazio)"""
+    codes, items = pd.factorize(df['item_id'])
+    snapshots, snapshot_idx = np.unique(df['snapshot_at'].to_numpy(), return_inverse=True)
+    depth = int(df['rank'].max())
+
+    matrix = np.full((len(snapshots), depth), -1, dtype=np.int64)
+    matrix[snapshot_idx, df['rank'].to_numpy() - 1] = codes
+    return snapshots, items, matrix
+
+def compare_pairs(previous, current, p=RBO_P):
+    """Métricas vetorizadas entre linhas correspondentes de duas matrizes de ranking"""
+    valid_prev = previous >= 0
+    valid_curr = current >= 0
+
+    # eq[n, i, j]: item na posição i do anterior é o da posição j do atual
+    eq = (previous[:, :, None] == current[:, None, :]) & valid_prev[:, :, None]
+
+    size_prev = valid_prev.sum(axis=1)
+    size_curr = valid_curr.sum(axis=1)
+    overlap = eq.sum(axis=(1, 2))
+    union = size_prev + size_curr - overlap
+
+    # Sobreposição dos prefixos de profundidade d: X_d = soma de eq[:d, :d]
+    depth = previous.shape[1]
+    prefix = eq.cumsum(axis=1).cumsum(axis=2)[:, np.arange(depth), np.arange(depth)]
+    d = np.arange(1, depth + 1)
+    weights = p ** d
+
+    # RBO extrapolado (Webber et al., 2010) até a profundidade k
+    k = np.minimum(size_prev, size_curr).clip(min=1)
+    agreement = prefix / d
+    in_depth = d[None, :] <= k[:, None]
+    x_k = prefix[np.arange(len(k)), k - 1]
+    rbo = (x_k / k) * p ** k + (1 - p) / p * (agreement * weights * in_depth).sum(axis=1)
+
+    # Variação de posição dos itens que continuam no ranking
+    pair_idx, pos_prev, pos_curr = np.nonzero(eq)
+    shift = np.abs(pos_prev - pos_curr)
+    shift_sum = np.bincount(pair_idx, weights=shift, minlength=len(previous))
+
+    return {
+        'tamanho_anterior': size_prev,
+        'tamanho_atual': size_curr,
+        'sobreposicao': overlap,
+        'jaccard': np.divide(overlap, union, out=np.zeros(len(union)), where=union > 0),
+        'rbo': rbo,
+        'entradas': size_curr - overlap,
+        'saidas': size_prev - overlap,
+        'churn': np.divide(size_prev - overlap, size_prev, out=np.zeros(len(size_prev)), where=size_prev > 0),
+        'variacao_media_posicao': np.divide(shift_sum, overlap, out=np.full(len(overlap), np.nan),
+                                            where=overlap > 0),
+    }, (pair_idx, pos_prev, pos_curr)
+
+def evolution_for_group(snapshots, items, matrix):
+    """Métricas de pares consecutivos + movimentos de cada item (posição anterior/atual)"""
+    metrics, movements = [], []
+
+    for start in range(0, len(snapshots) - 1, PAIR_CHUNK):
+        stop = min(start + PAIR_CHUNK, len(snapshots) - 1)
+        previous, current = matrix[start:stop], matrix[start + 1:stop + 1]
+        result, (pair_idx, pos_prev, pos_curr) = compare_pairs(previous, current)
+
+        metrics.append(pd.DataFrame({
+            'snapshot_anterior': snapshots[start:stop],
+            'snapshot_at': snapshots[start + 1:stop + 1],
+            **result
+        }))
+
+        # Itens que permaneceram (com variação) e itens que entraram (posição anterior vazia)
+        stayed = np.zeros(current.shape, dtype=bool)
+        stayed[pair_idx, pos_curr] = True
+        entered_pair, entered_pos = np.nonzero(~stayed & (current >= 0))
+        movements.append(pd.DataFrame({
+            'snapshot_at': np.concatenate([snapshots[start + 1 + pair_idx], snapshots[start + 1 + entered_pair]]),
+            'item_id': items[np.concatenate([current[pair_idx, pos_curr], current[entered_pair, entered_pos]])],
+            'posicao': np.concatenate([pos_curr, entered_pos]) + 1,
+            'posicao_anterior': np.concatenate([pos_prev + 1.0, np.full(len(entered_pair), np.nan)]),
+        }))
+
+    metrics = pd.concat(metrics, ignore_index=True) if metrics else pd.DataFrame()
+    movements = pd.concat(movements, ignore_index=True) if movements else pd.DataFrame()
+    if not movements.empty:
+        movements['subida'] = movements['posicao_anterior'] - movements['posicao']
+    return metrics, movements
+
+def read_state():
+    path = os.path.join(EVOLUTION_PATH, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def append_table(df, filename):
+    """Acrescenta as linhas novas ao Parquet acumulado"""
+    path = os.path.join(EVOLUTION_PATH, filename)
+    if os.path.exists(path):
+        df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+    df.to_parquet(path, index=False)
+    return len(df)
+
+def update_evolution(full=False):
+    """Processa só os snapshots posteriores ao último já comparado de cada grupo"""
+    os.makedirs(EVOLUTION_PATH, exist_ok=True)
+    state = {} if full else read_state()
+    if full:
+        for filename in (METRICS_FILE, MOVEMENTS_FILE):
+            path = os.path.join(EVOLUTION_PATH, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+    all_metrics, all_movements = [], []
+    for entity, (dataset, id_column, name_column) in ENTITIES.items():
+        if not os.path.isdir(os.path.join(HISTORY_PATH, dataset)):
+            print(f"  ⏭️ {entity}: dataset {dataset} não encontrado")
+            continue
+
+        # O snapshot mais antigo entre os últimos processados serve de âncora para todos os grupos
+        group_states = [v for k, v in state.items() if k.startswith(f'{entity}/')]
+        since = min(group_states) if group_states else None
+        df = load_rankings(dataset, id_column, name_column, since)
+
+        for time_range, group in df.groupby('time_range'):
+            key = f'{entity}/{time_range}'
+            if key in state:
+                group = group[group['snapshot_at'] >= pd.Timestamp(state[key])]
+
+            snapshots, items, matrix = ranking_matrix(group)
+            if len(snapshots) < 2:
+                continue
+
+            metrics, movements = evolution_for_group(snapshots, items, matrix)
+            names = group.drop_duplicates('item_id', keep='last').set_index('item_id')['item_name']
+            movements['item_name'] = movements['item_id'].map(names)
+
+            for df_out in (metrics, movements):
+                df_out.insert(0, 'entidade', entity)
+                df_out.insert(1, 'time_range', time_range)
+            all_metrics.append(metrics)
+            all_movements.append(movements)
+
+            state[key] = pd.Timestamp(snapshots[-1]).isoformat()
+            print(f"  ✅ {key}: {len(metrics):,} comparações novas "
+                  f"(Jaccard médio {metrics['jaccard'].mean():.2f} | RBO médio {metrics['rbo'].mean():.2f})")
+
+    if not all_metrics:
+        print("  ⏭️ Nenhum snapshot novo para comparar")
+        return
+
+    total_metrics = append_table(pd.concat(all_metrics, ignore_index=True), METRICS_FILE)
+    total_movements = append_table(pd.concat(all_movements, ignore_index=True), MOVEMENTS_FILE)
+    with open(os.path.join(EVOLUTION_PATH, STATE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+    print(f"  💾 {METRICS_FILE}: {total_metrics:,} linhas | {MOVEMENTS_FILE}: {total_movements:,} linhas")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Evolução do gosto musical entre snapshots')
+    parser.add_argument('--completo', action='store_true',
+                        help='descarta o estado salvo e recalcula todo o histórico')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📈 MUSICMETRICS - Evolução do Gosto Musical")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    update_evolution(full=args.completo)
+    print(f"\n⏱️ Concluído em {time.perf_counter() - start:.2f} s | Resultados em: {EVOLUTION_PATH}")
+
+if __name__ == "__main__":
+    main()
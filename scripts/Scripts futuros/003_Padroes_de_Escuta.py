@@ -0,0 +1,174 @@
+"""
+MusicMetrics - Padrões de Escuta
+Agrega as reproduções (recently_played) em um cubo dia da semana x hora com o nº de
+reproduções e a média das audio features: as contagens por música são incrementais e
+as médias são recalculadas com as features atuais
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import json
+import argparse
+import time
+
+# ============================================
+
+# Datasets compactados por 001_Compactacao_de_Snapshots.py
+HISTORY_PATH = '../data/historico'
+PATTERNS_PATH = os.path.join(HISTORY_PATH, 'padroes_escuta')
+CUBE_FILE = 'cubo_dia_hora.parquet'
+# Reproduções por (célula, música): permite recalcular as médias quando chegam features novas
+COUNTS_FILE = 'reproducoes_por_musica.parquet'
+STATE_FILE = 'estado.json'
+
+# played_at é gravado em UTC; horas e dias são contados no fuso do ouvinte
+TIMEZONE = 'America/Sao_Paulo'
+
+FEATURES = ['danceability', 'energy', 'loudness', 'speechiness', 'acousticness',
+            'instrumentalness', 'liveness', 'valence', 'tempo']
+
+WEEKDAYS = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+HOURS = 24
+
+# ============================================
+
+def load_new_plays(since=None):
+    """Reproduções posteriores a 'since' (UTC)"""
+    filters = [('played_at', '>', pd.Timestamp(since))] if since else None
+    plays = pd.read_parquet(os.path.join(HISTORY_PATH, 'recently_played'),
+                            columns=['played_at', 'track_id'], filters=filters)
+    return plays.dropna(subset=['played_at'])
+
+def load_features():
+    """Audio features por música (None enquanto nenhuma foi extraída)"""
+    features_path = os.path.join(HISTORY_PATH, 'audio_features')
+    if not os.path.isdir(features_path):
+        return None
+    return pd.read_parquet(features_path, columns=['track_id'] + FEATURES)
+
+def count_plays(plays):
+    """Reproduções de cada música em cada célula (dia da semana, hora)"""
+    local = plays['played_at'].dt.tz_localize('UTC').dt.tz_convert(TIMEZONE)
+    cell = local.dt.dayofweek * HOURS + local.dt.hour
+    return (plays.assign(celula=cell.to_numpy())
+                 .groupby(['celula', 'track_id'], dropna=False).size()
+                 .rename('reproducoes').reset_index())
+
+def merge_counts(counts, new):
+    return (pd.concat([counts, new], ignore_index=True)
+              .groupby(['celula', 'track_id'], dropna=False)['reproducoes'].sum().reset_index())
+
+def aggregate_plays(counts, features):
+    """Soma as reproduções e as features (ponderadas pelas reproduções) em cada célula
+
+    Parte das contagens por música, não das reproduções: features que chegam depois
+    também entram nas médias das reproduções antigas
+    """
+    n_cells = len(WEEKDAYS) * HOURS
+    cell = counts['celula'].to_numpy(dtype=np.int64)
+    plays = counts['reproducoes'].to_numpy(dtype=np.int64)
+
+    cube = {'reproducoes': np.bincount(cell, weights=plays, minlength=n_cells).astype(np.int64)}
+    if features is None:
+        # Sem features ainda: o cubo conta as reproduções e as médias ficam vazias
+        values = np.full((len(counts), len(FEATURES)), np.nan)
+    else:
+        values = counts[['track_id']].merge(features, on='track_id', how='left')[FEATURES].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    for idx, feature in enumerate(FEATURES):
+        # Contagem própria por feature: nem toda música tocada tem audio features
+        mask = present[:, idx]
+        cube[f'n_{feature}'] = np.bincount(cell[mask], weights=plays[mask], minlength=n_cells).astype(np.int64)
+        cube[f'soma_{feature}'] = np.bincount(cell[mask], weights=values[mask, idx] * plays[mask], minlength=n_cells)
+    return cube
+
+def empty_counts():
+    return pd.DataFrame({'celula': pd.Series(dtype='int64'), 'track_id': pd.Series(dtype=object),
+                         'reproducoes': pd.Series(dtype='int64')})
+
+def read_counts():
+    """Contagens acumuladas por (célula, música) e o horário da última reprodução contada"""
+    counts_path = os.path.join(PATTERNS_PATH, COUNTS_FILE)
+    state_path = os.path.join(PATTERNS_PATH, STATE_FILE)
+    if not (os.path.exists(counts_path) and os.path.exists(state_path)):
+        return empty_counts(), None
+
+    with open(state_path, encoding='utf-8') as f:
+        return pd.read_parquet(counts_path), json.load(f)['ultimo_played_at']
+
+def cube_to_frame(cube):
+    """Tabela longa para o dashboard: uma linha por (dia, hora), com as médias prontas"""
+    weekday, hour = np.divmod(np.arange(len(WEEKDAYS) * HOURS), HOURS)
+    df = pd.DataFrame({
+        'dia_semana': weekday,
+        'dia_nome': np.array(WEEKDAYS)[weekday],
+        'hora': hour,
+        **cube
+    })
+    for feature in FEATURES:
+        counts = df[f'n_{feature}']
+        df[f'media_{feature}'] = (df[f'soma_{feature}'] / counts).where(counts > 0)
+    df['pct_reproducoes'] = df['reproducoes'] / max(df['reproducoes'].sum(), 1) * 100
+    return df
+
+def update_patterns(full=False):
+    """Conta só as reproduções novas e recalcula o cubo com as features atuais"""
+    if not os.path.isdir(os.path.join(HISTORY_PATH, 'recently_played')):
+        print(f"❌ {HISTORY_PATH}/recently_played não encontrado (rode a compactação antes)")
+        return None
+
+    os.makedirs(PATTERNS_PATH, exist_ok=True)
+    counts, since = (empty_counts(), None) if full else read_counts()
+
+    plays = load_new_plays(since)
+    features = load_features()
+    if plays.empty:
+        print("  ⏭️ Nenhuma reprodução nova")
+    else:
+        counts = merge_counts(counts, count_plays(plays))
+        counts.to_parquet(os.path.join(PATTERNS_PATH, COUNTS_FILE), index=False)
+        since = plays['played_at'].max().isoformat()
+        with open(os.path.join(PATTERNS_PATH, STATE_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'ultimo_played_at': since, 'timezone': TIMEZONE}, f, indent=2)
+
+        with_features = plays['track_id'].isin(features['track_id']).mean() * 100 if features is not None else 0
+        print(f"  ✅ {len(plays):,} reproduções novas contadas ({with_features:.0f}% com audio features)")
+
+    # O cubo é sempre recalculado (uma linha por célula e música): as médias acompanham as
+    # audio features extraídas depois das reproduções
+    df = cube_to_frame(aggregate_plays(counts, features))
+    df.to_parquet(os.path.join(PATTERNS_PATH, CUBE_FILE), index=False)
+    print(f"  💾 {CUBE_FILE}: {int(df['reproducoes'].sum()):,} reproduções no total")
+    return df
+
+def print_summary(df):
+    if df is None or df['reproducoes'].sum() == 0:
+        return
+
+    print("\n🕐 Horários com mais reproduções:")
+    for _, row in df.nlargest(5, 'reproducoes').iterrows():
+        energy = f"energia {row['media_energy']:.2f}" if pd.notna(row['media_energy']) else "sem features"
+        print(f"   {row['dia_nome']:<8} {row['hora']:02d}h: {row['reproducoes']:,} ({energy})")
+
+    by_day = df.groupby('dia_nome', sort=False)['reproducoes'].sum()
+    print(f"\n📅 Dia com mais reproduções: {by_day.idxmax()} ({by_day.max():,})")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Cubo dia da semana x hora das reproduções')
+    parser.add_argument('--completo', action='store_true',
+                        help='descarta o cubo salvo e reagrega todas as reproduções')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🕐 MUSICMETRICS - Padrões de Escuta")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    df = update_patterns(full=args.completo)
+    print_summary(df)
+    print(f"\n⏱️ Concluído em {time.perf_counter() - start:.2f} s | Cubo em: {PATTERNS_PATH}/{CUBE_FILE}")
+
+if __name__ == "__main__":
+    main()
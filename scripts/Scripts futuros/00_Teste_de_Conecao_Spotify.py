@@ -3,27 +3,21 @@ MusicMetrics - Spotify API Connection Test
 Testa a conexão com a API do Spotify e exibe informações básicas do usuário
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from dotenv import load_dotenv
 import os
+import sys
 
-# Carregar variáveis de ambiente
-load_dotenv()
+# Raiz do repositório no path: o script também roda direto, fora da CLI
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
 
-# Configurar autenticação
-sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=os.getenv('SPOTIFY_CLIENT_ID'),
-    client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
-    redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI'),
-    scope='user-top-read user-read-recently-played user-library-read playlist-read-private'
-))
+from musicmetrics.config import get_spotify_client
 
 def test_connection():
     """Testa a conexão com a API do Spotify"""
     try:
         # Pegar informações do usuário atual
-        user = sp.current_user()
+        user = get_spotify_client().current_user()
         print(f"✅ Conectado com sucesso!")
         print(f"👤 Usuário: {user['display_name']}")
         print(f"📧 Email: {user.get('email', 'N/A')}")
@@ -40,7 +34,7 @@ def get_top_artists(time_range='medium_term', limit=10):
     time_range: 'short_term' (4 semanas), 'medium_term' (6 meses), 'long_term' (anos)
     """
     try:
-        results = sp.current_user_top_artists(time_range=time_range, limit=limit)
+        results = get_spotify_client().current_user_top_artists(time_range=time_range, limit=limit)
         
         print(f"\n🎤 Seus Top {limit} Artistas ({time_range}):")
         print("-" * 50)
@@ -63,7 +57,7 @@ def get_top_tracks(time_range='medium_term', limit=10):
     time_range: 'short_term' (4 semanas), 'medium_term' (6 meses), 'long_term' (anos)
     """
     try:
-        results = sp.current_user_top_tracks(time_range=time_range, limit=limit)
+        results = get_spotify_client().current_user_top_tracks(time_range=time_range, limit=limit)
         
         print(f"\n🎵 Suas Top {limit} Músicas ({time_range}):")
         print("-" * 50)
@@ -84,7 +78,7 @@ def get_top_tracks(time_range='medium_term', limit=10):
 def get_recently_played(limit=10):
     """Retorna as músicas tocadas recentemente"""
     try:
-        results = sp.current_user_recently_played(limit=limit)
+        results = get_spotify_client().current_user_recently_played(limit=limit)
         
         print(f"\n⏮️ Últimas {limit} Músicas Tocadas:")
         print("-" * 50)
@@ -104,7 +98,7 @@ def get_recently_played(limit=10):
         print(f"❌ Erro ao buscar músicas recentes: {e}")
         return []
 
-if __name__ == "__main__":
+def main():
     print("=" * 50)
     print("🎵 MUSICMETRICS - Teste de Conexão Spotify API")
     print("=" * 50)
@@ -125,3 +119,6 @@ if __name__ == "__main__":
         print("=" * 50)
         print("✅ Teste concluído com sucesso!")
         print("=" * 50)
+
+if __name__ == "__main__":
+    main()
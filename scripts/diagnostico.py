@@ -1,46 +1,155 @@
+"""
+MusicMetrics - Diagnóstico de Integridade Referencial
+Verifica as chaves estrangeiras entre os arquivos processados (só as colunas de chave)
+e gera um relatório de órfãos em JSON
+"""
+
 import pandas as pd
+import numpy as np
+import os
+import json
+import time
+
+# ============================================
+
+# Caminhos dos arquivos processados
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+TRACKS_FILE = 'tracks_limpo.csv'
+ARTISTS_FILE = 'artists_limpo.csv'
+AUDIO_FEATURES_FILE = 'audios_limpos.csv'
+ALBUMS_FILE = 'albums_limpo.csv'
+
+# Relatório gerado
+REPORT_FILE = 'diagnostico_fk.json'
+MAX_ORPHAN_EXAMPLES = 1000
+
+# Relacionamentos do modelo (filho -> pai), espelhando as FOREIGN KEYs de sql/migracoes/
+RELATIONSHIPS = [
+    {
+        'name': 'dim_tracks.artist_id -> dim_artists.artist_id',
+        'child_file': TRACKS_FILE, 'child_key': 'primary_artist_id',
+        'parent_file': ARTISTS_FILE, 'parent_key': 'artist_id',
+    },
+    {
+        'name': 'dim_audio_features.track_id -> dim_tracks.track_id',
+        'child_file': AUDIO_FEATURES_FILE, 'child_key': 'track_id',
+        'parent_file': TRACKS_FILE, 'parent_key': 'track_id',
+    },
+    {
+        'name': 'dim_tracks.album_id -> dim_albums.album_id',
+        'child_file': TRACKS_FILE, 'child_key': 'album_id',
+        'parent_file': ALBUMS_FILE, 'parent_key': 'album_id',
+    },
+]
+
+# ============================================
+
+def load_key_columns():
+    """Lê cada arquivo uma única vez, apenas com as colunas de chave usadas nos relacionamentos"""
+    needed = {}
+    for rel in RELATIONSHIPS:
+        needed.setdefault(rel['child_file'], set()).add(rel['child_key'])
+        needed.setdefault(rel['parent_file'], set()).add(rel['parent_key'])
+
+    keys = {}
+    for filename, columns in needed.items():
+        path = os.path.join(PROCESSED_DATA_PATH, filename)
+        if not os.path.exists(path):
+            continue
+
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [col for col in columns if col in header]
+        if not usecols:
+            continue
+
+        df = pd.read_csv(path, usecols=usecols, dtype=str)
+        keys[filename] = {col: df[col] for col in usecols}
+        print(f"  ✅ {filename}: {len(df):,} linhas ({', '.join(usecols)})")
+
+    return keys
+
+def check_relationship(child, parent):
+    """Compara as chaves filho/pai com arrays ordenados e np.searchsorted"""
+    child_values = child.dropna().to_numpy(dtype=str)
+    parent_sorted = np.unique(parent.dropna().to_numpy(dtype=str))
+
+    child_distinct, child_counts = np.unique(child_values, return_counts=True)
+
+    if len(parent_sorted) == 0:
+        found = np.zeros(len(child_distinct), dtype=bool)
+    else:
+        pos = np.searchsorted(parent_sorted, child_distinct)
+        pos[pos == len(parent_sorted)] = 0
+        found = parent_sorted[pos] == child_distinct
+
+    orphans = child_distinct[~found]
+
+    return {
+        'child_rows': int(len(child)),
+        'child_nulls': int(child.isnull().sum()),
+        'child_distinct': int(len(child_distinct)),
+        'parent_distinct': int(len(parent_sorted)),
+        'parent_nulls': int(parent.isnull().sum()),
+        'parent_duplicates': int(parent.dropna().duplicated().sum()),
+        'matching_distinct': int(found.sum()),
+        'orphan_distinct': int(len(orphans)),
+        'orphan_rows': int(child_counts[~found].sum()),
+        'orphan_examples': orphans[:MAX_ORPHAN_EXAMPLES].tolist(),
+    }
+
+def print_result(rel, result):
+    print(f"\n🔍 {rel['name']}")
+    print(f"  Linhas no filho: {result['child_rows']:,} ({result['child_nulls']:,} nulos)")
+    print(f"  Chaves únicas: filho {result['child_distinct']:,} | pai {result['parent_distinct']:,}")
+    if result['parent_duplicates'] > 0:
+        print(f"  ⚠️ {result['parent_duplicates']:,} chaves duplicadas no pai")
+    print(f"  ✅ IDs que batem: {result['matching_distinct']:,}")
+    print(f"  ❌ IDs que NÃO batem: {result['orphan_distinct']:,} ({result['orphan_rows']:,} linhas órfãs)")
+
+    if result['orphan_distinct'] > 0:
+        print("  📌 Exemplos de IDs que NÃO batem (primeiros 10):")
+        for idx, id_val in enumerate(result['orphan_examples'][:10]):
+            print(f"    {idx+1}. {id_val}")
 
-# Carregamento dos arquivos
-df_tracks = pd.read_csv('../MusicMetrics/data/processed/tracks_limpo.csv')
-df_artists = pd.read_csv('../MusicMetrics/data/processed/artists_limpo.csv')
+def main():
+    """Função principal"""
+    print("\n" + "=" * 80)
+    print("🩺 MUSICMETRICS - DIAGNÓSTICO DE INTEGRIDADE REFERENCIAL")
+    print("=" * 80)
 
-print("=== DIAGNÓSTICO ===\n")
+    start = time.perf_counter()
 
-# 1. Verifica o formato dos IDs
-print("📋 FORMATO DOS IDs:\n")
-print("Primeiros 5 artist_id (tabela artists):")
-print(df_artists['artist_id'].head(5).tolist())
+    print("\n📂 Carregando colunas de chave...")
+    keys = load_key_columns()
 
-print("\nPrimeiros 5 primary_artist_id (tabela tracks):")
-print(df_tracks['primary_artist_id'].head(5).tolist())
+    report = {'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'), 'relationships': []}
 
-# 2. Verifica quantos são nulos
-print(f"\n❓ VALORES NULOS:\n")
-print(f"primary_artist_id nulos: {df_tracks['primary_artist_id'].isnull().sum():,}")
-print(f"artist_id nulos: {df_artists['artist_id'].isnull().sum():,}")
+    for rel in RELATIONSHIPS:
+        child = keys.get(rel['child_file'], {}).get(rel['child_key'])
+        parent = keys.get(rel['parent_file'], {}).get(rel['parent_key'])
 
-# 3. Verifica os tipos dos dados
-print(f"\n🔢 TIPOS DE DADOS:\n")
-print(f"Tipo de artist_id: {df_artists['artist_id'].dtype}")
-print(f"Tipo de primary_artist_id: {df_tracks['primary_artist_id'].dtype}")
+        if child is None or parent is None:
+            print(f"\n⏭️ {rel['name']}: ignorado (arquivo ou coluna ausente)")
+            report['relationships'].append({'name': rel['name'], 'status': 'skipped'})
+            continue
 
-# 4. TESTE CRÍTICO: Verificar se há correspondência
-print(f"\n🔍 TESTE DE CORRESPONDÊNCIA:\n")
+        result = check_relationship(child, parent)
+        print_result(rel, result)
+        report['relationships'].append({
+            'name': rel['name'],
+            'status': 'ok' if result['orphan_distinct'] == 0 else 'orphans',
+            **result
+        })
 
-# Pegar IDs únicos de cada tabela
-artists_ids = set(df_artists['artist_id'].dropna().astype(str))
-tracks_artists = set(df_tracks['primary_artist_id'].dropna().astype(str))
+    report['elapsed_seconds'] = round(time.perf_counter() - start, 3)
 
-print(f"Total de artist_id únicos (artists): {len(artists_ids):,}")
-print(f"Total de primary_artist_id únicos (tracks): {len(tracks_artists):,}")
+    report_path = os.path.join(PROCESSED_DATA_PATH, REPORT_FILE)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
 
-# Quantos IDs de tracks existem em artists?
-matching = tracks_artists.intersection(artists_ids)
-print(f"\n✅ IDs que batem: {len(matching):,}")
-print(f"❌ IDs que NÃO batem: {len(tracks_artists - matching):,}")
+    print("\n" + "=" * 80)
+    print(f"📄 Relatório salvo em: {report_path} ({report['elapsed_seconds']:.2f} s)")
+    print("=" * 80)
 
-# Mostrar exemplos que NÃO batem
-if len(tracks_artists - matching) > 0:
-    print("\n📌 Exemplos de IDs que NÃO batem (primeiros 10):")
-    for idx, id_val in enumerate(list(tracks_artists - matching)[:10]):
-        print(f"  {idx+1}. {id_val}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+MusicMetrics - Medição de Índices e Joins
+Mede o tamanho dos índices e o tempo dos joins das views, para comparar o esquema
+com chaves VARCHAR (antes) e com chaves substitutas INT (depois)
+
+No MySQL mede o esquema atual (rodar uma vez em cada esquema). Com --backend duckdb monta
+os dois esquemas a partir dos arquivos processados e mede os dois na mesma execução
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+# Raiz do repositório no path: o script também roda direto, fora da CLI
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+from musicmetrics.config import DB_CONFIG, load_db_config
+
+# ============================================
+
+PROCESSED_DATA_PATH = '../MusicMetrics/data/processed/'
+RESULTS_FILE = 'medicao_chaves.json'
+RESULTS_FILE_DUCKDB = 'medicao_chaves_duckdb.json'
+
+TRACKS_FILE = 'tracks_limpo.csv'
+ARTISTS_FILE = 'artists_limpo.csv'
+FEATURES_FILE = 'audios_limpos.csv'
+DUCKDB_PATH = os.path.join(PROCESSED_DATA_PATH, 'medicao_chaves.duckdb')
+
+TABLES = ['dim_artists', 'dim_tracks', 'dim_audio_features']
+
+# Consultas com join (via views, que existem nos dois esquemas)
+JOIN_QUERIES = {
+    'vw_music_by_decade': "SELECT * FROM vw_music_by_decade",
+    'vw_top_artists_with_tracks': "SELECT COUNT(*) FROM vw_top_artists_with_tracks",
+    'vw_tracks_complete': "SELECT COUNT(*), AVG(energy) FROM vw_tracks_complete",
+    'vw_most_danceable_tracks': "SELECT COUNT(*) FROM vw_most_danceable_tracks",
+}
+
+REPETITIONS = 5
+
+# Esquemas montados no DuckDB: mesmas tabelas, views e linhas, muda só a chave dos joins.
+# No 'depois' os IDs do Spotify continuam gravados como atributos UNIQUE, como em dim_*
+KEY_SCHEMAS = {
+    'antes': {'artist_key': 'artist_id', 'track_key': 'track_id', 'key_type': 'VARCHAR(22)',
+              'track_artist': 'CASE WHEN artist_sk IS NOT NULL THEN primary_artist_id END',
+              'artist_natural': '', 'track_natural': ''},
+    'depois': {'artist_key': 'artist_sk', 'track_key': 'track_sk', 'key_type': 'UINTEGER',
+               'track_artist': 'artist_sk',
+               'artist_natural': 'artist_id', 'track_natural': 'track_id'},
+}
+
+DUCKDB_TABLES = """
+CREATE TABLE dim_artists (
+    {artist_key} {key_type} {primary_key},{artist_natural_column}
+    artist_name VARCHAR, genres VARCHAR, followers BIGINT, popularity SMALLINT
+);
+CREATE TABLE dim_tracks (
+    {track_key} {key_type} {primary_key},{track_natural_column}
+    track_name VARCHAR, {artist_key} {key_type} {artist_reference},
+    duration_ms INTEGER, explicit BOOLEAN, popularity SMALLINT, release_date DATE, release_year SMALLINT
+);
+CREATE TABLE dim_audio_features (
+    {track_key} {key_type} {primary_key} {track_reference},
+    danceability DOUBLE, energy DOUBLE, valence DOUBLE, tempo DOUBLE, acousticness DOUBLE
+);
+INSERT INTO dim_artists
+SELECT {artist_key},{artist_natural_select} artist_name, CAST(artist_genres AS VARCHAR), artist_followers, artist_popularity
+FROM read_csv({artists_path}, header = true);
+INSERT INTO dim_tracks
+SELECT {track_key},{track_natural_select} track_name, {track_artist}, duration_ms, explicit, track_popularity,
+       TRY_CAST(release_date AS DATE), CAST(release_year AS SMALLINT)
+FROM read_csv({tracks_path}, header = true)
+WHERE primary_artist_id IS NULL OR artist_sk IS NOT NULL;
+INSERT INTO dim_audio_features
+SELECT {track_key}, danceability, energy, valence, tempo, acousticness
+FROM read_csv({features_path}, header = true)
+WHERE {track_key} IN (SELECT {track_key} FROM dim_tracks);
+CREATE VIEW vw_tracks_complete AS
+SELECT t.track_name, ar.artist_name, t.popularity, t.release_year, af.danceability, af.energy, af.valence
+FROM dim_tracks t LEFT JOIN dim_artists ar ON t.{artist_key} = ar.{artist_key}
+LEFT JOIN dim_audio_features af ON t.{track_key} = af.{track_key};
+CREATE VIEW vw_top_artists_with_tracks AS
+SELECT a.{artist_key}, a.artist_name, COUNT(t.{track_key}) AS total_tracks, AVG(t.popularity) AS avg_track_popularity
+FROM dim_artists a LEFT JOIN dim_tracks t ON a.{artist_key} = t.{artist_key}
+WHERE a.popularity > 0
+GROUP BY a.{artist_key}, a.artist_name
+HAVING COUNT(t.{track_key}) > 0;
+CREATE VIEW vw_music_by_decade AS
+SELECT FLOOR(t.release_year / 10) * 10 AS decade, COUNT(t.{track_key}) AS total_tracks,
+       AVG(t.popularity) AS avg_popularity, AVG(af.danceability) AS avg_danceability, AVG(af.energy) AS avg_energy
+FROM dim_tracks t LEFT JOIN dim_audio_features af ON t.{track_key} = af.{track_key}
+WHERE t.release_date IS NOT NULL
+GROUP BY decade;
+CREATE VIEW vw_most_danceable_tracks AS
+SELECT t.track_name, a.artist_name, af.danceability, t.popularity
+FROM dim_tracks t INNER JOIN dim_artists a ON t.{artist_key} = a.{artist_key}
+INNER JOIN dim_audio_features af ON t.{track_key} = af.{track_key}
+WHERE af.danceability > 0.7;
+"""
+
+# ============================================
+
+def measure_sizes(cursor):
+    """Tamanho de dados e de índices (MB) de cada tabela, via information_schema"""
+    cursor.execute("ANALYZE TABLE " + ", ".join(TABLES))
+    cursor.fetchall()
+
+    cursor.execute("""
+        SELECT table_name, data_length, index_length
+        FROM information_schema.TABLES
+        WHERE table_schema = %s AND table_name IN (%s, %s, %s)
+    """, (DB_CONFIG['database'], *TABLES))
+
+    return {
+        name: {'data_mb': data / 1024**2, 'index_mb': index / 1024**2}
+        for name, data, index in cursor.fetchall()
+    }
+
+def measure_joins(cursor):
+    """Mediana do tempo (ms) de cada consulta, depois de uma execução de aquecimento"""
+    timings = {}
+    for name, query in JOIN_QUERIES.items():
+        cursor.execute(query)
+        cursor.fetchall()
+
+        runs = []
+        for _ in range(REPETITIONS):
+            start = time.perf_counter()
+            cursor.execute(query)
+            cursor.fetchall()
+            runs.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(runs)
+
+    return timings
+
+def build_duckdb_schema(label, constraints=True):
+    """Recria o banco de medição com o esquema do rótulo (com ou sem PK/FK e seus índices)"""
+    import duckdb
+
+    for path in (DUCKDB_PATH, DUCKDB_PATH + '.wal'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def quote(filename):
+        return "'" + os.path.join(PROCESSED_DATA_PATH, filename).replace("'", "''") + "'"
+
+    keys = KEY_SCHEMAS[label]
+    unique = ' UNIQUE' if constraints else ''
+    natural = {}
+    for kind in ('artist', 'track'):
+        column = keys[f'{kind}_natural']
+        natural[f'{kind}_natural_column'] = f"\n    {column} VARCHAR(22){unique}," if column else ''
+        natural[f'{kind}_natural_select'] = f" {column}," if column else ''
+    script = DUCKDB_TABLES.format(
+        **keys, **natural,
+        primary_key='PRIMARY KEY' if constraints else '',
+        artist_reference='REFERENCES dim_artists' if constraints else '',
+        track_reference='REFERENCES dim_tracks' if constraints else '',
+        artists_path=quote(ARTISTS_FILE), tracks_path=quote(TRACKS_FILE), features_path=quote(FEATURES_FILE),
+    )
+
+    connection = duckdb.connect(DUCKDB_PATH)
+    for statement in script.split(';'):
+        if statement.strip():
+            connection.execute(statement)
+    connection.execute("CHECKPOINT")
+    return connection
+
+def duckdb_size_mb(connection):
+    block_size, used_blocks = connection.execute(
+        "SELECT block_size, used_blocks FROM pragma_database_size()").fetchone()
+    return block_size * used_blocks / 1024**2
+
+def measure_duckdb(label):
+    """Tamanho do banco sem e com as chaves (a diferença é o custo dos índices) e tempo dos joins"""
+    connection = build_duckdb_schema(label, constraints=False)
+    data_mb = duckdb_size_mb(connection)
+    connection.close()
+
+    connection = build_duckdb_schema(label)
+    try:
+        sizes = {'banco': {'data_mb': data_mb, 'index_mb': duckdb_size_mb(connection) - data_mb}}
+        joins = measure_joins(connection)
+    finally:
+        connection.close()
+    for path in (DUCKDB_PATH, DUCKDB_PATH + '.wal'):
+        if os.path.exists(path):
+            os.remove(path)
+    return sizes, joins
+
+def measure_mysql():
+    import mysql.connector
+    from mysql.connector import Error
+
+    try:
+        connection = mysql.connector.connect(**load_db_config())
+    except Error as e:
+        print(f"❌ Erro ao conectar ao MySQL: {e}")
+        return None
+
+    try:
+        cursor = connection.cursor()
+        sizes = measure_sizes(cursor)
+        joins = measure_joins(cursor)
+        cursor.close()
+    finally:
+        connection.close()
+    return sizes, joins
+
+def print_measurement(sizes, joins):
+    for table, size in sizes.items():
+        print(f"  💾 {table}: dados {size['data_mb']:.1f} MB | índices {size['index_mb']:.1f} MB")
+    for name, elapsed in joins.items():
+        print(f"  ⏱️ {name}: {elapsed:.0f} ms (mediana de {REPETITIONS})")
+
+def print_comparison(results):
+    """Tabela antes x depois, se as duas medições existirem"""
+    if 'antes' not in results or 'depois' not in results:
+        return
+
+    before, after = results['antes'], results['depois']
+
+    print("\n📊 COMPARAÇÃO (antes -> depois)")
+    print("-" * 80)
+    for table in before['sizes']:
+        if table in after['sizes']:
+            b, a = before['sizes'][table], after['sizes'][table]
+            print(f"  {table}: índices {b['index_mb']:.1f} MB -> {a['index_mb']:.1f} MB | "
+                  f"dados {b['data_mb']:.1f} MB -> {a['data_mb']:.1f} MB")
+    for name in JOIN_QUERIES:
+        if name in before['joins'] and name in after['joins']:
+            b, a = before['joins'][name], after['joins'][name]
+            print(f"  {name}: {b:.1f} ms -> {a:.1f} ms ({b / a:.2f}x)")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Mede índices e joins do esquema atual')
+    parser.add_argument('label', choices=['antes', 'depois'], nargs='?',
+                        help="'antes' no esquema com chaves VARCHAR, 'depois' com chaves substitutas INT")
+    parser.add_argument('--backend', choices=['mysql', 'duckdb'], default='mysql',
+                        help='duckdb = monta e mede os dois esquemas a partir dos arquivos processados')
+    args = parser.parse_args()
+    if args.backend == 'mysql' and args.label is None:
+        parser.error("informe 'antes' ou 'depois' para medir o esquema atual do MySQL")
+
+    labels = [args.label] if args.label else list(KEY_SCHEMAS)
+
+    print("\n" + "=" * 80)
+    print(f"📏 MUSICMETRICS - MEDIÇÃO DE ÍNDICES E JOINS ({args.backend}: {', '.join(labels)})")
+    print("=" * 80)
+
+    measurements = {}
+    for label in labels:
+        if args.backend == 'duckdb':
+            print(f"\n🦆 Esquema '{label}' ({KEY_SCHEMAS[label]['key_type']})")
+            measured = measure_duckdb(label)
+        else:
+            measured = measure_mysql()
+        if measured is None:
+            return
+        sizes, joins = measured
+        print_measurement(sizes, joins)
+        measurements[label] = {'sizes': sizes, 'joins': joins}
+
+    # Guardar junto das medições anteriores
+    results_path = os.path.join(PROCESSED_DATA_PATH, RESULTS_FILE_DUCKDB if args.backend == 'duckdb' else RESULTS_FILE)
+    results = {}
+    if os.path.exists(results_path):
+        with open(results_path, encoding='utf-8') as f:
+            results = json.load(f)
+    results.update(measurements)
+
+    os.makedirs(PROCESSED_DATA_PATH, exist_ok=True)
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print_comparison(results)
+    print(f"\n📄 Resultados salvos em: {results_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+MusicMetrics - Teste de Carga da API
+Simula usuários simultâneos contra a API local (python -m musicmetrics servir) e reporta
+a latência p50/p99 por rota. Cada usuário mantém uma conexão keep-alive e navega pelas
+páginas de /musicas/top seguindo o cursor, além de consultar artistas, décadas e
+músicas parecidas
+"""
+
+import asyncio
+import argparse
+import json
+import random
+import statistics
+import time
+
+# ============================================
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+
+DEFAULT_USERS = 16
+DEFAULT_DURATION_S = 15
+PAGE_LIMIT = 50
+# Páginas seguidas pelo cursor antes de voltar ao início da lista
+MAX_PAGES = 20
+# Músicas sorteadas para a rota de parecidas
+TRACK_SAMPLE = 500
+
+# Peso de cada rota na mistura de requisições
+ROUTE_WEIGHTS = {
+    'musicas/top': 5,
+    'artistas/top': 2,
+    'decadas': 1,
+    'parecidas': 2,
+}
+
+LATENCY_BUDGET_MS = 50
+SEED = 42
+
+# ============================================
+
+class HTTPConnection:
+    """Conexão HTTP/1.1 keep-alive mínima (Content-Length ou chunked)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, bytes(body)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+class VirtualUser:
+    """Usuário simulado: escolhe a próxima rota pelos pesos e guarda o cursor da paginação"""
+
+    def __init__(self, host, port, rng, track_ids, timings, errors):
+        self.connection = HTTPConnection(host, port)
+        self.rng = rng
+        self.track_ids = track_ids
+        self.timings = timings
+        self.errors = errors
+        self.cursor, self.pages = None, 0
+
+    def next_request(self):
+        route = self.rng.choices(list(ROUTE_WEIGHTS), weights=list(ROUTE_WEIGHTS.values()))[0]
+        if route == 'musicas/top':
+            cursor = f"&cursor={self.cursor}" if self.cursor else ''
+            return route, f"/musicas/top?limite={PAGE_LIMIT}{cursor}"
+        if route == 'artistas/top':
+            return route, f"/artistas/top?limite={PAGE_LIMIT}"
+        if route == 'parecidas' and self.track_ids:
+            return route, f"/musicas/{self.rng.choice(self.track_ids)}/parecidas"
+        return 'decadas', "/decadas"
+
+    async def run(self, deadline):
+        while time.perf_counter() < deadline:
+            route, path = self.next_request()
+            start = time.perf_counter()
+            try:
+                status, body = await self.connection.get(path)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                self.errors[route] = self.errors.get(route, 0) + 1
+                await self.connection.close()
+                continue
+            self.timings.setdefault(route, []).append((time.perf_counter() - start) * 1000)
+
+            if status != 200:
+                self.errors[route] = self.errors.get(route, 0) + 1
+            elif route == 'musicas/top':
+                self.pages += 1
+                self.cursor = json.loads(body)['proximo'] if self.pages < MAX_PAGES else None
+                if self.cursor is None:
+                    self.pages = 0
+        await self.connection.close()
+
+async def sample_track_ids(host, port):
+    """track_ids reais para a rota de parecidas (vazio se o índice não estiver disponível)"""
+    connection = HTTPConnection(host, port)
+    try:
+        status, body = await connection.get(f"/musicas/top?limite={TRACK_SAMPLE}")
+        track_ids = [item['track_id'] for item in json.loads(body)['itens']] if status == 200 else []
+        if track_ids:
+            status, _ = await connection.get(f"/musicas/{track_ids[0]}/parecidas")
+            if status != 200:
+                print("  ⚠️ Rota de parecidas indisponível (índice de similaridade não construído)")
+                track_ids = []
+        return track_ids
+    finally:
+        await connection.close()
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100, method='inclusive')[p - 1] if len(values) > 1 else values[0]
+
+async def run_load_test(host, port, users, duration):
+    track_ids = await sample_track_ids(host, port)
+    timings, errors = {}, {}
+    rng = random.Random(SEED)
+
+    print(f"\n🚀 {users} usuários por {duration} s em http://{host}:{port}...")
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(VirtualUser(host, port, random.Random(rng.random()), track_ids, timings, errors).run(deadline)
+                           for _ in range(users)))
+    return timings, errors, time.perf_counter() - start
+
+def report(timings, errors, elapsed, budget_ms=LATENCY_BUDGET_MS):
+    print("\n" + "=" * 80)
+    print("📊 LATÊNCIA POR ROTA")
+    print("=" * 80)
+    print(f"   {'Rota':<16}{'requisições':>12}{'erros':>8}{'p50':>11}{'p99':>11}{'máx':>11}")
+
+    total = 0
+    all_timings = []
+    for route in ROUTE_WEIGHTS:
+        values = timings.get(route, [])
+        if not values:
+            continue
+        total += len(values)
+        all_timings += values
+        print(f"   {route:<16}{len(values):>12,}{errors.get(route, 0):>8}"
+              f"{percentile(values, 50):>8.2f} ms{percentile(values, 99):>8.2f} ms{max(values):>8.2f} ms")
+
+    if not all_timings:
+        print("\n❌ Nenhuma requisição concluída (a API está rodando?)")
+        return False
+
+    p50, p99 = percentile(all_timings, 50), percentile(all_timings, 99)
+    ok = p99 <= budget_ms and not errors
+    print(f"\n   Total: {total:,} requisições em {elapsed:.1f} s ({total / elapsed:,.0f} req/s)")
+    print(f"   {'✅' if ok else '⚠️'} p50 {p50:.2f} ms | p99 {p99:.2f} ms (orçamento {budget_ms} ms)"
+          f"{'' if not errors else f' | {sum(errors.values())} erros'}")
+    return ok
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Teste de carga da API local do MusicMetrics')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--porta', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--usuarios', type=int, default=DEFAULT_USERS, help='conexões simultâneas')
+    parser.add_argument('--duracao', type=float, default=DEFAULT_DURATION_S, help='segundos de teste')
+    parser.add_argument('--orcamento-ms', type=float, default=LATENCY_BUDGET_MS, help='p99 aceitável')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🌐 MUSICMETRICS - TESTE DE CARGA DA API")
+    print("=" * 80)
+
+    try:
+        timings, errors, elapsed = asyncio.run(run_load_test(args.host, args.porta, args.usuarios, args.duracao))
+    except OSError as e:
+        print(f"\n❌ API indisponível em http://{args.host}:{args.porta} ({e})")
+        print("   Inicie com: python -m musicmetrics servir --backend duckdb")
+        return
+    report(timings, errors, elapsed, args.orcamento_ms)
+
+if __name__ == "__main__":
+    main()
@@ -15,16 +15,21 @@ SELECT * FROM dim_tracks LIMIT 1;
 SELECT * FROM dim_artists LIMIT 1;
 
 -- Análise pelo SQL com regras de negócio
+-- ('-- nome:' identifica a query para o cache de musicmetrics/queries.py: python -m musicmetrics consultar)
+-- Empates na ordenação são desfeitos pela chave substituta (artist_sk): o resultado é o mesmo no
+-- MySQL, no DuckDB e em 04_Analises_em_Memoria.py (analisar --comparar)
 -- Top 10 artistas mais populares
+-- nome: top_artistas
 SELECT
 	  artist_name AS "Artista",
       popularity AS "Popularidade",
       FORMAT(followers, 0) AS "Seguidores"
 FROM vw_top_artists_with_tracks
-ORDER BY popularity DESC
+ORDER BY popularity DESC, artist_sk
 LIMIT 10;
 
 -- Músicas explicítas x Não explicítas
+-- nome: explicitas
 SELECT 
        CASE
 		  WHEN explicit = 1 THEN "Explicíta"
@@ -33,9 +38,11 @@ SELECT
       COUNT(*) AS "Contagem",
       ROUND((COUNT(*) * 100.0) / (SELECT COUNT(*) FROM dim_tracks), 2) AS "Percentual"
 FROM dim_tracks
-GROUP BY explicit;
+GROUP BY explicit
+ORDER BY explicit;
 
 -- Duração média das músicas
+-- nome: duracao_media
 SELECT 
 	  ROUND(AVG(duration_ms) / 60000, 2) AS "Duração Média (min)",
       ROUND(MAX(duration_ms) / 60000, 2) AS "Música mais Longa (min)",
@@ -43,14 +50,16 @@ SELECT
 FROM dim_tracks;
 
 -- Top 5 artistas com mais músicas
+-- nome: artistas_mais_musicas
 SELECT
 	  artist_name AS "Artista",
       total_tracks AS "Total de Músicas"
 FROM vw_top_artists_with_tracks WHERE total_tracks >= 10
-ORDER BY total_tracks DESC
+ORDER BY total_tracks DESC, artist_sk
 LIMIT 5;
 
 -- Evolução da popularidade por década
+-- nome: popularidade_por_decada
 SELECT
 	  decade AS "Decáda",
       total_tracks AS "Total de Músicas",
@@ -65,34 +74,41 @@ FROM vw_music_by_decade
 ORDER BY decade ASC;
 
 -- Top 10 gêneros musicais mais comuns
+-- nome: top_generos
 SELECT
 	  genres AS "Gênero",
       COUNT(*) AS "Quantidade de Artistas"
 FROM dim_artists 
 WHERE genres IS NOT NULL AND genres != '' AND genres != 'nan'
-GROUP BY genres ORDER BY COUNT(*) DESC
+GROUP BY genres ORDER BY COUNT(*) DESC, MIN(artist_sk)
 LIMIT 10;
       
 -- Artistas com apenas one-hit
+-- nome: one_hit
 SELECT
 	  artist_name AS "Artista",
       total_tracks AS "Total de Músicas",
       max_track_popularity AS "Popularidade da Música"
 FROM vw_top_artists_with_tracks 
 WHERE total_tracks = 1 AND max_track_popularity > 70
-ORDER BY max_track_popularity DESC;
+ORDER BY max_track_popularity DESC, artist_sk;
 
 -- Características Musicais a partir da Década de 1980
+-- Filtro direto em release_year (chave de partição): só as partições p1980 em diante são lidas
+-- nome: features_desde_1980
 SELECT
-	  decade AS "Década",
-      ROUND(avg_danceability, 3) AS "Dançabilidade",
-      ROUND(avg_energy, 3) AS "Energizada",
-      ROUND(avg_valence, 3) AS "Valencia",
-      ROUND(avg_tempo,3) AS "Tempo"
-FROM vw_music_by_decade
-WHERE decade >= 1980;
+	  FLOOR(t.release_year / 10) * 10 AS "Década",
+      ROUND(AVG(af.danceability), 3) AS "Dançabilidade",
+      ROUND(AVG(af.energy), 3) AS "Energizada",
+      ROUND(AVG(af.valence), 3) AS "Valencia",
+      ROUND(AVG(af.tempo),3) AS "Tempo"
+FROM dim_tracks t LEFT JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
+WHERE t.release_date IS NOT NULL AND t.release_year BETWEEN 1980 AND 2025
+GROUP BY FLOOR(t.release_year / 10) * 10
+ORDER BY 1;
 
 -- Artistas mais versáteis
+-- nome: artistas_versateis
 SELECT 
     artist_name AS "Artista",
     total_tracks AS "Total de Músicas",
@@ -101,10 +117,11 @@ SELECT
     variacao AS "Variação"
 FROM tb_artist_versatility
 WHERE total_tracks >= 20
-ORDER BY variacao DESC
+ORDER BY variacao DESC, artist_sk
 LIMIT 10;
 
 -- Correlação: Popularidade vs Features de Áudio
+-- nome: popularidade_vs_features
 SELECT
     CASE
         WHEN t.popularity > 80 THEN 'Populares'
@@ -115,7 +132,7 @@ SELECT
     ROUND(AVG(af.danceability), 3) AS "Dançabilidade",
     ROUND(AVG(af.valence), 3) AS "Valência",
     COUNT(*) AS "Total de Músicas"
-FROM dim_tracks t INNER JOIN dim_audio_features af ON t.track_id = af.track_id
+FROM dim_tracks t INNER JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
 WHERE (t.popularity > 80 OR t.popularity BETWEEN 40 AND 60 OR t.popularity < 20)
 AND af.energy IS NOT NULL AND af.danceability IS NOT NULL AND af.valence IS NOT NULL
 GROUP BY Categoria
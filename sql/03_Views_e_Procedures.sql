@@ -11,7 +11,7 @@ SELECT
     t.explicit,
     t.popularity,
     t.release_date,
-    YEAR(t.release_date) as release_year,
+    t.release_year,
     af.danceability,
     af.energy,
     af.valence,
@@ -20,8 +20,9 @@ SELECT
     af.instrumentalness,
     af.liveness,
     af.speechiness
-FROM dim_tracks t LEFT JOIN dim_artists ar ON t.artist_id = ar.artist_id
-LEFT JOIN dim_albums al ON t.album_id = al.album_id LEFT JOIN dim_audio_features af ON t.track_id = af.track_id;
+FROM dim_tracks t LEFT JOIN dim_artists ar ON t.artist_sk = ar.artist_sk
+LEFT JOIN dim_albums al ON t.album_id = al.album_id
+LEFT JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year;
 
 -- View: Estatísticas de audio features
 CREATE OR REPLACE VIEW vw_audio_features_stats AS
@@ -46,7 +47,7 @@ SELECT
     a.artist_name,
     t.popularity,
     t.release_date,
-    YEAR(t.release_date) as release_year,  -- Extrai o ano
+    t.release_year,
     t.duration_ms,
     t.explicit,
     af.danceability,
@@ -54,32 +55,34 @@ SELECT
     af.valence,
     af.tempo,
     af.acousticness
-FROM dim_tracks t INNER JOIN dim_artists a ON t.artist_id = a.artist_id
-LEFT JOIN dim_audio_features af ON t.track_id = af.track_id
+FROM dim_tracks t INNER JOIN dim_artists a ON t.artist_sk = a.artist_sk
+LEFT JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
 WHERE t.popularity > 0 ORDER BY t.popularity DESC;
 
 -- View: Artistas mais populares com contagem de músicas
 CREATE OR REPLACE VIEW vw_top_artists_with_tracks AS
 SELECT 
+    a.artist_sk,
     a.artist_id,
     a.artist_name,
     a.genres,
     a.popularity,
     a.followers,
-    COUNT(t.track_id) as total_tracks,
+    COUNT(t.track_sk) as total_tracks,
     ROUND(AVG(t.popularity), 1) as avg_track_popularity,
     MAX(t.popularity) as max_track_popularity
-FROM dim_artists a LEFT JOIN dim_tracks t ON a.artist_id = t.artist_id
+FROM dim_artists a LEFT JOIN dim_tracks t ON a.artist_sk = t.artist_sk
 WHERE a.popularity > 0  -- ← Artista com alguma popularidade
-GROUP BY a.artist_id, a.artist_name, a.genres, a.popularity, a.followers
+GROUP BY a.artist_sk, a.artist_id, a.artist_name, a.genres, a.popularity, a.followers
 HAVING total_tracks > 0  -- ← Filtro de artistas com músicas
 ORDER BY a.popularity DESC;
 
 -- View: Evolução musical por década
+-- Filtros sobre release_year (chave de partição) permitem partition pruning
 CREATE OR REPLACE VIEW vw_music_by_decade AS
 SELECT 
-    FLOOR(YEAR(t.release_date) / 10) * 10 as decade,
-    COUNT(t.track_id) as total_tracks,
+    FLOOR(t.release_year / 10) * 10 as decade,
+    COUNT(t.track_sk) as total_tracks,
     AVG(t.popularity) as avg_popularity,
     AVG(t.duration_ms / 60000) as avg_duration_min,
     AVG(af.danceability) as avg_danceability,
@@ -87,8 +90,8 @@ SELECT
     AVG(af.valence) as avg_valence,
     AVG(af.tempo) as avg_tempo,
     AVG(af.acousticness) as avg_acousticness
-FROM dim_tracks t LEFT JOIN dim_audio_features af ON t.track_id = af.track_id
-WHERE t.release_date IS NOT NULL AND YEAR(t.release_date) BETWEEN 1900 AND 2025  -- Filtro de Anos
+FROM dim_tracks t LEFT JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
+WHERE t.release_date IS NOT NULL AND t.release_year BETWEEN 1900 AND 2025  -- Filtro de Anos
 GROUP BY decade
 ORDER BY decade;
 
@@ -98,29 +101,30 @@ SELECT
     t.track_name,
     a.artist_name,
     t.release_date,                        
-    YEAR(t.release_date) as release_year,  
+    t.release_year,  
     af.danceability,
     af.energy,
     af.valence,
     t.popularity
-FROM dim_tracks t INNER JOIN dim_artists a ON t.artist_id = a.artist_id
-INNER JOIN dim_audio_features af ON t.track_id = af.track_id
+FROM dim_tracks t INNER JOIN dim_artists a ON t.artist_sk = a.artist_sk
+INNER JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
 WHERE af.danceability > 0.7
 ORDER BY af.danceability DESC, t.popularity DESC;
 
 -- Criação de tabela com os resultados para a query de artistas mais versáteis
 CREATE TABLE tb_artist_versatility AS
 SELECT
+    a.artist_sk,
     a.artist_name,
-    COUNT(t.track_id) AS total_tracks,
+    COUNT(t.track_sk) AS total_tracks,
     ROUND(MAX(af.danceability), 3) AS max_danceability,
     ROUND(MIN(af.danceability), 3) AS min_danceability,
     ROUND(MAX(af.danceability) - MIN(af.danceability), 3) AS variacao
 FROM dim_artists a
-INNER JOIN dim_tracks t ON a.artist_id = t.artist_id
-INNER JOIN dim_audio_features af ON t.track_id = af.track_id
+INNER JOIN dim_tracks t ON a.artist_sk = t.artist_sk
+INNER JOIN dim_audio_features af ON t.track_sk = af.track_sk AND t.release_year = af.release_year
 WHERE af.danceability IS NOT NULL
-GROUP BY a.artist_id, a.artist_name;
+GROUP BY a.artist_sk, a.artist_name;
 
 -- Índice para performance
 CREATE INDEX idx_variacao ON tb_artist_versatility(variacao);
@@ -0,0 +1,99 @@
+-- V001 - Esquema inicial (mesmas tabelas de 01_Criacao_Banco_de_Dados.sql)
+-- Aplicada por: python -m musicmetrics migrar
+-- Migrações novas vão em arquivos V002__..., V003__... (nunca edite uma já aplicada)
+
+-- Tabela de Artistas
+-- Chaves substitutas INT (artist_sk / track_sk) geradas em 02_Limpeza_e_Transformacao.py;
+-- o ID do Spotify fica como atributo UNIQUE e os joins usam as chaves INT
+CREATE TABLE IF NOT EXISTS dim_artists (
+    artist_sk INT UNSIGNED PRIMARY KEY,
+    artist_id VARCHAR(50) NOT NULL UNIQUE,
+    artist_name VARCHAR(255) NOT NULL,
+    genres TEXT,
+    followers INT,
+    popularity INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_artist_name (artist_name),
+    INDEX idx_popularity (popularity)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tabela de Álbuns
+CREATE TABLE IF NOT EXISTS dim_albums (
+    album_id VARCHAR(50) PRIMARY KEY,
+    album_name VARCHAR(255) NOT NULL,
+    artist_sk INT UNSIGNED,
+    release_date DATE,
+    total_tracks INT,
+    album_type VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (artist_sk) REFERENCES dim_artists(artist_sk),
+    INDEX idx_album_name (album_name),
+    INDEX idx_release_date (release_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tabela de Músicas
+CREATE TABLE IF NOT EXISTS dim_tracks (
+    track_sk INT UNSIGNED PRIMARY KEY,
+    track_id VARCHAR(50) NOT NULL UNIQUE,
+    track_name VARCHAR(255) NOT NULL,
+    artist_sk INT UNSIGNED,
+    album_id VARCHAR(50),
+    duration_ms INT,
+    explicit BOOLEAN,
+    popularity INT,
+    release_date DATE,
+    release_year SMALLINT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (artist_sk) REFERENCES dim_artists(artist_sk),
+    FOREIGN KEY (album_id) REFERENCES dim_albums(album_id),
+    INDEX idx_track_name (track_name),
+    INDEX idx_popularity (popularity),
+    INDEX idx_release_date (release_date),
+    INDEX idx_release_year (release_year)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tabela de Características de Áudio
+-- release_year repetido aqui para permitir o particionamento conjunto com dim_tracks
+-- (versão particionada por década: python 03_Carregamento_dos_Dados.py --ddl-particionado)
+CREATE TABLE IF NOT EXISTS dim_audio_features (
+    track_sk INT UNSIGNED PRIMARY KEY,
+    release_year SMALLINT NOT NULL,
+    danceability DECIMAL(5,4),
+    energy DECIMAL(5,4),
+    key_value INT,
+    loudness DECIMAL(6,3),
+    mode_value INT,
+    speechiness DECIMAL(5,4),
+    acousticness DECIMAL(5,4),
+    instrumentalness DECIMAL(5,4),
+    liveness DECIMAL(5,4),
+    valence DECIMAL(5,4),
+    tempo DECIMAL(6,3),
+    time_signature INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (track_sk) REFERENCES dim_tracks(track_sk),
+    INDEX idx_danceability (danceability),
+    INDEX idx_energy (energy),
+    INDEX idx_valence (valence)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tabela de Tempo
+CREATE TABLE IF NOT EXISTS dim_time (
+    date_id INT PRIMARY KEY AUTO_INCREMENT,
+    full_date DATE NOT NULL UNIQUE,
+    year INT NOT NULL,
+    quarter INT NOT NULL,
+    month INT NOT NULL,
+    month_name VARCHAR(20),
+    week INT NOT NULL,
+    day INT NOT NULL,
+    day_of_week INT NOT NULL,
+    day_name VARCHAR(20),
+    is_weekend BOOLEAN,
+    INDEX idx_full_date (full_date),
+    INDEX idx_year_month (year, month)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
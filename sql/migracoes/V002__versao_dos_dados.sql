@@ -0,0 +1,8 @@
+-- V002 - Versão dos dados para invalidar o cache de consultas
+-- O carregamento (03_Carregamento_dos_Dados.py / migrar --recarga) grava uma versão nova ao terminar
+
+CREATE TABLE IF NOT EXISTS dados_versao (
+    id TINYINT PRIMARY KEY,
+    versao BIGINT NOT NULL,
+    carregado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
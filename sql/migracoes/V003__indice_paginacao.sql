@@ -0,0 +1,6 @@
+-- V003 - Índice da paginação por chave da API (musicmetrics/api.py)
+-- /musicas/top ordena por popularity DESC, track_id ASC e continua a partir do último
+-- (popularity, track_id) enviado: com o índice composto cada página é uma busca no índice,
+-- sem ler e descartar as linhas das páginas anteriores como faria um OFFSET
+
+ALTER TABLE dim_tracks ADD INDEX idx_popularity_track_id (popularity, track_id);